@@ -0,0 +1,266 @@
+"""
+backtest.py
+-----------
+Vectorized season backtest: score the goal model on every (date, player) of a
+date range in one NumPy pass instead of running run_daily.py once per date.
+
+Inputs are loaded once:
+- MoneyPuck features from the memory-mapped season feature matrix (feature_matrix.py)
+- the season schedule index (schedule_index.py) -> which teams play on which date
+- actual goals from the partitioned outcomes dataset (fetch_outcomes.py --start/--end)
+
+Shapes:
+  players      P   ("all"-situation rows of the skaters table)
+  dates        D   (schedule dates in [start, end])
+  mask         (D, P) bool   player's team plays that date
+  goals        (D, P) float  goals scored, NaN where the player has no boxscore row
+  probability  (D, P)        model.goal_probability for the player
+
+Only cells with mask & an outcome row are scored (scratched players have no
+boxscore row). Metrics: Brier score and log-loss, per date and overall.
+
+Scope: the model uses MoneyPuck season totals as run_daily.py does, so a past
+season's backtest includes look-ahead; DailyFaceoff PP units are not replayed.
+
+Usage:
+  python core/data_pipeline/backtest.py --start 2024-10-08 --end 2025-04-17
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_matrix import load_season_features
+from fetch_outcomes import load_outcomes
+from model import DEFAULT_PARAMS, ModelParams, goal_lambda, goal_probability, per_game, pp1_flags, toi_multiplier
+from schedule_index import load_season_index, season_for_date
+
+
+EPS = 1e-15
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class BacktestInputs:
+    dates: np.ndarray             # (D,) str
+    player_id: np.ndarray         # (P,) int64
+    name: np.ndarray              # (P,) str
+    team: np.ndarray              # (P,) str
+    team_code: np.ndarray         # (P,) int
+    xg_per_game: np.ndarray       # (P,)
+    toi_per_game: np.ndarray      # (P,)
+    pp_icetime: np.ndarray        # (P,) 5on4 icetime, NaN if no 5on4 row
+    mask: np.ndarray              # (D, P) bool
+    goals: np.ndarray             # (D, P) float32, NaN = no outcome
+    unmatched_outcomes: int = 0   # outcome rows whose player/date isn't in the mask
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.mask.shape
+
+
+@dataclass
+class BacktestResult:
+    params: ModelParams
+    per_date: pd.DataFrame
+    summary: dict = field(default_factory=dict)
+    probability: Optional[np.ndarray] = None   # (P,) per-player probability
+
+
+def _schedule_dates(start: str, end: str, schedule_cache_dir: Optional[Path]) -> dict[str, set[str]]:
+    """date -> teams playing, for schedule dates in [start, end] (may span seasons)."""
+    seasons = sorted({season_for_date(d.strftime("%Y-%m-%d")) for d in pd.date_range(start, end, freq="MS")}
+                     | {season_for_date(start), season_for_date(end)})
+    teams_by_date: dict[str, set[str]] = {}
+    for season in seasons:
+        # any date inside the season selects its index
+        anchor = f"{season // 10000}-12-01"
+        index = load_season_index(anchor, cache_dir=schedule_cache_dir)
+        for d in index.dates():
+            if start <= d <= end:
+                teams_by_date[d] = index.teams_on(d)
+    return dict(sorted(teams_by_date.items()))
+
+
+def load_backtest_inputs(
+    start: str,
+    end: str,
+    skaters_csv: Optional[Path] = None,
+    outcomes_root: Optional[Path] = None,
+    schedule_cache_dir: Optional[Path] = None,
+) -> BacktestInputs:
+    skaters_csv = Path(skaters_csv or _project_root() / "data" / "raw" / "skaters.csv")
+    if not skaters_csv.exists():
+        raise FileNotFoundError(
+            f"Missing MoneyPuck file: {skaters_csv}\n"
+            "Put skaters.csv into data/raw/ (kept local, not committed)."
+        )
+    sf = load_season_features(skaters_csv)
+
+    # Players = "all"-situation rows
+    rows = np.flatnonzero(sf.situation_mask("all"))
+    player_id = np.asarray(sf.player_id[rows], dtype=np.int64)
+    rows = rows[np.unique(player_id, return_index=True)[1]]   # one row per player, sorted by id
+    player_id = np.asarray(sf.player_id[rows], dtype=np.int64)
+    team_code = np.asarray(sf.team_code[rows], dtype=np.int64)
+    gp = sf.column("games_played")[rows]
+
+    # 5on4 icetime aligned to players (for the MoneyPuck PP1 inference)
+    pp_rows = np.flatnonzero(sf.situation_mask("5on4"))
+    pp_ids = np.asarray(sf.player_id[pp_rows], dtype=np.int64)
+    pp_icetime = np.full(player_id.size, np.nan)
+    pos = np.searchsorted(player_id, pp_ids)
+    hit = (pos < player_id.size) & (player_id[np.minimum(pos, player_id.size - 1)] == pp_ids)
+    pp_icetime[pos[hit]] = sf.column("icetime")[pp_rows[hit]]
+
+    # (D, P) schedule mask via a (D, teams) table
+    teams_by_date = _schedule_dates(start, end, schedule_cache_dir)
+    dates = np.asarray(list(teams_by_date), dtype=str)
+    team_lookup = {t: i for i, t in enumerate(sf.teams)}
+    date_team = np.zeros((dates.size, len(sf.teams)), dtype=bool)
+    for di, teams in enumerate(teams_by_date.values()):
+        date_team[di, [team_lookup[t] for t in teams if t in team_lookup]] = True
+    mask = date_team[:, team_code]
+
+    # (D, P) goals from the outcomes dataset
+    goals = np.full(mask.shape, np.nan, dtype=np.float32)
+    unmatched = 0
+    outcomes = load_outcomes(start, end, dataset_root=outcomes_root)
+    if not outcomes.empty:
+        outcomes = outcomes.dropna(subset=["player_id"])
+        d_idx = pd.Index(dates).get_indexer(outcomes["date"].astype(str))
+        o_ids = outcomes["player_id"].to_numpy(dtype=np.int64)
+        p_pos = np.searchsorted(player_id, o_ids)
+        p_ok = (p_pos < player_id.size) & (player_id[np.minimum(p_pos, player_id.size - 1)] == o_ids)
+        ok = p_ok & (d_idx >= 0)
+        ok[ok] &= mask[d_idx[ok], p_pos[ok]]
+        unmatched = int((~ok).sum())
+        goals[d_idx[ok], p_pos[ok]] = outcomes["goals"].to_numpy(dtype=np.float32)[ok]
+
+    return BacktestInputs(
+        dates=dates,
+        player_id=player_id,
+        name=sf.names[sf.name_code[rows]],
+        team=sf.teams[team_code],
+        team_code=team_code,
+        xg_per_game=per_game(sf.column("I_F_xGoals")[rows], gp),
+        toi_per_game=per_game(sf.column("icetime")[rows], gp),
+        pp_icetime=pp_icetime,
+        mask=mask,
+        goals=goals,
+        unmatched_outcomes=unmatched,
+    )
+
+
+def player_probabilities(inputs: BacktestInputs, params: ModelParams = DEFAULT_PARAMS) -> np.ndarray:
+    """(P,) goal probability per player (the MoneyPuck model has no per-date inputs)."""
+    toi_mult = toi_multiplier(inputs.toi_per_game, inputs.team_code, params)
+    is_pp1 = pp1_flags(inputs.pp_icetime, inputs.team_code, params)
+    return goal_probability(goal_lambda(inputs.xg_per_game, toi_mult, is_pp1, params))
+
+
+def run_backtest(inputs: BacktestInputs, params: ModelParams = DEFAULT_PARAMS) -> BacktestResult:
+    p_player = player_probabilities(inputs, params)
+    prob = np.broadcast_to(p_player, inputs.shape)            # (D, P), no copy
+
+    scored = inputs.mask & ~np.isnan(inputs.goals)
+    y = np.where(scored, inputs.goals > 0, False)
+    p = np.clip(prob, EPS, 1 - EPS)
+
+    brier = np.where(scored, (prob - y) ** 2, 0.0)
+    logloss = np.where(scored, -(y * np.log(p) + (~y) * np.log1p(-p)), 0.0)
+
+    n = scored.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_date = pd.DataFrame(
+            {
+                "date": inputs.dates,
+                "scheduled": inputs.mask.sum(axis=1),
+                "scored": n,
+                "scorers": y.sum(axis=1),
+                "mean_p": np.where(scored, prob, 0.0).sum(axis=1) / n,
+                "brier": brier.sum(axis=1) / n,
+                "logloss": logloss.sum(axis=1) / n,
+            }
+        )
+    per_date = per_date[per_date["scored"] > 0].reset_index(drop=True)
+
+    total = int(n.sum())
+    base_rate = float(y.sum() / total) if total else float("nan")
+    summary = {
+        "dates": int(len(per_date)),
+        "player_games": total,
+        "goal_rate": base_rate,
+        "mean_p": float(np.where(scored, prob, 0.0).sum() / total) if total else float("nan"),
+        "brier": float(brier.sum() / total) if total else float("nan"),
+        # Brier of always predicting the base rate (reference for skill)
+        "brier_base_rate": base_rate * (1 - base_rate) if total else float("nan"),
+        "logloss": float(logloss.sum() / total) if total else float("nan"),
+        "unmatched_outcomes": inputs.unmatched_outcomes,
+    }
+    return BacktestResult(params=params, per_date=per_date, summary=summary, probability=p_player)
+
+
+def prediction_rows(inputs: BacktestInputs, result: BacktestResult) -> pd.DataFrame:
+    """Long (date, player) frame of the scored cells, for inspection / calibration plots."""
+    d, j = np.nonzero(inputs.mask & ~np.isnan(inputs.goals))
+    return pd.DataFrame(
+        {
+            "date": inputs.dates[d],
+            "playerId": inputs.player_id[j],
+            "name": inputs.name[j],
+            "team": inputs.team[j],
+            "goal_probability": result.probability[j],
+            "goals": inputs.goals[d, j].astype(int),
+        }
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Vectorized backtest of the goal model over a date range.")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--skaters", help="MoneyPuck skaters CSV (default data/raw/skaters.csv)")
+    parser.add_argument("--pp1-boost", type=float, default=DEFAULT_PARAMS.pp1_boost)
+    parser.add_argument("--shrink", type=float, default=DEFAULT_PARAMS.shrink)
+    parser.add_argument("--lambda-cap", type=float, default=DEFAULT_PARAMS.lambda_cap)
+    parser.add_argument("--out", help="Write per-date metrics to this CSV.")
+    parser.add_argument("--rows-out", help="Write the scored (date, player) rows to this CSV.")
+    args = parser.parse_args()
+
+    params = ModelParams(pp1_boost=args.pp1_boost, shrink=args.shrink, lambda_cap=args.lambda_cap)
+
+    t0 = time.perf_counter()
+    inputs = load_backtest_inputs(args.start, args.end, skaters_csv=Path(args.skaters) if args.skaters else None)
+    t1 = time.perf_counter()
+    result = run_backtest(inputs, params)
+    t2 = time.perf_counter()
+
+    print(result.per_date.tail(10).to_string(index=False))
+    print()
+    for k, v in result.summary.items():
+        print(f"{k:>20}: {v:.5f}" if isinstance(v, float) else f"{k:>20}: {v}")
+    print(f"\nTensor {inputs.shape[0]} dates x {inputs.shape[1]} players; load {t1 - t0:.2f} s, score {(t2 - t1) * 1000:.0f} ms")
+
+    if args.out:
+        result.per_date.to_csv(args.out, index=False)
+        print(f"Saved: {args.out}")
+    if args.rows_out:
+        prediction_rows(inputs, result).to_csv(args.rows_out, index=False)
+        print(f"Saved: {args.rows_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
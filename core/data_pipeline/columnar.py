@@ -0,0 +1,152 @@
+"""
+columnar.py
+-----------
+Tiny typed columnar format for DataFrames: one NumPy `.npy` file per column
+plus a `_schema.json` describing how to rebuild the frame.
+
+Why it's written this way:
+- No extra dependency (pyarrow is not in requirements.txt)
+- Numeric columns load with mmap, so reading a few columns touches only those pages
+- String columns are stored as integer codes + a categories array (compact, fast)
+- Writes go to a temp directory and are renamed into place (no half-written caches)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+SCHEMA_FILE = "_schema.json"
+FORMAT_VERSION = 1
+
+
+def _column_kind(s: pd.Series) -> str:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_bool_dtype(s.dtype) and not s.hasnans:
+        return "bool"
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        return "numeric"
+    return "string"
+
+
+def _numeric_values(s: pd.Series) -> np.ndarray:
+    # Nullable extension dtypes (Int64, Float32, ...) -> plain float with NaN
+    if pd.api.types.is_extension_array_dtype(s.dtype):
+        return s.astype("float64").to_numpy()
+    return s.to_numpy()
+
+
+def write_frame(df: pd.DataFrame, out_dir: Path, meta: Optional[dict[str, Any]] = None) -> Path:
+    """
+    Write df as a columnar directory at out_dir (replacing anything already there).
+    `meta` is stored verbatim in the schema file (fingerprints, build params, ...).
+    """
+    out_dir = Path(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = out_dir.parent / f".{out_dir.name}.{uuid.uuid4().hex}.tmp"
+    tmp_dir.mkdir()
+
+    columns = []
+    try:
+        for i, name in enumerate(df.columns):
+            s = df[name]
+            kind = _column_kind(s)
+            entry: dict[str, Any] = {"name": str(name), "kind": kind, "file": f"c{i}.npy"}
+
+            if kind in ("category", "string"):
+                cat = s if kind == "category" else s.astype("category")
+                codes = cat.cat.codes.to_numpy().astype(np.int32)
+                categories = np.asarray(cat.cat.categories.astype(str), dtype=str)
+                np.save(tmp_dir / entry["file"], codes)
+                entry["categories"] = f"c{i}.categories.npy"
+                np.save(tmp_dir / entry["categories"], categories)
+            elif kind == "datetime":
+                values = s.to_numpy(dtype="datetime64[ns]")
+                np.save(tmp_dir / entry["file"], values)
+            else:
+                values = _numeric_values(s)
+                entry["dtype"] = str(values.dtype)
+                np.save(tmp_dir / entry["file"], values)
+
+            columns.append(entry)
+
+        schema = {
+            "format_version": FORMAT_VERSION,
+            "rows": int(len(df)),
+            "columns": columns,
+            "meta": meta or {},
+        }
+        (tmp_dir / SCHEMA_FILE).write_text(json.dumps(schema, indent=2), encoding="utf-8")
+
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return out_dir
+
+
+def read_schema(in_dir: Path) -> Optional[dict[str, Any]]:
+    """Return the schema dict for a columnar directory, or None if it isn't one."""
+    schema_path = Path(in_dir) / SCHEMA_FILE
+    if not schema_path.exists():
+        return None
+    try:
+        schema = json.loads(schema_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if schema.get("format_version") != FORMAT_VERSION:
+        return None
+    return schema
+
+
+def read_frame(
+    in_dir: Path,
+    columns: Optional[Iterable[str]] = None,
+    mmap: bool = True,
+) -> pd.DataFrame:
+    """
+    Load a columnar directory written by write_frame.
+
+    Only the requested columns are opened. With mmap=True numeric columns are
+    memory-mapped read-only; string columns come back as object (or categorical
+    if they were written as categorical).
+    """
+    in_dir = Path(in_dir)
+    schema = read_schema(in_dir)
+    if schema is None:
+        raise FileNotFoundError(f"Not a columnar directory (or stale format): {in_dir}")
+
+    entries = {c["name"]: c for c in schema["columns"]}
+    wanted = list(entries) if columns is None else list(columns)
+    missing = [c for c in wanted if c not in entries]
+    if missing:
+        raise KeyError(f"Columns not in {in_dir}: {missing}")
+
+    mmap_mode = "r" if mmap else None
+    data: dict[str, Any] = {}
+    for name in wanted:
+        entry = entries[name]
+        values = np.load(in_dir / entry["file"], mmap_mode=mmap_mode)
+
+        if entry["kind"] in ("category", "string"):
+            categories = np.load(in_dir / entry["categories"])
+            cat = pd.Categorical.from_codes(np.asarray(values), categories=categories)
+            data[name] = cat if entry["kind"] == "category" else np.asarray(cat, dtype=object)
+        else:
+            data[name] = values
+
+    return pd.DataFrame(data, columns=wanted)
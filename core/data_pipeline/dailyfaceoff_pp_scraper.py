@@ -1,17 +1,108 @@
+"""
+dailyfaceoff_pp_scraper.py
+--------------------------
+Scrape DailyFaceoff line-combinations pages for PP1/PP2 units.
+
+Output (LOCAL ONLY):
+  inputs/dailyfaceoff_pp_YYYY-MM-DD.csv          player, team, pp_unit
+  inputs/dailyfaceoff_pp_errors_YYYY-MM-DD.csv   teams with missing / short units
+
+Politeness: requests go through the shared http_client with a per-host token
+bucket (default ~1.25 req/s, the same rate as the old sequential loop with
+sleep 0.8), but pages are fetched concurrently over its keep-alive pool, so
+network wait overlaps instead of adding up. Retries/backoff live in the client.
+Refreshing a subset (--only-playing) merges into the existing file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import html as html_lib
+import re
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
 import pandas as pd
 from bs4 import BeautifulSoup
 
-def scrape_powerplay_units(team_slug: str) -> dict:
+from http_client import HostLimits, HttpClient, default_client, print_timing_summary
+
+try:  # optional: C parser, used when installed
+    import lxml.html as lxml_html
+except ImportError:  # pragma: no cover - depends on environment
+    lxml_html = None
+
+
+DAILYFACEOFF_HOST = "www.dailyfaceoff.com"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+PP_HEADINGS = {"pp1": "1st Powerplay Unit", "pp2": "2nd Powerplay Unit"}
+
+_ANCHOR_RE = re.compile(r"<a\b[^>]*>(.*?)</a\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def fetch_team_page(team_slug: str, client: Optional[HttpClient] = None) -> str:
+    """GET one team's line-combinations page (rate limit + retries come from the client)."""
+    url = f"https://{DAILYFACEOFF_HOST}/teams/{team_slug}/line-combinations/"
+    r = (client or default_client()).get(url, headers=HEADERS, timeout=20)
+    r.raise_for_status()
+    return r.text
+
+
+def _heading_re(heading_text: str) -> re.Pattern:
+    # The heading is a text node whose stripped content is exactly heading_text
+    return re.compile(r">\s*" + re.escape(heading_text) + r"\s*<")
+
+
+def _extract_regex(html: str, n: int = 5) -> dict:
     """
-    Scrape DailyFaceoff line-combinations page for one team and return PP1/PP2 lists.
+    Targeted extractor: find each heading in the raw HTML, then read the next
+    n non-empty <a>...</a> texts after it. No DOM is built.
     """
-    url = f"https://www.dailyfaceoff.com/teams/{team_slug}/line-combinations/"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    r = requests.get(url, headers=headers, timeout=20)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    out = {}
+    for key, heading_text in PP_HEADINGS.items():
+        m = _heading_re(heading_text).search(html)
+        players: list[str] = []
+        if m:
+            for a in _ANCHOR_RE.finditer(html, m.end()):
+                name = html_lib.unescape(_TAG_RE.sub("", a.group(1))).strip()
+                if name:
+                    players.append(name)
+                if len(players) == n:
+                    break
+        out[key] = players
+    return out
+
+
+def _extract_lxml(html: str, n: int = 5) -> dict:
+    """Same contract as the BeautifulSoup parser, on the lxml C parser."""
+    doc = lxml_html.fromstring(html)
+    out = {}
+    for key, heading_text in PP_HEADINGS.items():
+        players: list[str] = []
+        hits = doc.xpath("//*[text()[normalize-space(.)=$t]]", t=heading_text)
+        if hits:
+            parent = hits[0]
+            for el in parent.xpath("descendant::a | following::a"):
+                name = el.text_content().strip()
+                if name:
+                    players.append(name)
+                if len(players) == n:
+                    break
+        out[key] = players
+    return out
+
+
+def _extract_bs4(html: str) -> dict:
+    """Reference implementation (full html.parser DOM)."""
+    soup = BeautifulSoup(html, "html.parser")
 
     def grab_five_after_heading(heading_text: str) -> list[str]:
         heading = soup.find(string=lambda s: isinstance(s, str) and s.strip() == heading_text)
@@ -27,11 +118,79 @@ def scrape_powerplay_units(team_slug: str) -> dict:
         return players
 
     return {
-        "team_slug": team_slug,
         "pp1": grab_five_after_heading("1st Powerplay Unit"),
         "pp2": grab_five_after_heading("2nd Powerplay Unit"),
     }
 
+
+PP_EXTRACTORS = {
+    "regex": _extract_regex,
+    "lxml": _extract_lxml,
+    "bs4": _extract_bs4,
+}
+
+
+def parse_powerplay_units(html: str, backend: str = "auto") -> dict:
+    """
+    Extract PP1/PP2 player lists from a line-combinations page.
+
+    backend="auto" uses the targeted regex extractor and falls back to the full
+    DOM (lxml if installed, else BeautifulSoup) if it finds no units at all,
+    e.g. after a markup change.
+    """
+    if backend != "auto":
+        if backend == "lxml" and lxml_html is None:
+            raise RuntimeError("backend='lxml' requested but lxml is not installed")
+        return PP_EXTRACTORS[backend](html)
+
+    res = _extract_regex(html)
+    if res["pp1"] or res["pp2"]:
+        return res
+    return _extract_lxml(html) if lxml_html is not None else _extract_bs4(html)
+
+
+def benchmark_pp_extractors(html_paths: list[Path], repeat: int = 3) -> pd.DataFrame:
+    """
+    Validate every available extractor against the BeautifulSoup reference on
+    saved pages and time them. Returns one row per (backend, page).
+    """
+    backends = [b for b in PP_EXTRACTORS if b != "lxml" or lxml_html is not None]
+    rows = []
+    for path in html_paths:
+        html = Path(path).read_text(encoding="utf-8")
+        reference = _extract_bs4(html)
+        for backend in backends:
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                res = PP_EXTRACTORS[backend](html)
+                best = min(best, time.perf_counter() - t0)
+            rows.append({
+                "page": Path(path).name,
+                "backend": backend,
+                "ms": round(best * 1000.0, 2),
+                "matches_bs4": res == reference,
+                "pp1_len": len(res["pp1"]),
+                "pp2_len": len(res["pp2"]),
+            })
+    return pd.DataFrame(rows)
+
+
+def scrape_powerplay_units(
+    team_slug: str,
+    client: Optional[HttpClient] = None,
+    save_html_dir: Optional[Path] = None,
+) -> dict:
+    """
+    Scrape DailyFaceoff line-combinations page for one team and return PP1/PP2 lists.
+    save_html_dir keeps the raw page (fixtures for benchmark_pp_extractors).
+    """
+    html = fetch_team_page(team_slug, client=client)
+    if save_html_dir is not None:
+        save_html_dir.mkdir(parents=True, exist_ok=True)
+        (save_html_dir / f"{team_slug}.html").write_text(html, encoding="utf-8")
+    return {"team_slug": team_slug, **parse_powerplay_units(html)}
+
 def rows_from_pp(team_abbrev: str, pp1: list[str], pp2: list[str]) -> list[dict]:
     rows = []
     for name in pp1:
@@ -40,13 +199,49 @@ def rows_from_pp(team_abbrev: str, pp1: list[str], pp2: list[str]) -> list[dict]
         rows.append({"player": name, "team": team_abbrev, "pp_unit": 2})
     return rows
 
-def scrape_all_teams_pp(target_date: str, slug_to_abbrev: dict[str, str], sleep_s: float = 0.8) -> pd.DataFrame:
+def scrape_all_teams_pp(
+    target_date: str,
+    slug_to_abbrev: dict[str, str],
+    sleep_s: float = 0.8,
+    max_workers: int = 6,
+    teams: Optional[set[str]] = None,
+    inputs_dir: Optional[Path] = None,
+    save_html_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Scrape PP units for every team in slug_to_abbrev (or only `teams`, by abbrev)
+    and write inputs/dailyfaceoff_pp_{target_date}.csv.
+
+    sleep_s keeps its old meaning as the politeness budget: at most one request
+    per sleep_s seconds on average (token bucket), shared by all workers.
+    """
+    inputs_dir = Path(inputs_dir or _project_root() / "inputs")
+    inputs_dir.mkdir(parents=True, exist_ok=True)
+
+    todo = {slug: abbrev for slug, abbrev in slug_to_abbrev.items() if teams is None or abbrev in teams}
+    client = default_client()
+    client.set_limits(
+        DAILYFACEOFF_HOST,
+        HostLimits(max_in_flight=max_workers, rate=1.0 / sleep_s if sleep_s > 0 else None, burst=min(max_workers, 3)),
+    )
+
+    def scrape_one(item: tuple[str, str]) -> tuple[str, str, Optional[dict], Optional[str]]:
+        slug, abbrev = item
+        try:
+            res = scrape_powerplay_units(slug, client=client, save_html_dir=save_html_dir)
+            return slug, abbrev, res, None
+        except Exception as e:
+            return slug, abbrev, None, str(e)
+
     all_rows = []
     errors = []
 
-    for slug, abbrev in slug_to_abbrev.items():
-        try:
-            res = scrape_powerplay_units(slug)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # map() keeps slug order -> deterministic output
+        for slug, abbrev, res, err in pool.map(scrape_one, todo.items()):
+            if err is not None:
+                errors.append({"team": abbrev, "slug": slug, "error": err})
+                continue
             pp1, pp2 = res["pp1"], res["pp2"]
 
             # Basic validation: expect 5 + 5
@@ -54,22 +249,28 @@ def scrape_all_teams_pp(target_date: str, slug_to_abbrev: dict[str, str], sleep_
                 errors.append({"team": abbrev, "slug": slug, "pp1_len": len(pp1), "pp2_len": len(pp2)})
             all_rows.extend(rows_from_pp(abbrev, pp1, pp2))
 
-            time.sleep(sleep_s)
-        except Exception as e:
-            errors.append({"team": abbrev, "slug": slug, "error": str(e)})
+    df = pd.DataFrame(all_rows, columns=["player", "team", "pp_unit"])
+    out_path = inputs_dir / f"dailyfaceoff_pp_{target_date}.csv"
+
+    # Partial refresh: keep previously scraped teams we didn't touch this time
+    if teams is not None and out_path.exists():
+        prev = pd.read_csv(out_path)
+        refreshed = set(df["team"])
+        df = pd.concat([prev[~prev["team"].isin(refreshed)], df], ignore_index=True)
+
+    df = df.drop_duplicates(subset=["player", "team", "pp_unit"])
 
-    df = pd.DataFrame(all_rows).drop_duplicates(subset=["player", "team", "pp_unit"])
     # Optional: store errors to inspect later
+    err_path = inputs_dir / f"dailyfaceoff_pp_errors_{target_date}.csv"
     if errors:
         err_df = pd.DataFrame(errors)
-        err_df.to_csv(f"inputs/dailyfaceoff_pp_errors_{target_date}.csv", index=False)
+        err_df.to_csv(err_path, index=False)
 
-    out_path = f"inputs/dailyfaceoff_pp_{target_date}.csv"
     df.to_csv(out_path, index=False)
     print(f"Saved: {out_path} ({len(df)} rows)")
 
     if errors:
-        print(f"Warnings: {len(errors)} teams had issues. See inputs/dailyfaceoff_pp_errors_{target_date}.csv")
+        print(f"Warnings: {len(errors)} teams had issues. See {err_path}")
 
     return df
 
@@ -110,6 +311,59 @@ slug_to_abbrev = {
     "winnipeg-jets": "WPG",
 }
 
-# Run it
-df_all = scrape_all_teams_pp("2025-12-28", slug_to_abbrev)
-print(df_all.head(10))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scrape DailyFaceoff PP units.")
+    parser.add_argument("--date", help="YYYY-MM-DD (names the output file)")
+    parser.add_argument(
+        "--only-playing",
+        action="store_true",
+        help="Only refresh teams on the NHL schedule for --date (merges into the existing file).",
+    )
+    parser.add_argument("--workers", type=int, default=6, help="Concurrent page fetches (default 6).")
+    parser.add_argument(
+        "--sleep",
+        type=float,
+        default=0.8,
+        help="Politeness budget: average seconds between requests to DailyFaceoff (default 0.8).",
+    )
+    parser.add_argument("--save-html", help="Directory to keep raw pages in (extractor fixtures).")
+    parser.add_argument(
+        "--bench",
+        help="Directory of saved *.html pages: validate + time the PP extractors, then exit.",
+    )
+    args = parser.parse_args()
+
+    if args.bench:
+        pages = sorted(Path(args.bench).glob("*.html"))
+        res = benchmark_pp_extractors(pages)
+        print(res.to_string(index=False))
+        print(res.groupby("backend")[["ms"]].sum().to_string())
+        return 0 if res["matches_bs4"].all() else 1
+
+    if not args.date:
+        parser.error("--date is required unless --bench is given")
+    target_date = args.date.strip()
+    teams = None
+    if args.only_playing:
+        from schedule_index import load_season_index
+
+        teams = load_season_index(target_date).teams_on(target_date)
+        print(f"Teams playing {target_date}: {sorted(teams)}")
+
+    df_all = scrape_all_teams_pp(
+        target_date,
+        slug_to_abbrev,
+        sleep_s=args.sleep,
+        max_workers=args.workers,
+        teams=teams,
+        save_html_dir=Path(args.save_html) if args.save_html else None,
+    )
+    print(df_all.head(10))
+    print_timing_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,29 +1,14 @@
 from __future__ import annotations
 
 from pathlib import Path
-import pandas as pd
 import numpy as np
-from unidecode import unidecode
-import re
 
-def normalize_name(name: str) -> str:
-    if not isinstance(name, str):
-        return ""
+from identity import load_registry
+from schemas import read_csv_schema
 
-    s = unidecode(name)          # remove accents
-    s = s.lower()
-
-    # remove anything in brackets like (NYR) or [NYR]
-    s = re.sub(r"[\(\[].*?[\)\]]", "", s)
-
-    # keep letters/spaces only
-    s = re.sub(r"[^a-z\s]", " ", s)
-
-    # collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
-
-    return s
 
+def project_root() -> Path:
+    return Path(__file__).resolve().parents[2]
 
 
 def main() -> None:
@@ -38,12 +23,15 @@ def main() -> None:
     if not odds_path.exists():
         raise FileNotFoundError(odds_path)
 
-    stats = pd.read_csv(stats_path)
-    odds = pd.read_csv(odds_path)
+    stats = read_csv_schema(stats_path, "player_signal_table")
+    odds = read_csv_schema(odds_path, "odds_anytime")
 
-    # Normalize names for join
-    stats["player_key"] = stats["name"].map(normalize_name)
-    odds["player_key"] = odds["player_name"].map(normalize_name)
+    # Resolve both sides to NHL playerIds (MoneyPuck registry) and join on the id
+    registry = load_registry(root / "data" / "raw" / "skaters.csv")
+    stats["player_key"] = registry.resolve_frame(stats, "name", "team", source="signal_table")
+    odds["player_key"] = registry.resolve_frame(odds, "player_name", source="odds_api")
+    stats = stats.dropna(subset=["player_key"]).drop_duplicates("player_key")
+    odds = odds.dropna(subset=["player_key"])
 
     # Implied probability from decimal odds
     odds["implied_prob"] = 1.0 / odds["price_decimal"]
@@ -0,0 +1,221 @@
+"""
+feature_matrix.py
+-----------------
+Compact, memory-mapped season feature matrix built from the MoneyPuck skaters table.
+
+The model only needs a handful of MoneyPuck columns. This module materializes them once:
+
+  data/cache/features/<skaters stem>/
+    features.npy        float32, shape (n_features, n_rows)  (one contiguous row per feature)
+    player_id.npy       int32
+    name_code.npy       int32   -> vocab["names"]
+    team_code.npy       int16   -> vocab["teams"]
+    situation_code.npy  int8    -> vocab["situations"]
+    vocab.json          vocabularies, feature names, source fingerprint
+
+Loading uses np.load(mmap_mode="r"): nothing is copied, startup is milliseconds, and
+several processes (backtests) share the same OS page cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar import read_schema
+from skaters_cache import ensure_skaters_cache, load_skaters_cached
+
+
+FEATURE_COLUMNS = ["games_played", "icetime", "I_F_xGoals", "I_F_goals"]
+ID_COLUMNS = ["playerId", "name", "team", "situation"]
+VOCAB_FILE = "vocab.json"
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_features_root() -> Path:
+    return _project_root() / "data" / "cache" / "features"
+
+
+@dataclass(frozen=True)
+class SeasonFeatures:
+    features: np.ndarray          # (n_features, n_rows) float32, memory-mapped
+    feature_names: list[str]
+    player_id: np.ndarray         # (n_rows,) int32
+    name_code: np.ndarray         # (n_rows,) int32
+    team_code: np.ndarray         # (n_rows,) int16
+    situation_code: np.ndarray    # (n_rows,) int8
+    names: np.ndarray             # vocab arrays (str)
+    teams: np.ndarray
+    situations: np.ndarray
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.player_id.shape[0])
+
+    def column(self, name: str) -> np.ndarray:
+        """One feature as a zero-copy float32 view."""
+        return self.features[self.feature_names.index(name)]
+
+    def team_codes_for(self, teams: set[str]) -> np.ndarray:
+        return np.flatnonzero(np.isin(self.teams, list(teams))).astype(np.int16)
+
+    def rows_for(self, teams: Optional[set[str]] = None, situations: Optional[set[str]] = None) -> np.ndarray:
+        """Boolean row mask for these teams / situations (None = all), from the code arrays only."""
+        mask = np.ones(self.n_rows, dtype=bool)
+        if situations is not None:
+            mask &= np.isin(self.situation_code, np.flatnonzero(np.isin(self.situations, list(situations))))
+        if teams is not None:
+            mask &= np.isin(self.team_code, self.team_codes_for(teams))
+        return mask
+
+    def situation_mask(self, situation: str) -> np.ndarray:
+        hits = np.flatnonzero(self.situations == situation)
+        if hits.size == 0:
+            return np.zeros(self.n_rows, dtype=bool)
+        return self.situation_code == hits[0]
+
+    def to_frame(self, mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Decode (a subset of) rows into the MoneyPuck-shaped DataFrame the runners use.
+        Only the masked rows are copied out of the memory map, so pass a mask (rows_for).
+        Features are widened to float64 for the arithmetic, but they were stored as
+        float32: values can differ from the CSV path around the 7th significant digit.
+        """
+        idx = slice(None) if mask is None else mask
+        data = {
+            "playerId": np.asarray(self.player_id[idx], dtype=np.int64),
+            "name": self.names[self.name_code[idx]].astype(object),
+            "team": self.teams[self.team_code[idx]].astype(object),
+            "situation": self.situations[self.situation_code[idx]].astype(object),
+        }
+        for i, name in enumerate(self.feature_names):
+            data[name] = np.asarray(self.features[i, idx], dtype=np.float64)
+        return pd.DataFrame(data)
+
+
+def _codes(values: pd.Series, dtype: type) -> tuple[np.ndarray, np.ndarray]:
+    codes, uniques = pd.factorize(values.astype(object).fillna("").astype(str), sort=True)
+    return codes.astype(dtype), np.asarray(uniques, dtype=str)
+
+
+def feature_dir_for(csv_path: Path, out_root: Optional[Path] = None) -> Path:
+    """Where the feature matrix for csv_path lives."""
+    return (out_root or default_features_root()) / Path(csv_path).stem
+
+
+def build_season_features(
+    csv_path: Path,
+    out_root: Optional[Path] = None,
+) -> Path:
+    """Materialize the feature matrix for a skaters CSV and return its directory."""
+    csv_path = Path(csv_path)
+    out_dir = feature_dir_for(csv_path, out_root)
+
+    cache_dir = ensure_skaters_cache(csv_path)
+    source = (read_schema(cache_dir) or {}).get("meta", {}).get("source", {})
+
+    mp = load_skaters_cached(csv_path, columns=ID_COLUMNS + FEATURE_COLUMNS)
+
+    name_code, names = _codes(mp["name"], np.int32)
+    team_code, teams = _codes(mp["team"], np.int16)
+    situation_code, situations = _codes(mp["situation"], np.int8)
+    features = np.ascontiguousarray(
+        mp[FEATURE_COLUMNS].to_numpy(dtype=np.float32, na_value=np.nan).T
+    )
+    player_id = pd.to_numeric(mp["playerId"], errors="coerce").fillna(-1).to_numpy(dtype=np.int32)
+
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = out_dir.parent / f".{out_dir.name}.{uuid.uuid4().hex}.tmp"
+    tmp_dir.mkdir()
+    try:
+        np.save(tmp_dir / "features.npy", features)
+        np.save(tmp_dir / "player_id.npy", player_id)
+        np.save(tmp_dir / "name_code.npy", name_code)
+        np.save(tmp_dir / "team_code.npy", team_code)
+        np.save(tmp_dir / "situation_code.npy", situation_code)
+        vocab = {
+            "feature_names": FEATURE_COLUMNS,
+            "names": names.tolist(),
+            "teams": teams.tolist(),
+            "situations": situations.tolist(),
+            "source_sha1": source.get("sha1"),
+        }
+        (tmp_dir / VOCAB_FILE).write_text(json.dumps(vocab), encoding="utf-8")
+
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return out_dir
+
+
+def open_season_features(feature_dir: Path) -> SeasonFeatures:
+    """Open a built feature directory zero-copy (mmap)."""
+    feature_dir = Path(feature_dir)
+    vocab = json.loads((feature_dir / VOCAB_FILE).read_text(encoding="utf-8"))
+    return SeasonFeatures(
+        features=np.load(feature_dir / "features.npy", mmap_mode="r"),
+        feature_names=list(vocab["feature_names"]),
+        player_id=np.load(feature_dir / "player_id.npy", mmap_mode="r"),
+        name_code=np.load(feature_dir / "name_code.npy", mmap_mode="r"),
+        team_code=np.load(feature_dir / "team_code.npy", mmap_mode="r"),
+        situation_code=np.load(feature_dir / "situation_code.npy", mmap_mode="r"),
+        names=np.asarray(vocab["names"], dtype=str),
+        teams=np.asarray(vocab["teams"], dtype=str),
+        situations=np.asarray(vocab["situations"], dtype=str),
+    )
+
+
+def load_season_features(
+    csv_path: Path,
+    out_root: Optional[Path] = None,
+    rebuild: bool = False,
+) -> SeasonFeatures:
+    """
+    Open the season feature matrix for csv_path, (re)building it when the source
+    CSV changed (same fingerprint as the skaters cache) or when asked to.
+    """
+    csv_path = Path(csv_path)
+    feature_dir = feature_dir_for(csv_path, out_root)
+
+    if not rebuild and (feature_dir / VOCAB_FILE).exists():
+        source = (read_schema(ensure_skaters_cache(csv_path)) or {}).get("meta", {}).get("source", {})
+        vocab = json.loads((feature_dir / VOCAB_FILE).read_text(encoding="utf-8"))
+        if vocab.get("source_sha1") and vocab.get("source_sha1") == source.get("sha1"):
+            return open_season_features(feature_dir)
+
+    return open_season_features(build_season_features(csv_path, out_root=out_root))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the memory-mapped season feature matrix.")
+    parser.add_argument("--csv", default=str(_project_root() / "data" / "raw" / "skaters.csv"))
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    sf = load_season_features(Path(args.csv), rebuild=args.rebuild)
+    print(
+        f"Features ready: rows={sf.n_rows}, features={sf.feature_names}, "
+        f"teams={len(sf.teams)}, players={len(sf.names)}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,53 +1,60 @@
 import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
 import requests
 
+import log_store
+from http_cache import FINAL_GAME_STATES, nhl_api_cache
+from http_client import HostLimits, HttpClient, default_client, print_timing_summary
+from names import normalize_names
+from schedule_index import load_season_index
 
-def normalize_name(name: str) -> str:
-    """
-    Normalize player names so you can merge outcomes with predictions reliably.
-    This is a simple version; you can expand it later (accents, suffixes, etc.).
-    """
-    if not isinstance(name, str):
-        return ""
-    return (
-        name.strip()
-        .lower()
-        .replace(".", "")
-        .replace("-", " ")
-        .replace("’", "'")
-    )
 
+NHL_API_HOST = "api-web.nhle.com"
+DEFAULT_MAX_IN_FLIGHT = 8
+OUTCOME_KEYS = ["game_id", "player_id"]
 
-def nhl_get_json(url: str, timeout: int = 30) -> dict:
-    """Small wrapper around requests.get() with a user-agent and basic error handling."""
-    headers = {"User-Agent": "nhlscorer/1.0 (outcomes collector)"}
-    r = requests.get(url, headers=headers, timeout=timeout)
-    r.raise_for_status()
-    return r.json()
 
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
 
-def get_game_ids_for_date(target_date: str) -> list[int]:
+
+def default_dataset_root() -> Path:
+    # Partitioned outcomes live at data/processed/outcomes/<date>/ (log_store layout)
+    return _project_root() / "data" / "processed"
+
+
+def nhl_get_json(
+    url: str,
+    timeout: int = 30,
+    client: Optional[HttpClient] = None,
+    use_cache: bool = True,
+) -> dict:
     """
-    Fetch NHL game IDs for a given date (YYYY-MM-DD) from NHL schedule endpoint.
+    GET a JSON endpoint over the shared pooled client (keep-alive, retries).
+    By default goes through the on-disk HTTP cache: finished-game boxscores are
+    immutable, so backfills never download the same game twice.
     """
-    url = f"https://api-web.nhle.com/v1/schedule/{target_date}"
-    data = nhl_get_json(url)
+    if use_cache:
+        return nhl_api_cache().get_json(url, client=client, timeout=timeout)
+    return (client or default_client()).get_json(url, timeout=timeout)
 
-    # The schedule response groups games into "gameWeek" days.
-    game_ids: list[int] = []
-    for day in data.get("gameWeek", []):
-        if day.get("date") != target_date:
-            continue
-        for g in day.get("games", []):
-            gid = g.get("id")
-            if isinstance(gid, int):
-                game_ids.append(gid)
 
-    return game_ids
+def get_game_ids_for_date(target_date: str) -> list[int]:
+    """
+    NHL game IDs for a given date (YYYY-MM-DD), from the season schedule index
+    (built once per season, see schedule_index.py).
+    """
+    return load_season_index(target_date).game_ids_on(target_date)
 
 
 def parse_boxscore_player_goals(box: dict, target_date: str, game_id: int) -> list[dict]:
@@ -81,7 +88,6 @@ def parse_boxscore_player_goals(box: dict, target_date: str, game_id: int) -> li
                 "team": str(team_abbr).upper(),
                 "player_id": player_id,          # <-- add this
                 "player": name,
-                "player_norm": normalize_name(name),
                 "goals": int(goals) if goals is not None else 0,
             })
 
@@ -90,25 +96,70 @@ def parse_boxscore_player_goals(box: dict, target_date: str, game_id: int) -> li
 
 
 
-def fetch_outcomes_for_date(target_date: str) -> pd.DataFrame:
+@dataclass(frozen=True)
+class BoxscoreFetch:
+    game_id: int
+    box: dict
+    elapsed_ms: float
+
+
+def fetch_boxscores(
+    game_ids: list[int],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    client: Optional[HttpClient] = None,
+) -> list[BoxscoreFetch]:
+    """
+    Download boxscores concurrently (at most max_in_flight at once, further capped
+    by the client's per-host limit) over the shared pooled client. Results come
+    back in game_ids order regardless of completion order.
+    """
+
+    def fetch_one(gid: int) -> BoxscoreFetch:
+        box_url = f"https://api-web.nhle.com/v1/gamecenter/{gid}/boxscore"
+        t0 = time.perf_counter()
+        box = nhl_get_json(box_url, client=client)
+        return BoxscoreFetch(gid, box, (time.perf_counter() - t0) * 1000.0)
+
+    if len(game_ids) <= 1 or max_in_flight <= 1:
+        return [fetch_one(gid) for gid in game_ids]
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(game_ids))) as pool:
+        # map() yields in input order -> deterministic output
+        return list(pool.map(fetch_one, game_ids))
+
+
+def fetch_outcomes_for_date(
+    target_date: str,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    client: Optional[HttpClient] = None,
+    timings: Optional[list[dict]] = None,
+) -> pd.DataFrame:
     """
     Main collector:
     - gets game IDs
-    - downloads each boxscore
+    - downloads the boxscores concurrently (bounded by max_in_flight)
     - extracts goals for every player
+
+    Pass a list as `timings` to receive per-game latency ({game_id, elapsed_ms}).
     """
     game_ids = get_game_ids_for_date(target_date)
 
     all_rows: list[dict] = []
-    for gid in game_ids:
-        box_url = f"https://api-web.nhle.com/v1/gamecenter/{gid}/boxscore"
-        box = nhl_get_json(box_url)
-        all_rows.extend(parse_boxscore_player_goals(box, target_date, gid))
+    for res in fetch_boxscores(game_ids, max_in_flight=max_in_flight, client=client):
+        if timings is not None:
+            timings.append({"game_id": res.game_id, "elapsed_ms": round(res.elapsed_ms, 1)})
+        all_rows.extend(parse_boxscore_player_goals(res.box, target_date, res.game_id))
 
+    return _outcomes_frame(all_rows)
+
+
+def _outcomes_frame(all_rows: list[dict]) -> pd.DataFrame:
+    """Rows from parse_boxscore_player_goals -> the outcomes table."""
     if not all_rows:
         return pd.DataFrame(columns=["date", "game_id", "team", "player", "player_norm", "goals"])
 
     df = pd.DataFrame(all_rows)
+    df["player_norm"] = normalize_names(df["player"])
 
     # Combine duplicates safely (sometimes payload can include repeated entries)
     df = (
@@ -126,22 +177,170 @@ def fetch_outcomes_for_date(target_date: str) -> pd.DataFrame:
     return df
 
 
+def save_outcomes(target_date: str, df: pd.DataFrame, dataset_root: Optional[Path] = None) -> int:
+    """Append one date's outcomes to the partitioned dataset and compact it. Returns rows kept."""
+    root = Path(dataset_root or default_dataset_root())
+    log_store.append_run("outcomes", target_date, df, root=root)
+    return log_store.compact_date("outcomes", target_date, root=root, keys=OUTCOME_KEYS)
+
+
+# -----------------------------
+# Date-range backfill
+# -----------------------------
+
+def _load_checkpoint(path: Path) -> set[str]:
+    if not path.exists():
+        return set()
+    return set(json.loads(path.read_text(encoding="utf-8")).get("done", []))
+
+
+def _save_checkpoint(path: Path, done: set[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.parent / f".{path.name}.tmp"
+    tmp.write_text(json.dumps({"done": sorted(done)}, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _date_range(start: str, end: str) -> list[str]:
+    return [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end, freq="D")]
+
+
+def backfill_outcomes(
+    start: str,
+    end: str,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    dataset_root: Optional[Path] = None,
+    force: bool = False,
+) -> dict[str, int]:
+    """
+    Collect outcomes for every date in [start, end] into the partitioned dataset
+    (data/processed/outcomes/<date>/), resumable via a checkpoint file.
+
+    - Dates in the checkpoint are skipped (unless force=True)
+    - Boxscores for all pending dates share one pool of max_in_flight requests
+    - A date is written (and checkpointed) as soon as all of its games are in;
+      it is only checkpointed once every game is final, so today's slate is
+      picked up again on the next run
+    Returns {date: rows_written}.
+    """
+    root = Path(dataset_root or default_dataset_root())
+    checkpoint_path = root / "outcomes" / "_checkpoint.json"
+    done = set() if force else _load_checkpoint(checkpoint_path)
+
+    pending = [d for d in _date_range(start, end) if d not in done]
+    games_by_date = {d: get_game_ids_for_date(d) for d in pending}
+
+    written: dict[str, int] = {}
+    for d in [d for d in pending if not games_by_date[d]]:
+        done.add(d)  # no games scheduled
+        written[d] = 0
+    _save_checkpoint(checkpoint_path, done)
+
+    remaining = {d: len(gids) for d, gids in games_by_date.items() if gids}
+    rows: dict[str, list[dict]] = {d: [] for d in remaining}
+    final: dict[str, bool] = {d: True for d in remaining}
+
+    def fetch_one(d: str, gid: int) -> tuple[str, int, dict]:
+        box_url = f"https://api-web.nhle.com/v1/gamecenter/{gid}/boxscore"
+        return d, gid, nhl_get_json(box_url)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = [pool.submit(fetch_one, d, gid) for d, gids in games_by_date.items() for gid in gids]
+        for fut in as_completed(futures):
+            try:
+                d, gid, box = fut.result()
+            except (requests.RequestException, json.JSONDecodeError, OSError) as e:
+                # Network error, bad payload or unreadable cache entry: this game
+                # stays missing, so its date stays incomplete and is retried
+                print(f"[warn] boxscore fetch failed: {type(e).__name__}: {e}")
+                continue
+
+            rows[d].extend(parse_boxscore_player_goals(box, d, gid))
+            final[d] = final[d] and box.get("gameState") in FINAL_GAME_STATES
+            remaining[d] -= 1
+            if remaining[d] > 0:
+                continue
+
+            df = _outcomes_frame(rows.pop(d))
+            save_outcomes(d, df, dataset_root=root)
+            written[d] = len(df)
+            if final[d]:
+                done.add(d)
+                _save_checkpoint(checkpoint_path, done)
+
+    incomplete = sorted(d for d, n in remaining.items() if n > 0)
+    if incomplete:
+        print(f"[warn] {len(incomplete)} dates incomplete (will retry next run): {incomplete}")
+
+    return dict(sorted(written.items()))
+
+
+def load_outcomes(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    dataset_root: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Outcomes for start <= date <= end from the partitioned dataset."""
+    root = Path(dataset_root or default_dataset_root())
+    return log_store.read_range("outcomes", start=start, end=end, root=root)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Fetch actual goals per player from NHL API.")
-    parser.add_argument("--date", required=True, help="YYYY-MM-DD (game date)")
+    parser.add_argument("--date", help="YYYY-MM-DD (game date)")
+    parser.add_argument("--start", help="Backfill: first date YYYY-MM-DD (inclusive)")
+    parser.add_argument("--end", help="Backfill: last date YYYY-MM-DD (inclusive)")
+    parser.add_argument("--force", action="store_true", help="Backfill: ignore the checkpoint.")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help=f"Max concurrent boxscore requests (default {DEFAULT_MAX_IN_FLIGHT}).",
+    )
     args = parser.parse_args()
 
+    default_client().set_limits(NHL_API_HOST, HostLimits(max_in_flight=args.max_in_flight))
+
+    if args.start or args.end:
+        if not (args.start and args.end) or args.date:
+            parser.error("use either --date, or both --start and --end")
+        t0 = time.perf_counter()
+        written = backfill_outcomes(
+            args.start.strip(), args.end.strip(), max_in_flight=args.max_in_flight, force=args.force
+        )
+        wall_s = time.perf_counter() - t0
+        print(
+            f"Backfill: {len(written)} dates, {sum(written.values())} rows "
+            f"-> {default_dataset_root() / 'outcomes'} ({wall_s:.1f} s)"
+        )
+        print_timing_summary()
+        return 0
+
+    if not args.date:
+        parser.error("--date (or --start/--end) is required")
     target_date = args.date.strip()
 
-    df = fetch_outcomes_for_date(target_date)
+    timings: list[dict] = []
+    t0 = time.perf_counter()
+    df = fetch_outcomes_for_date(target_date, max_in_flight=args.max_in_flight, timings=timings)
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+
+    for t in timings:
+        print(f"  game {t['game_id']}: {t['elapsed_ms']:.0f} ms")
+    if timings:
+        total_ms = sum(t["elapsed_ms"] for t in timings)
+        print(f"Boxscores: {len(timings)} games, {total_ms:.0f} ms summed, {wall_ms:.0f} ms wall")
+    print_timing_summary()
 
-    out_dir = Path("data") / "processed"
-    out_dir.mkdir(parents=True, exist_ok=True)
+    # The dataset is what backtest.py, sweep.py, parlay_pricer.py and warehouse.py read;
+    # the CSV is a per-date export for inspection
+    out_dir = default_dataset_root()
+    kept = save_outcomes(target_date, df, dataset_root=out_dir)
 
     out_path = out_dir / f"actual_goals_{target_date}.csv"
     df.to_csv(out_path, index=False)
 
-    print(f"Saved outcomes: {out_path}  (rows={len(df)})")
+    print(f"Saved outcomes: {out_dir / 'outcomes' / target_date} (rows={kept}), {out_path}")
     return 0
 
 
@@ -0,0 +1,292 @@
+"""
+http_cache.py
+-------------
+Persistent on-disk HTTP cache for JSON endpoints (api-web.nhle.com).
+
+Freshness rules, in order:
+1) A matching policy can declare a payload immutable (finished-game boxscores,
+   schedule weeks where every game is final) -> cached forever
+2) Otherwise the policy TTL applies (schedule/now is short-lived)
+3) Without a policy, the response's Cache-Control max-age is honored
+   (no-store -> not stored, no-cache -> always revalidated)
+
+Stale entries are revalidated with If-None-Match / If-Modified-Since, so an
+unchanged payload costs a 304 instead of a full download.
+
+Layout (LOCAL ONLY):
+  data/cache/http/<sha256>.body        raw response bytes
+  data/cache/http/<sha256>.meta.json   url, validators, expiry
+The body files are bounded by max_bytes with LRU eviction (hits touch mtime).
+One HttpCache is shared by thread pools (fetch_outcomes.py): counters and eviction
+run under a lock, and a body evicted between the freshness check and the read is
+treated as a miss.
+Writes update a running size total, so the directory is only scanned when that
+total passes max_bytes, on the first write, and every evict_every writes (to pick
+up files written by other processes).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode, urlparse
+
+from http_client import HttpClient, default_client
+
+
+FINAL_GAME_STATES = {"OFF", "FINAL"}
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_http_cache_root() -> Path:
+    return _project_root() / "data" / "cache" / "http"
+
+
+# -----------------------------
+# Policies
+# -----------------------------
+
+def _boxscore_is_final(payload: Any) -> bool:
+    return isinstance(payload, dict) and payload.get("gameState") in FINAL_GAME_STATES
+
+
+def _schedule_week_is_final(payload: Any) -> bool:
+    if not isinstance(payload, dict):
+        return False
+    games = [g for day in payload.get("gameWeek", []) for g in day.get("games", [])]
+    return bool(games) and all(g.get("gameState") in FINAL_GAME_STATES for g in games)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    pattern: str                                        # regex matched against the URL path
+    ttl_s: float                                        # freshness lifetime for mutable payloads
+    immutable_if: Optional[Callable[[Any], bool]] = None  # payload -> cache forever?
+
+    def matches(self, url: str) -> bool:
+        return re.search(self.pattern, urlparse(url).path) is not None
+
+
+NHL_API_POLICIES: list[CachePolicy] = [
+    CachePolicy(r"/v1/schedule/now$", ttl_s=300),
+    CachePolicy(r"/v1/schedule/\d{4}-\d{2}-\d{2}$", ttl_s=6 * 3600, immutable_if=_schedule_week_is_final),
+    CachePolicy(r"/v1/gamecenter/\d+/boxscore$", ttl_s=60, immutable_if=_boxscore_is_final),
+]
+
+
+def _max_age(cache_control: str) -> Optional[float]:
+    m = re.search(r"(?:s-maxage|max-age)=(\d+)", cache_control or "")
+    return float(m.group(1)) if m else None
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+
+class HttpCache:
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        policies: Optional[list[CachePolicy]] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        user_agent: str = "nhlscorer/1.0",
+        client: Optional[HttpClient] = None,
+        evict_every: int = 256,
+    ):
+        self.root = Path(root or default_http_cache_root())
+        self.policies = NHL_API_POLICIES if policies is None else policies
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self.user_agent = user_agent
+        self.client = client
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0}
+        self._bytes: Optional[int] = None   # body bytes on disk as of the last scan, plus our writes since
+        self._writes = 0
+        self._lock = threading.RLock()
+
+    def _policy_for(self, url: str) -> Optional[CachePolicy]:
+        for policy in self.policies:
+            if policy.matches(url):
+                return policy
+        return None
+
+    @staticmethod
+    def _key(url: str, params: Optional[dict]) -> str:
+        full = url if not params else f"{url}?{urlencode(sorted(params.items()))}"
+        return hashlib.sha256(full.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.root / f"{key}.body", self.root / f"{key}.meta.json"
+
+    def _read_meta(self, key: str) -> Optional[dict]:
+        body_path, meta_path = self._paths(key)
+        if not body_path.exists() or not meta_path.exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _read_body(body_path: Path) -> Optional[bytes]:
+        """Body bytes (touching mtime for LRU), or None if another thread evicted it."""
+        try:
+            os.utime(body_path)
+            return body_path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        tmp = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _expires_at(self, url: str, payload: Any, headers: Any, now: float) -> Optional[float]:
+        """None = never expires. Returns `now` for must-revalidate entries."""
+        policy = self._policy_for(url)
+        if policy is not None:
+            if policy.immutable_if is not None and policy.immutable_if(payload):
+                return None
+            return now + policy.ttl_s
+
+        cache_control = headers.get("Cache-Control", "") if headers is not None else ""
+        if "no-cache" in cache_control:
+            return now
+        if "immutable" in cache_control:
+            return None
+        max_age = _max_age(cache_control)
+        return now + (max_age or 0.0)
+
+    def get_json(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        client: Optional[HttpClient] = None,
+        timeout: int = 30,
+    ) -> Any:
+        """GET url (JSON) through the cache; network requests go through the shared client."""
+        key = self._key(url, params)
+        body_path, meta_path = self._paths(key)
+        meta = self._read_meta(key)
+        now = time.time()
+
+        if meta is not None and (meta["expires_at"] is None or meta["expires_at"] > now):
+            body = self._read_body(body_path)
+            if body is not None:
+                self._count("hit")
+                return json.loads(body)
+            meta = None  # evicted meanwhile: fetch as a miss
+
+        headers = {"User-Agent": self.user_agent}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        client = client or self.client or default_client()
+        r = client.get(url, params=params, headers=headers, timeout=timeout)
+
+        if r.status_code == 304 and meta is not None:
+            body = self._read_body(body_path)
+            if body is not None:
+                payload = json.loads(body)
+                meta["expires_at"] = self._expires_at(url, payload, r.headers, now)
+                self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+                self._count("revalidated")
+                return payload
+            # Evicted while revalidating: fetch the full payload unconditionally
+            r = client.get(url, params=params, headers={"User-Agent": self.user_agent}, timeout=timeout)
+
+        r.raise_for_status()
+        self._count("miss")
+        payload = r.json()
+
+        if "no-store" in r.headers.get("Cache-Control", "") and self._policy_for(url) is None:
+            return payload
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = body_path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        self._write_atomic(body_path, r.content)
+        self._write_atomic(
+            meta_path,
+            json.dumps(
+                {
+                    "url": url,
+                    "params": params or {},
+                    "fetched_at": now,
+                    "expires_at": self._expires_at(url, payload, r.headers, now),
+                    "etag": r.headers.get("ETag"),
+                    "last_modified": r.headers.get("Last-Modified"),
+                }
+            ).encode("utf-8"),
+        )
+        self._track_write(len(r.content) - replaced)
+        return payload
+
+    def _track_write(self, delta: int) -> None:
+        """Account for one body write; scan and evict only when needed."""
+        with self._lock:
+            self._writes += 1
+            if self._bytes is None or self._writes % self.evict_every == 0:
+                self.evict()
+                return
+            self._bytes += delta
+            if self._bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until the bodies fit max_bytes."""
+        with self._lock:
+            if not self.root.exists():
+                self._bytes = 0
+                return 0
+            entries = []
+            for p in self.root.glob("*.body"):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, p))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, p in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                (p.parent / f"{p.stem}.meta.json").unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            self._bytes = total
+            return removed
+
+
+_DEFAULT_CACHE: Optional[HttpCache] = None
+
+
+def nhl_api_cache() -> HttpCache:
+    """Process-wide cache for api-web.nhle.com with the NHL policies."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = HttpCache()
+    return _DEFAULT_CACHE
@@ -0,0 +1,290 @@
+"""
+http_client.py
+--------------
+Shared HTTP client for every fetcher (NHL API, The Odds API, DailyFaceoff).
+
+What it does:
+- One pooled keep-alive requests.Session per host, so a morning run pays the
+  TLS handshake once per host instead of once per request
+- Per-host limits: max requests in flight (semaphore) and an optional
+  request rate (token bucket, for sites we scrape politely)
+- Retries 429 / 5xx and connection errors with exponential backoff + full
+  jitter; a Retry-After header, when present, wins over the computed delay
+- Records one timing entry per logical request (attempts, status, elapsed ms)
+- Offline work (see replay_server.py): NHLSCORER_RECORD_DIR saves every response
+  as a fixture, NHLSCORER_REPLAY_URL sends every request to the local stand-in
+  server instead (https://<host>/<path> -> <replay_url>/<host>/<path>)
+
+Usage:
+  client = default_client()
+  data = client.get_json("https://api-web.nhle.com/v1/schedule/now")
+  client.set_limits("www.dailyfaceoff.com", HostLimits(max_in_flight=4, rate=1.0))
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+USER_AGENT = "nhlscorer/1.0"
+RECORD_DIR_ENV = "NHLSCORER_RECORD_DIR"
+REPLAY_URL_ENV = "NHLSCORER_REPLAY_URL"
+
+# (original url, params, final response) -> None
+ResponseHook = Callable[[str, Optional[dict], requests.Response], None]
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` saved up."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass(frozen=True)
+class HostLimits:
+    max_in_flight: int = 8
+    rate: Optional[float] = None   # requests per second (None = unlimited)
+    burst: int = 1
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    retries: int = 3
+    backoff_s: float = 0.5
+    max_backoff_s: float = 30.0
+    max_retry_after_s: float = 120.0
+    statuses: frozenset = frozenset({429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after_s)
+        # Full jitter: spreads out workers that failed together
+        return random.uniform(0.0, min(self.max_backoff_s, self.backoff_s * (2 ** attempt)))
+
+
+DEFAULT_HOST_LIMITS: dict[str, HostLimits] = {
+    "api-web.nhle.com": HostLimits(max_in_flight=8),
+    "api.the-odds-api.com": HostLimits(max_in_flight=4),
+    "www.dailyfaceoff.com": HostLimits(max_in_flight=6, rate=1.25, burst=3),
+}
+
+
+@dataclass(frozen=True)
+class RequestTiming:
+    host: str
+    method: str
+    url: str
+    status: Optional[int]     # None = no response (connection error)
+    attempts: int
+    elapsed_ms: float         # wall time including backoff sleeps
+
+
+def _retry_after_s(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Host:
+    def __init__(self, limits: HostLimits, user_agent: str):
+        self.limits = limits
+        self.session = requests.Session()
+        # Retries are ours (with jitter/Retry-After), not urllib3's
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limits.max_in_flight, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": user_agent})
+        self.slots = threading.BoundedSemaphore(limits.max_in_flight)
+        self.bucket = TokenBucket(limits.rate, limits.burst) if limits.rate else None
+
+
+class HttpClient:
+    def __init__(
+        self,
+        host_limits: Optional[dict[str, HostLimits]] = None,
+        default_limits: HostLimits = HostLimits(),
+        retry: RetryPolicy = RetryPolicy(),
+        user_agent: str = USER_AGENT,
+        replay_base: Optional[str] = None,
+        on_response: Optional[ResponseHook] = None,
+    ):
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limits = default_limits
+        self.retry = retry
+        self.user_agent = user_agent
+        self.replay_base = replay_base.rstrip("/") if replay_base else None
+        self.on_response = on_response
+        self.timings: list[RequestTiming] = []
+        self._hosts: dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> _Host:
+        with self._lock:
+            h = self._hosts.get(host)
+            if h is None:
+                h = _Host(self.host_limits.get(host, self.default_limits), self.user_agent)
+                self._hosts[host] = h
+            return h
+
+    def set_limits(self, host: str, limits: HostLimits) -> None:
+        """Change a host's limits (takes effect for new requests; the pool is rebuilt)."""
+        with self._lock:
+            self.host_limits[host] = limits
+            old = self._hosts.pop(host, None)
+        if old is not None:
+            old.session.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: float = 30,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Send a request with the host's limits and retry policy. The last response
+        is returned even if it is an error status (callers raise_for_status());
+        a connection error that survives every retry is re-raised.
+        """
+        parsed = urlparse(url)
+        host = parsed.netloc
+        h = self._host(host)  # limits stay keyed on the real host, also in replay mode
+        target = url
+        if self.replay_base is not None:
+            target = f"{self.replay_base}/{host}{parsed.path}" + (f"?{parsed.query}" if parsed.query else "")
+        t0 = time.perf_counter()
+        resp: Optional[requests.Response] = None
+
+        for attempt in range(self.retry.retries + 1):
+            if h.bucket is not None:
+                h.bucket.acquire()
+            try:
+                with h.slots:
+                    resp = h.session.request(method, target, params=params, headers=headers, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retry.retries:
+                    self._record(host, method, url, None, attempt + 1, t0)
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                continue
+
+            if resp.status_code not in self.retry.statuses or attempt == self.retry.retries:
+                break
+            time.sleep(self.retry.delay(attempt, _retry_after_s(resp)))
+
+        self._record(host, method, url, resp.status_code, attempt + 1, t0)
+        if self.on_response is not None:
+            self.on_response(url, params, resp)
+        return resp
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def get_json(self, url: str, **kwargs: Any) -> Any:
+        resp = self.get(url, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+
+    def _record(self, host: str, method: str, url: str, status: Optional[int], attempts: int, t0: float) -> None:
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            self.timings.append(RequestTiming(host, method, url, status, attempts, elapsed_ms))
+
+    def timing_summary(self) -> list[dict]:
+        """Per-host request count, retries, errors and latency (ms)."""
+        with self._lock:
+            timings = list(self.timings)
+        by_host: dict[str, list[RequestTiming]] = {}
+        for t in timings:
+            by_host.setdefault(t.host, []).append(t)
+
+        out = []
+        for host, ts in sorted(by_host.items()):
+            ms = [t.elapsed_ms for t in ts]
+            out.append(
+                {
+                    "host": host,
+                    "requests": len(ts),
+                    "retries": sum(t.attempts - 1 for t in ts),
+                    "errors": sum(1 for t in ts if t.status is None or t.status >= 400),
+                    "p50_ms": round(statistics.median(ms), 1),
+                    "max_ms": round(max(ms), 1),
+                    "total_ms": round(sum(ms), 1),
+                }
+            )
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            hosts, self._hosts = list(self._hosts.values()), {}
+        for h in hosts:
+            h.session.close()
+
+
+_DEFAULT_CLIENT: Optional[HttpClient] = None
+
+
+def default_client() -> HttpClient:
+    """
+    Process-wide client shared by all fetchers (one connection pool per host).
+    Honors NHLSCORER_RECORD_DIR / NHLSCORER_REPLAY_URL (see module docstring).
+    """
+    global _DEFAULT_CLIENT
+    if _DEFAULT_CLIENT is None:
+        on_response = None
+        if os.getenv(RECORD_DIR_ENV):
+            from replay_server import FixtureStore
+
+            on_response = FixtureStore(os.environ[RECORD_DIR_ENV]).record
+        _DEFAULT_CLIENT = HttpClient(replay_base=os.getenv(REPLAY_URL_ENV), on_response=on_response)
+    return _DEFAULT_CLIENT
+
+
+def print_timing_summary(client: Optional[HttpClient] = None) -> None:
+    for row in (client or default_client()).timing_summary():
+        print(
+            f"[http] {row['host']}: {row['requests']} requests, {row['retries']} retries, "
+            f"{row['errors']} errors, p50 {row['p50_ms']:.0f} ms, max {row['max_ms']:.0f} ms"
+        )
@@ -0,0 +1,329 @@
+"""
+identity.py
+-----------
+Player identity registry: every source's (name, team) -> canonical NHL playerId.
+
+MoneyPuck's playerId is the NHL playerId (boxscores use the same ids), so the
+registry is built from MoneyPuck (or any frame with id/name/team) and other
+sources - Odds API player_name, DailyFaceoff, manual odds - are resolved onto it:
+
+1) alias table (persisted; manual entries win)
+2) exact normalized name (names.py), disambiguated by team for namesakes
+3) fuzzy: a character-trigram blocking index narrows candidates to players
+   sharing trigrams with the query (no full scan), then difflib scores the
+   handful of candidates. Accepted only above a threshold and with a clear
+   margin over the runner-up; accepted matches are remembered for this run
+
+Ambiguous or weak matches resolve to None: a missed join is better than a
+wrong one. Downstream joins then run on the integer playerId.
+
+Resolving never writes the alias table. Learned matches are persisted only
+through the explicit --save step below, only when they score at least
+--save-min-score, and always with the player's team.
+
+Alias table (LOCAL ONLY):
+  data/processed/player_aliases.csv   source, name_norm, team, player_id, method, score
+Add rows with method=manual to pin names the matcher gets wrong.
+
+Usage:
+  python core/data_pipeline/identity.py "Alex Ovechkin@WSH" "J. Hughes"
+  python core/data_pipeline/identity.py --csv data/raw/manual_odds.csv \
+      --name-col player --team-col team --source manual_odds --save
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from names import normalize_names
+
+
+ALIAS_COLUMNS = ["source", "name_norm", "team", "player_id", "method", "score", "added_at_utc"]
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_alias_path() -> Path:
+    return _project_root() / "data" / "processed" / "player_aliases.csv"
+
+
+def ensure_alias_file(path: Optional[Path] = None) -> Path:
+    """Create the alias table with just its header if missing (before starting concurrent writers)."""
+    path = Path(path or default_alias_path())
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+        tmp.write_text(",".join(ALIAS_COLUMNS) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+    return path
+
+
+def _trigrams(name_norm: str) -> set[str]:
+    padded = f"  {name_norm} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerRegistry:
+    def __init__(
+        self,
+        players: pd.DataFrame,
+        alias_path: Optional[Path] = None,
+        min_score: float = 0.85,
+        min_margin: float = 0.05,
+        max_candidates: int = 20,
+        save_min_score: float = 0.95,
+    ):
+        """
+        players: one row per (player_id, team) with columns player_id, name, team.
+        save_min_score: learned matches below this are used but never persisted.
+        """
+        self.alias_path = Path(alias_path or default_alias_path())
+        self.min_score = min_score
+        self.save_min_score = save_min_score
+        self.min_margin = min_margin
+        self.max_candidates = max_candidates
+
+        players = players.dropna(subset=["player_id"]).drop_duplicates(["player_id", "team"])
+        self.ids = players["player_id"].astype(np.int64).to_numpy()
+        self.norms = normalize_names(players["name"]).to_numpy()
+        self.teams = players["team"].astype(str).str.upper().to_numpy()
+
+        self.by_norm: dict[str, list[int]] = {}
+        self.by_trigram: dict[str, list[int]] = {}
+        for i, norm in enumerate(self.norms):
+            self.by_norm.setdefault(norm, []).append(i)
+            for g in _trigrams(norm):
+                self.by_trigram.setdefault(g, []).append(i)
+
+        self.aliases = self._load_aliases()
+        self._by_name: dict[tuple[str, str], set[int]] = {}
+        for (source, norm, _), pid in self.aliases.items():
+            self._by_name.setdefault((source, norm), set()).add(pid)
+        self._new_aliases: list[dict] = []
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        id_col: str = "playerId",
+        name_col: str = "name",
+        team_col: str = "team",
+        **kwargs,
+    ) -> "PlayerRegistry":
+        players = pd.DataFrame(
+            {"player_id": df[id_col].to_numpy(), "name": df[name_col].to_numpy(), "team": df[team_col].to_numpy()}
+        )
+        return cls(players, **kwargs)
+
+    # -----------------------------
+    # Aliases
+    # -----------------------------
+
+    def _load_aliases(self) -> dict[tuple[str, str, str], int]:
+        if not self.alias_path.exists():
+            return {}
+        df = pd.read_csv(self.alias_path, dtype={"team": str}, keep_default_na=False)
+        known = set(self.ids.tolist())
+        out: dict[tuple[str, str, str], int] = {}
+        # manual rows last so they override learned ones
+        df = df.assign(_manual=df["method"].eq("manual")).sort_values("_manual", kind="stable")
+        for row in df.itertuples(index=False):
+            pid = int(row.player_id)
+            if pid in known:
+                out[(row.source, row.name_norm, row.team)] = pid
+        return out
+
+    def _alias(self, source: str, norm: str, team: str) -> Optional[int]:
+        pid = self.aliases.get((source, norm, team))
+        if pid is None and team:
+            pid = self.aliases.get((source, norm, ""))
+        if pid is None and not team:
+            # Team-less query: any team's alias, if they all agree
+            pids = self._by_name.get((source, norm), set())
+            if len(pids) == 1:
+                pid = next(iter(pids))
+        return pid
+
+    def save_aliases(self) -> int:
+        """
+        Append aliases learned since load that score at least save_min_score.
+        Weaker matches are dropped. Returns the number written.
+        """
+        keep = [a for a in self._new_aliases if a["score"] >= self.save_min_score]
+        self._new_aliases = []
+        if not keep:
+            return 0
+        self.alias_path.parent.mkdir(parents=True, exist_ok=True)
+        new = pd.DataFrame(keep, columns=ALIAS_COLUMNS)
+        data = new.to_csv(index=False, header=not self.alias_path.exists()).encode("utf-8")
+        # One O_APPEND write, so rows from concurrent identity.py runs never interleave
+        fd = os.open(self.alias_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        return len(new)
+
+    # -----------------------------
+    # Resolution
+    # -----------------------------
+
+    def _pick(self, rows: list[int], team: str) -> Optional[int]:
+        """One player among rows (same name), using team for namesakes."""
+        pids = {int(self.ids[i]) for i in rows}
+        if len(pids) == 1:
+            return pids.pop()
+        if team:
+            on_team = {int(self.ids[i]) for i in rows if self.teams[i] == team}
+            if len(on_team) == 1:
+                return on_team.pop()
+        return None
+
+    def _fuzzy(self, norm: str, team: str) -> tuple[Optional[int], float, str]:
+        """(playerId or None, best score, team of the best-scoring row)."""
+        # Blocking: candidates share trigrams with the query; keep the best-overlapping few
+        counts = Counter(i for g in _trigrams(norm) for i in self.by_trigram.get(g, ()))
+        if not counts:
+            return None, 0.0, ""
+        candidates = [i for i, _ in counts.most_common(self.max_candidates)]
+        if team:
+            on_team = [i for i in candidates if self.teams[i] == team]
+            candidates = on_team or candidates
+
+        scored: dict[int, float] = {}
+        row_of: dict[int, int] = {}
+        for i in candidates:
+            s = difflib.SequenceMatcher(None, norm, self.norms[i]).ratio()
+            pid = int(self.ids[i])
+            if s > scored.get(pid, -1.0):
+                scored[pid] = s
+                row_of[pid] = i
+        ranked = sorted(scored.items(), key=lambda kv: kv[1], reverse=True)
+        best_pid, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best >= self.min_score and best - runner_up >= self.min_margin:
+            return best_pid, best, str(self.teams[row_of[best_pid]])
+        return None, best, ""
+
+    def resolve_norm(self, norm: str, team: str = "", source: str = "") -> Optional[int]:
+        """Resolve an already-normalized name (see resolve())."""
+        if not norm:
+            return None
+        team = (team or "").upper()
+
+        pid = self._alias(source, norm, team)
+        if pid is not None:
+            return pid
+
+        rows = self.by_norm.get(norm)
+        if rows:
+            return self._pick(rows, team)
+
+        pid, score, matched_team = self._fuzzy(norm, team)
+        if pid is not None:
+            self.aliases[(source, norm, team)] = pid
+            self._new_aliases.append(
+                {
+                    "source": source,
+                    "name_norm": norm,
+                    "team": team or matched_team,
+                    "player_id": pid,
+                    "method": "fuzzy",
+                    "score": round(score, 4),
+                    "added_at_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                }
+            )
+        return pid
+
+    def resolve(self, name: str, team: str = "", source: str = "") -> Optional[int]:
+        """Canonical playerId for one raw name (None if unknown or ambiguous)."""
+        return self.resolve_norm(normalize_names([name])[0], team, source)
+
+    def resolve_frame(
+        self,
+        df: pd.DataFrame,
+        name_col: str,
+        team_col: Optional[str] = None,
+        source: str = "",
+        save: bool = False,
+    ) -> pd.Series:
+        """
+        playerId (nullable Int64) for every row of df. Each distinct (name, team)
+        pair is resolved once. save=True persists strong learned matches (see
+        save_aliases); pipeline code leaves it off.
+        """
+        norms = normalize_names(df[name_col])
+        if team_col is not None and team_col in df.columns:
+            teams = df[team_col].astype(object).fillna("").astype(str).str.upper()
+        else:
+            teams = pd.Series("", index=df.index)
+
+        keys = pd.MultiIndex.from_arrays([norms.to_numpy(), teams.to_numpy()])
+        codes, uniques = pd.factorize(keys)
+        resolved = np.array(
+            [self.resolve_norm(n, t, source) for n, t in uniques] + [None],  # -1 -> None
+            dtype=object,
+        )
+        if save:
+            self.save_aliases()
+        return pd.Series(resolved[codes], index=df.index, name="playerId").astype("Int64")
+
+
+def load_registry(skaters_csv: Optional[Path] = None, **kwargs) -> PlayerRegistry:
+    """Season-wide registry from the MoneyPuck skaters table (columnar cache)."""
+    from skaters_cache import load_skaters_cached
+
+    skaters_csv = Path(skaters_csv or _project_root() / "data" / "raw" / "skaters.csv")
+    if not skaters_csv.exists():
+        raise FileNotFoundError(
+            f"Missing MoneyPuck file: {skaters_csv}\n"
+            "Put skaters.csv into data/raw/ (kept local, not committed)."
+        )
+    mp = load_skaters_cached(skaters_csv, columns=["playerId", "name", "team"])
+    return PlayerRegistry.from_frame(mp, **kwargs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Resolve player names to NHL playerIds.")
+    parser.add_argument("names", nargs="*", help='Names to resolve, optionally "Name@TEAM".')
+    parser.add_argument("--csv", help="Resolve every row of this CSV instead (e.g. a manual odds file)")
+    parser.add_argument("--name-col", default="player", help="Name column of --csv")
+    parser.add_argument("--team-col", default="team", help="Team column of --csv (optional)")
+    parser.add_argument("--skaters", help="MoneyPuck skaters CSV (default data/raw/skaters.csv)")
+    parser.add_argument("--source", default="cli")
+    parser.add_argument("--save", action="store_true", help="Persist strong fuzzy matches to the alias table")
+    parser.add_argument("--save-min-score", type=float, default=0.95)
+    args = parser.parse_args()
+    if not args.names and not args.csv:
+        parser.error("give names or --csv")
+
+    registry = load_registry(Path(args.skaters) if args.skaters else None, save_min_score=args.save_min_score)
+    for raw in args.names:
+        name, _, team = raw.partition("@")
+        print(f"{raw!r} -> {registry.resolve(name, team, source=args.source)}")
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        if args.name_col not in df.columns:
+            raise ValueError(f"{args.csv} has no column {args.name_col!r}. Found: {list(df.columns)}")
+        ids = registry.resolve_frame(df, args.name_col, args.team_col, source=args.source)
+        print(f"Resolved {int(ids.notna().sum())}/{len(ids)} rows from {args.csv}")
+    if args.save:
+        print(f"Saved {registry.save_aliases()} aliases -> {registry.alias_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+"""
+log_store.py
+------------
+Date-partitioned columnar store for the daily runner's logs.
+
+Layout (LOCAL ONLY; logs/ is not committed):
+  logs/store/<kind>/<YYYY-MM-DD>/run-<stamp>-<id>/   one directory per run
+  logs/store/<kind>/<YYYY-MM-DD>/compacted/          after `compact`
+
+Each kind ("predictions", "ev", ...) has its own schema, so rows never mix.
+Every run writes a new partition (cheap, append-only). `compact` merges a date's
+runs into one partition and drops duplicate rows by (date, player, logged_at_utc),
+which only removes rows logged twice by the same run. Re-runs of a date keep
+their own logged_at_utc; `compact --latest-run` keeps just the newest run per
+date (readers that don't compact that way pick the newest run themselves, as
+sweep.py does).
+Readers filter date directories by name and only open those inside the range.
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from columnar import read_frame, read_schema, write_frame
+
+
+DEDUP_KEYS = ["date", "player", "logged_at_utc"]
+COMPACTED = "compacted"
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_store_root() -> Path:
+    return _project_root() / "logs" / "store"
+
+
+def _kind_dir(root: Path, kind: str) -> Path:
+    return Path(root) / kind
+
+
+def _partitions(date_dir: Path) -> list[Path]:
+    if not date_dir.is_dir():
+        return []
+    return sorted(p for p in date_dir.iterdir() if p.is_dir() and read_schema(p) is not None)
+
+
+def _date_dirs(kind_dir: Path, start: Optional[str] = None, end: Optional[str] = None) -> list[Path]:
+    """Date directories with start <= name <= end, by name only (no partition reads)."""
+    if not kind_dir.is_dir():
+        return []
+    return sorted(
+        p
+        for p in kind_dir.iterdir()
+        if p.is_dir()
+        and not p.name.startswith(("_", "."))
+        and (start is None or p.name >= start)
+        and (end is None or p.name <= end)
+    )
+
+
+def list_dates(
+    kind: str,
+    root: Optional[Path] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> list[str]:
+    """Dates (YYYY-MM-DD) in [start, end] that have at least one partition for this kind."""
+    kind_dir = _kind_dir(root or default_store_root(), kind)
+    return [p.name for p in _date_dirs(kind_dir, start, end) if _partitions(p)]
+
+
+def append_run(
+    kind: str,
+    target_date: str,
+    df: pd.DataFrame,
+    root: Optional[Path] = None,
+) -> Path:
+    """
+    Write one run's rows as a new partition under <kind>/<target_date>/.
+    Returns the partition directory.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    part_dir = _kind_dir(root or default_store_root(), kind) / target_date / f"run-{stamp}-{uuid.uuid4().hex[:8]}"
+    return write_frame(df.reset_index(drop=True), part_dir, meta={"kind": kind, "date": target_date})
+
+
+def read_date(
+    kind: str,
+    target_date: str,
+    columns: Optional[Iterable[str]] = None,
+    root: Optional[Path] = None,
+) -> pd.DataFrame:
+    """All rows for one date (compacted + not-yet-compacted runs)."""
+    date_dir = _kind_dir(root or default_store_root(), kind) / target_date
+    cols = None if columns is None else list(columns)
+    frames = [read_frame(p, columns=cols, mmap=False) for p in _partitions(date_dir)]
+    if not frames:
+        return pd.DataFrame(columns=cols or [])
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_range(
+    kind: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    columns: Optional[Iterable[str]] = None,
+    root: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Rows for start <= date <= end (inclusive, either bound optional).
+    Dates outside the range are never opened.
+    """
+    cols = None if columns is None else list(columns)
+    kind_dir = _kind_dir(root or default_store_root(), kind)
+    frames = [read_date(kind, p.name, columns=cols, root=root) for p in _date_dirs(kind_dir, start, end)]
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=cols or [])
+    return pd.concat(frames, ignore_index=True)
+
+
+def compact_date(
+    kind: str,
+    target_date: str,
+    root: Optional[Path] = None,
+    keys: Optional[list[str]] = None,
+    latest_run: bool = False,
+) -> int:
+    """
+    Merge every partition of one date into a single deduplicated partition
+    (by `keys`, default DEDUP_KEYS). latest_run=True first drops every row not
+    from the newest logged_at_utc, collapsing re-runs of the date.
+    Returns the number of rows kept.
+    """
+    date_dir = _kind_dir(root or default_store_root(), kind) / target_date
+    parts = _partitions(date_dir)
+    if not parts:
+        return 0
+    if len(parts) == 1 and parts[0].name == COMPACTED and not latest_run:
+        return int(read_schema(parts[0])["rows"])
+
+    df = pd.concat([read_frame(p, mmap=False) for p in parts], ignore_index=True)
+    if latest_run and "logged_at_utc" in df.columns and not df.empty:
+        df = df[df["logged_at_utc"] == df["logged_at_utc"].max()]
+    keys = [k for k in (keys or DEDUP_KEYS) if k in df.columns]
+    if keys:
+        df = df.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+
+    write_frame(df, date_dir / COMPACTED, meta={"kind": kind, "date": target_date})
+    for p in parts:
+        if p.name != COMPACTED:
+            shutil.rmtree(p)
+
+    return len(df)
+
+
+def compact(
+    kind: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    root: Optional[Path] = None,
+    latest_run: bool = False,
+) -> dict[str, int]:
+    """Compact every date in [start, end]. Returns {date: rows_kept}."""
+    return {
+        d: compact_date(kind, d, root=root, latest_run=latest_run)
+        for d in list_dates(kind, root=root, start=start, end=end)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Partitioned log store maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_compact = sub.add_parser("compact", help="Merge and deduplicate partitions per date.")
+    p_compact.add_argument("--kind", required=True, help="e.g. predictions, ev")
+    p_compact.add_argument("--start", help="YYYY-MM-DD (inclusive)")
+    p_compact.add_argument("--end", help="YYYY-MM-DD (inclusive)")
+    p_compact.add_argument(
+        "--latest-run", action="store_true", help="Keep only the newest run (logged_at_utc) of each date."
+    )
+
+    p_export = sub.add_parser("export", help="Write a date range to one CSV.")
+    p_export.add_argument("--kind", required=True)
+    p_export.add_argument("--start")
+    p_export.add_argument("--end")
+    p_export.add_argument("--out", required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        res = compact(args.kind, start=args.start, end=args.end, latest_run=args.latest_run)
+        for d, n in res.items():
+            print(f"{args.kind} {d}: {n} rows")
+        print(f"Compacted {len(res)} dates.")
+    else:
+        df = read_range(args.kind, start=args.start, end=args.end)
+        df.to_csv(args.out, index=False)
+        print(f"Saved: {args.out} (rows={len(df)})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""
+model.py
+--------
+The goal model's parameters and its vectorized core, shared by run_daily.py
+(one slate) and backtest.py (a whole season at once), so both compute the same
+numbers.
+
+  xg_per_game     = I_F_xGoals / games_played    (or rolling form EWMA, see rolling_features.py)
+  toi_multiplier  = clip(toi_per_game / team mean toi_per_game, *toi_clip)
+  is_pp1          = top pp1_top_n of the team by 5on4 icetime (MoneyPuck inference)
+  lambda_goal     = min(xg_per_game * toi_multiplier * (1 + pp1_boost * is_pp1), lambda_cap) * shrink
+  P(goal)         = 1 - exp(-lambda_goal)            (Poisson, at least one goal)
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ModelParams:
+    pp1_boost: float = 0.5        # lambda multiplier bump for PP1 skaters
+    shrink: float = 0.65          # global calibration shrinkage on lambda
+    toi_clip_low: float = 0.6
+    toi_clip_high: float = 1.4
+    lambda_cap: float = 1.2       # clamp before shrinkage (avoids absurd rates)
+    pp1_top_n: int = 5
+    form_min_games: int = 5       # rolling form replaces season rates from this many games on
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+DEFAULT_PARAMS = ModelParams()
+
+
+def per_game(total: np.ndarray, games_played: np.ndarray) -> np.ndarray:
+    """total / games_played, 0 where games_played is 0 or missing."""
+    total = np.asarray(total, dtype=np.float64)
+    gp = np.asarray(games_played, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = total / gp
+    return np.where(np.isfinite(out), out, 0.0)
+
+
+def toi_multiplier(toi_per_game: np.ndarray, team_codes: np.ndarray, params: ModelParams = DEFAULT_PARAMS) -> np.ndarray:
+    """Player TOI relative to the team mean (over the given players), clipped."""
+    team_codes = np.asarray(team_codes, dtype=np.int64)
+    counts = np.bincount(team_codes)
+    sums = np.bincount(team_codes, weights=toi_per_game, minlength=counts.size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        team_mean = sums / counts
+        ratio = toi_per_game / team_mean[team_codes]
+    ratio = np.where(np.isfinite(ratio), ratio, 0.0)
+    return np.clip(ratio, params.toi_clip_low, params.toi_clip_high)
+
+
+def pp1_flags(pp_icetime: np.ndarray, team_codes: np.ndarray, params: ModelParams = DEFAULT_PARAMS) -> np.ndarray:
+    """
+    1 for the top pp1_top_n players of each team by 5on4 icetime ("min" rank, so
+    ties at the cut are all in), else 0.
+    """
+    pp_icetime = np.asarray(pp_icetime, dtype=np.float64)
+    team_codes = np.asarray(team_codes, dtype=np.int64)
+    flags = np.zeros(pp_icetime.shape[0], dtype=np.int8)
+    order = np.lexsort((-pp_icetime, team_codes))
+    sorted_teams, sorted_ice = team_codes[order], pp_icetime[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_teams)) + 1]
+    for s, e in zip(starts, np.r_[starts[1:], sorted_teams.size]):
+        ice = sorted_ice[s:e]
+        # "min" rank = 1 + number of strictly larger values
+        rank = 1 + np.searchsorted(-ice, -ice, side="left")
+        flags[order[s:e]] = (rank <= params.pp1_top_n) & ~np.isnan(ice)
+    return flags
+
+
+def goal_lambda(
+    xg_per_game: np.ndarray,
+    toi_mult: np.ndarray,
+    is_pp1: np.ndarray,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> np.ndarray:
+    lam = np.asarray(xg_per_game) * np.asarray(toi_mult) * (1.0 + np.asarray(is_pp1) * params.pp1_boost)
+    return np.clip(lam, 0.0, params.lambda_cap) * params.shrink
+
+
+def goal_probability(lam: np.ndarray) -> np.ndarray:
+    return 1.0 - np.exp(-np.asarray(lam))
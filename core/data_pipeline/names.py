@@ -0,0 +1,153 @@
+"""
+names.py
+--------
+The one player-name normalizer used by every join (MoneyPuck, odds, DailyFaceoff,
+NHL boxscores, warehouse).
+
+Rules, in order:
+1) transliterate accents (unidecode when installed, else Unicode NFKD)
+2) lowercase
+3) drop bracketed parts: "Mika Zibanejad (NYR)" -> "mika zibanejad"
+4) delete dots and apostrophes: "J.T. Miller" -> "jt miller", "O'Reilly" -> "oreilly"
+5) hyphens and any other non-letter -> space
+6) collapse whitespace
+7) join runs of single-letter initials: "J. T. Miller" -> "jt miller" (== "JT Miller")
+Missing / non-string values normalize to "".
+
+Vectorized, unique-first: normalize_names() factorizes the input, normalizes only
+the distinct names and broadcasts back with the codes. Results are memoized in
+process and persisted to data/cache/names/normalized.json, so later runs only
+pay for names they have never seen. Bump NORMALIZER_VERSION when the rules change.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import unicodedata
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:  # optional: better transliteration than NFKD (e.g. "ø" -> "o")
+    from unidecode import unidecode
+except ImportError:  # pragma: no cover - depends on environment
+    unidecode = None
+
+
+NORMALIZER_VERSION = 1
+
+_BRACKETS_RE = re.compile(r"[\(\[].*?[\)\]]")
+_DELETE_RE = re.compile(r"[.'’`]")
+_NON_LETTER_RE = re.compile(r"[^a-z]+")
+_INITIALS_RE = re.compile(r"\b([a-z])\s(?=[a-z]\b)")
+
+_lock = threading.Lock()
+_memo: Optional[dict[str, str]] = None
+_dirty = False
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_names_cache_path() -> Path:
+    return _project_root() / "data" / "cache" / "names" / "normalized.json"
+
+
+def _ascii(s: str) -> str:
+    if unidecode is not None:
+        return unidecode(s)
+    decomposed = unicodedata.normalize("NFKD", s)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_name(name: object) -> str:
+    """Normalize one name (see module docstring for the rules)."""
+    if not isinstance(name, str):
+        return ""
+    s = _ascii(name).lower()
+    s = _BRACKETS_RE.sub(" ", s)
+    s = _DELETE_RE.sub("", s)
+    s = _NON_LETTER_RE.sub(" ", s).strip()
+    return _INITIALS_RE.sub(r"\1", s)
+
+
+# -----------------------------
+# Memo (in-process + on disk)
+# -----------------------------
+
+def _load_memo(path: Path) -> dict[str, str]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if data.get("version") != NORMALIZER_VERSION:
+        return {}  # rules changed: start over
+    return dict(data.get("names", {}))
+
+
+def _memo_dict() -> dict[str, str]:
+    global _memo
+    if _memo is None:
+        _memo = _load_memo(default_names_cache_path())
+    return _memo
+
+
+def save_cache(path: Optional[Path] = None) -> None:
+    """Persist newly seen names (no-op when nothing changed)."""
+    global _dirty
+    with _lock:
+        if not _dirty:
+            return
+        path = Path(path or default_names_cache_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+        tmp.write_text(json.dumps({"version": NORMALIZER_VERSION, "names": _memo_dict()}), encoding="utf-8")
+        os.replace(tmp, path)
+        _dirty = False
+
+
+def normalize_names(
+    values: Union[pd.Series, np.ndarray, Iterable[object]],
+    persist: bool = True,
+) -> Union[pd.Series, np.ndarray]:
+    """
+    Normalize a whole column. Returns a Series (same index) for Series input,
+    otherwise an object ndarray.
+    """
+    global _dirty
+    is_series = isinstance(values, pd.Series)
+    if not is_series and not isinstance(values, np.ndarray):
+        values = np.asarray(list(values), dtype=object)
+    codes, uniques = pd.factorize(values)
+
+    with _lock:
+        memo = _memo_dict()
+        out_uniques = np.empty(len(uniques), dtype=object)
+        for i, name in enumerate(uniques):
+            key = name if isinstance(name, str) else None
+            if key is None:
+                out_uniques[i] = ""
+                continue
+            norm = memo.get(key)
+            if norm is None:
+                norm = normalize_name(key)
+                memo[key] = norm
+                _dirty = True
+            out_uniques[i] = norm
+
+    # factorize marks missing values with code -1
+    out = np.append(out_uniques, "")[codes]
+    if persist:
+        save_cache()
+
+    if is_series:
+        return pd.Series(out, index=values.index, name=values.name)
+    return out
@@ -5,6 +5,11 @@ What it does:
 - Fetches NHL odds JSON from The Odds API
 - # Saves the raw JSON to data/raw/
 - Does NOT commit raw files (gitignored)
+- Event mode: lists events, then pulls player-prop markets per event
+  (the bulk /odds endpoint rejects player markets), re-fetching only events
+  whose cached props are older than a max age and tracking API quota headers
+- Archive mode: appends every pull (with fetch time + response headers) as one
+  compressed NDJSON record to data/raw/odds_archive/, one file per UTC day
 
 Why it's written this way:
 - API key comes from env var (never hardcode secrets)
@@ -13,14 +18,25 @@ Why it's written this way:
 """
 
 from __future__ import annotations
+import argparse
+import gzip
+import io
 import json
 import os
-from dataclasses import dataclass
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-import requests
+from http_client import HttpClient, default_client, print_timing_summary
+
+try:  # optional: better ratio + faster than gzip when installed
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
 
 
 
@@ -33,7 +49,8 @@ class OddsApiConfig:
     odds_format: str = "decimal"
     date_format: str = "iso"
     markets: str = "h2h"
-
+    # Per-event endpoint only (comma-separated Odds API market keys)
+    prop_markets: str = "player_goal_scorer_anytime"
 
 
 def _project_root() -> Path:
@@ -45,22 +62,115 @@ def _raw_dir() -> Path:
     return _project_root() / "data" / "raw"
 
 
+def _archive_dir() -> Path:
+    return _raw_dir() / "odds_archive"
 
-def fetch_nhl_player_anytime_goalscorer_odds(
-    config: OddsApiConfig = OddsApiConfig(),
-    out_filename: Optional[str] = None,
+
+# -----------------------------
+# Compressed NDJSON archive
+# -----------------------------
+
+ARCHIVE_SUFFIXES = {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz"}
+
+
+def _archive_compression(compression: str = "auto") -> str:
+    if compression == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if compression == "zstd" and zstandard is None:
+        raise RuntimeError("compression='zstd' requested but the zstandard package is not installed")
+    if compression not in ARCHIVE_SUFFIXES:
+        raise ValueError(f"Unknown archive compression: {compression!r}")
+    return compression
+
+
+def archive_path_for(day: str, compression: str = "auto", archive_dir: Optional[Path] = None) -> Path:
+    """Archive file for a UTC day (YYYY_MM_DD)."""
+    compression = _archive_compression(compression)
+    return (archive_dir or _archive_dir()) / f"odds_{day}{ARCHIVE_SUFFIXES[compression]}"
+
+
+def append_archive_record(
+    record: Dict[str, Any],
+    day: Optional[str] = None,
+    compression: str = "auto",
+    archive_dir: Optional[Path] = None,
 ) -> Path:
     """
-    Fetch NHL odds for the anytime goalscorer market and save raw JSON.
-    Returns the saved file path.
+    Append one record to the day's archive and return the file path.
+
+    Each call writes a self-contained gzip member / zstd frame, so appends never
+    rewrite earlier pulls and a crash can only lose the record being written.
+    """
+    day = day or datetime.now(timezone.utc).strftime("%Y_%m_%d")
+    compression = _archive_compression(compression)
+    path = archive_path_for(day, compression, archive_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+    with path.open("ab") as f:
+        if compression == "zstd":
+            f.write(zstandard.ZstdCompressor(level=10).compress(line))
+        else:
+            f.write(gzip.compress(line, compresslevel=6))
+
+    return path
+
+
+def iter_archive_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records back from an archive file, one decoded line at a time
+    (the day is never decompressed into memory as a whole).
     """
+    path = Path(path)
+    with path.open("rb") as raw:
+        if path.name.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read {path}")
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = gzip.GzipFile(fileobj=raw, mode="rb")
 
+        with io.TextIOWrapper(stream, encoding="utf-8") as text:
+            for line in text:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def iter_archive_day(day: str, archive_dir: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """All records for a UTC day (YYYY_MM_DD), whichever compression wrote them."""
+    for suffix in ARCHIVE_SUFFIXES.values():
+        path = (archive_dir or _archive_dir()) / f"odds_{day}{suffix}"
+        if path.exists():
+            yield from iter_archive_records(path)
+
+
+
+def _api_key(config: OddsApiConfig) -> str:
     api_key = os.getenv(config.api_key_env)
     if not api_key:
         raise EnvironmentError(
             f"Missing API key. Set environment variable {config.api_key_env}.\n"
             f"Example (macOS zsh): export {config.api_key_env}='YOUR_KEY_HERE'"
         )
+    return api_key
+
+
+def fetch_nhl_player_anytime_goalscorer_odds(
+    config: OddsApiConfig = OddsApiConfig(),
+    out_filename: Optional[str] = None,
+    archive: bool = False,
+    compression: str = "auto",
+) -> Path:
+    """
+    Fetch NHL odds for the anytime goalscorer market and save raw JSON.
+    Returns the saved file path.
+
+    archive=True appends the pull to the day's compressed NDJSON archive instead
+    of overwriting the pretty-printed daily file (keeps intraday snapshots).
+    """
+
+    api_key = _api_key(config)
 
     raw_dir = _raw_dir()
     raw_dir.mkdir(parents=True, exist_ok=True)
@@ -82,11 +192,23 @@ def fetch_nhl_player_anytime_goalscorer_odds(
         "dateFormat": config.date_format,
     }
 
-    resp = requests.get(url, params=params, timeout=30)
+    resp = default_client().get(url, params=params, timeout=30)
     resp.raise_for_status()
 
     data: Any = resp.json()
 
+    if archive:
+        fetched_at = datetime.now(timezone.utc)
+        record = {
+            "fetched_at_utc": fetched_at.isoformat(timespec="seconds"),
+            "url": url,
+            "params": {k: v for k, v in params.items() if k != "apiKey"},
+            "status_code": resp.status_code,
+            "headers": dict(resp.headers),
+            "data": data,
+        }
+        return append_archive_record(record, day=fetched_at.strftime("%Y_%m_%d"), compression=compression)
+
     # Save raw response exactly
     with out_path.open("w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
@@ -94,6 +216,258 @@ def fetch_nhl_player_anytime_goalscorer_odds(
     return out_path
 
 
+# -----------------------------
+# Event-level player props (delta polling)
+# -----------------------------
+
+@dataclass
+class QuotaTracker:
+    """Odds API usage from x-requests-* response headers (thread-safe)."""
+    remaining: Optional[int] = None
+    used: Optional[int] = None
+    spent_this_run: int = 0
+    requests: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def update(self, headers: Any) -> None:
+        def as_int(name: str) -> Optional[int]:
+            v = headers.get(name)
+            try:
+                return int(float(v)) if v is not None else None
+            except ValueError:
+                return None
+
+        with self._lock:
+            self.requests += 1
+            last = as_int("x-requests-last")
+            if last is not None:
+                self.spent_this_run += last
+            remaining, used = as_int("x-requests-remaining"), as_int("x-requests-used")
+            # Concurrent responses can arrive out of order: keep the most-spent view
+            if remaining is not None and (self.remaining is None or remaining < self.remaining):
+                self.remaining = remaining
+            if used is not None and (self.used is None or used > self.used):
+                self.used = used
+
+
+@dataclass
+class PropsPollResult:
+    events: List[Dict[str, Any]]       # full snapshot (fresh + unchanged events)
+    fetched_ids: List[str]
+    skipped_ids: List[str]
+    quota: QuotaTracker
+    out_path: Optional[Path] = None
+
+
+def _props_state_dir() -> Path:
+    return _raw_dir() / "event_props"
+
+
+def _odds_get(
+    client: HttpClient,
+    url: str,
+    params: Dict[str, Any],
+    quota: QuotaTracker,
+) -> Any:
+    resp = client.get(url, params=params, timeout=30)
+    quota.update(resp.headers)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write via a temp file + os.replace, so a crash never leaves a half-written file."""
+    tmp = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _props_last_update(payload: Any) -> str:
+    """Latest last_update over the bookmakers / markets of one event payload ("" if none)."""
+    stamps = []
+    for bm in (payload or {}).get("bookmakers", []) or []:
+        stamps.append(bm.get("last_update") or "")
+        stamps.extend(m.get("last_update") or "" for m in bm.get("markets", []) or [])
+    return max(stamps, default="")
+
+
+def _props_max_age(
+    prev: Dict[str, Any],
+    commence_time: str,
+    now: datetime,
+    max_age_s: float,
+    hot_max_age_s: float,
+    hot_window_s: float,
+) -> float:
+    """
+    How long a cached event payload stays usable. Events whose props moved
+    shortly before the last fetch, or that start within hot_window_s (lineup
+    news, scratches), get the short hot_max_age_s; everything else max_age_s.
+    """
+    def seconds_before(stamp: str, ref: datetime) -> Optional[float]:
+        try:
+            return (ref - datetime.fromisoformat(stamp.replace("Z", "+00:00"))).total_seconds()
+        except ValueError:
+            return None
+
+    fetched_at = datetime.fromisoformat(prev["fetched_at_utc"])
+    moved = seconds_before(prev.get("props_last_update") or "", fetched_at)
+    starts_in = seconds_before(now.isoformat(), datetime.fromisoformat(commence_time.replace("Z", "+00:00")))
+    if (moved is not None and moved < hot_window_s) or (starts_in is not None and starts_in < hot_window_s):
+        return hot_max_age_s
+    return max_age_s
+
+
+def fetch_event_player_props(
+    config: OddsApiConfig = OddsApiConfig(),
+    markets: Optional[str] = None,
+    max_workers: int = 4,
+    force: bool = False,
+    archive: bool = False,
+    compression: str = "auto",
+    state_dir: Optional[Path] = None,
+    max_age_s: float = 1800,
+    hot_max_age_s: float = 300,
+    hot_window_s: float = 2 * 3600,
+) -> PropsPollResult:
+    """
+    Poll player-prop markets event by event.
+
+    1) GET /events (free) to list upcoming games
+    2) GET /events/{id}/odds for new events and events whose cached payload is
+       older than its max age, concurrently (max_workers, capped by the
+       client's per-host limit); younger events are served from the last poll
+
+    The max age comes from the props themselves: max_age_s normally,
+    hot_max_age_s when the cached props' own last_update was within
+    hot_window_s of that fetch or the game starts within hot_window_s.
+    No change signal is free, so a prop that moves right after a fetch is
+    stale for up to one max age; force=True re-fetches everything.
+
+    The combined snapshot is written to data/raw/odds_anytime_goalscorer_{day}.json
+    (compact, same shape as the bulk endpoint, so odds_parse_anytime reads it) and,
+    with archive=True, appended to the day's NDJSON archive.
+    """
+    api_key = _api_key(config)
+    markets = markets or config.prop_markets
+    state_dir = Path(state_dir or _props_state_dir())
+    state_dir.mkdir(parents=True, exist_ok=True)
+    state_path = state_dir / "state.json"
+    state: Dict[str, Any] = json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else {}
+    if state.get("version") != 2 or state.get("markets") != markets or state.get("regions") != config.regions:
+        state = {"version": 2, "markets": markets, "regions": config.regions, "events": {}}
+
+    quota = QuotaTracker()
+    client = default_client()
+
+    events = _odds_get(
+        client,
+        f"{config.base_url}/sports/{config.sport_key}/events",
+        {"apiKey": api_key, "dateFormat": config.date_format},
+        quota,
+    )
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    now_iso = now.isoformat()
+    upcoming = [e for e in events if (e.get("commence_time") or "") > now_iso.replace("+00:00", "Z")]
+
+    todo, skipped = [], []
+    for e in upcoming:
+        eid = e["id"]
+        prev = state["events"].get(eid)
+        fresh_enough = (
+            not force
+            and prev is not None
+            and (state_dir / f"{eid}.json").exists()
+            and (now - datetime.fromisoformat(prev["fetched_at_utc"])).total_seconds()
+            < _props_max_age(prev, e["commence_time"], now, max_age_s, hot_max_age_s, hot_window_s)
+        )
+        (skipped if fresh_enough else todo).append(eid)
+
+    def fetch_one(eid: str) -> Dict[str, Any]:
+        return _odds_get(
+            client,
+            f"{config.base_url}/sports/{config.sport_key}/events/{eid}/odds",
+            {
+                "apiKey": api_key,
+                "regions": config.regions,
+                "markets": markets,
+                "oddsFormat": config.odds_format,
+                "dateFormat": config.date_format,
+            },
+            quota,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fresh = dict(zip(todo, pool.map(fetch_one, todo)))
+
+    snapshot = []
+    for e in upcoming:
+        eid = e["id"]
+        cached_payload = state_dir / f"{eid}.json"
+        if eid in fresh:
+            payload = fresh[eid]
+            _write_atomic(cached_payload, json.dumps(payload, ensure_ascii=False))
+            state["events"][eid] = {"fetched_at_utc": now_iso, "props_last_update": _props_last_update(payload)}
+        else:
+            payload = json.loads(cached_payload.read_text(encoding="utf-8"))
+        snapshot.append(payload)
+
+    # Forget events that have started
+    live_ids = {e["id"] for e in upcoming}
+    for eid in list(state["events"]):
+        if eid not in live_ids:
+            state["events"].pop(eid)
+            (state_dir / f"{eid}.json").unlink(missing_ok=True)
+    _write_atomic(state_path, json.dumps(state, indent=2))
+
+    day = datetime.now(timezone.utc).strftime("%Y_%m_%d")
+    out_path = _raw_dir() / f"odds_anytime_goalscorer_{day}.json"
+    _write_atomic(out_path, json.dumps(snapshot, ensure_ascii=False))
+
+    if archive:
+        append_archive_record(
+            {
+                "fetched_at_utc": now_iso,
+                "url": f"{config.base_url}/sports/{config.sport_key}/events/{{id}}/odds",
+                "params": {"regions": config.regions, "markets": markets},
+                "fetched_ids": todo,
+                "skipped_ids": skipped,
+                "quota": {"remaining": quota.remaining, "used": quota.used, "spent": quota.spent_this_run},
+                "data": snapshot,
+            },
+            day=day,
+            compression=compression,
+        )
+
+    return PropsPollResult(snapshot, todo, skipped, quota, out_path)
+
+
 if __name__ == "__main__":
-    saved = fetch_nhl_player_anytime_goalscorer_odds()
+    parser = argparse.ArgumentParser(description="Fetch NHL odds from The Odds API.")
+    parser.add_argument("--archive", action="store_true", help="Append to the compressed daily NDJSON archive.")
+    parser.add_argument("--compression", default="auto", choices=["auto", "zstd", "gzip"])
+    parser.add_argument("--props", action="store_true", help="Per-event player props with delta polling.")
+    parser.add_argument("--markets", help="Prop markets for --props (default: OddsApiConfig.prop_markets).")
+    parser.add_argument("--force", action="store_true", help="With --props: re-fetch every event.")
+    parser.add_argument("--max-age-min", type=float, default=30.0, help="With --props: re-fetch events older than this.")
+    args = parser.parse_args()
+
+    if args.props:
+        res = fetch_event_player_props(
+            markets=args.markets,
+            force=args.force,
+            archive=args.archive,
+            compression=args.compression,
+            max_age_s=args.max_age_min * 60,
+        )
+        print(f"Events: {len(res.events)} (fetched {len(res.fetched_ids)}, reused {len(res.skipped_ids)})")
+        print(
+            f"Quota: spent {res.quota.spent_this_run} this run, "
+            f"used={res.quota.used}, remaining={res.quota.remaining}"
+        )
+        print(f"Saved snapshot to: {res.out_path}")
+        print_timing_summary()
+        raise SystemExit(0)
+
+    saved = fetch_nhl_player_anytime_goalscorer_odds(archive=args.archive, compression=args.compression)
     print(f"Saved raw odds JSON to: {saved}")
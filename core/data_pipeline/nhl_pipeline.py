@@ -3,6 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 
+from schemas import read_csv_schema
+
 
 def run_moneypuck_goal_rates_pipeline(
     season_label: str = "2023_2024",
@@ -42,29 +44,10 @@ def run_moneypuck_goal_rates_pipeline(
             f"Tip: download the file and place it there (raw files are NOT committed)."
         )
 
-    # 6) Load the data.
-    df = pd.read_csv(input_path)
-
-    # 7) Verify required columns exist (prevents silent wrong results).
-    required_cols = [
-        "playerId",
-        "name",
-        "team",
-        "position",
-        "situation",
-        "games_played",
-        "I_F_goals",
-        "I_F_shotsOnGoal",
-        "I_F_xGoals",
-        "icetime",
-    ]
-    missing = [c for c in required_cols if c not in df.columns]
-    if missing:
-        raise ValueError(
-            "MoneyPuck CSV is missing required columns:\n"
-            f"{missing}\n"
-            "This usually means the CSV format changed or a different file was downloaded."
-        )
+    # 6) Load only the columns we need, typed (see schemas.py).
+    # 7) read_csv_schema raises ValueError if required columns are missing
+    #    (prevents silent wrong results when the CSV format changes).
+    df = read_csv_schema(input_path, "moneypuck_skaters")
 
     # 8) Keep only one row per player: situation == 'all'
     df_all = df[df["situation"] == "all"].copy()
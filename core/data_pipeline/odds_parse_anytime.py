@@ -2,14 +2,156 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Optional
+
 import pandas as pd
 
 
+ODDS_COLUMNS = [
+    "event_id",
+    "commence_time",
+    "home_team",
+    "away_team",
+    "bookmaker",
+    "market_key",
+    "player_name",
+    "price_decimal",
+]
+
+_WHITESPACE = " \t\r\n"
+
+
 def project_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
-def parse_anytime_goalscorer_odds_json(json_path: Path) -> pd.DataFrame:
+def iter_json_array(fp: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks and each element is decoded as soon as it is
+    complete, so memory is bounded by the largest single element (one event),
+    not by the payload. Elements must be separated by exactly one ",".
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    read_size = chunk_size
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = fp.read(read_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        """Next non-whitespace character (not consumed), "" at end of input."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    ch = next_char()
+    if ch != "[":
+        raise ValueError("Expected a JSON array of events (The Odds API error payloads are objects)")
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        if next_char() in ("", ",", "]"):
+            raise ValueError("Expected a JSON value after '[' or ','")
+
+        # Decode one element; pull more data until it is complete. A value that
+        # reaches the end of the buffer may continue in the next chunk (numbers,
+        # literals), so it is only accepted once something follows it or at EOF.
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                read_size *= 2  # big event: grow reads instead of re-parsing per 64 KiB
+                continue
+            tail = buf[end:]
+            if not eof and (not tail.strip(_WHITESPACE) or _may_continue_number(item, tail)):
+                if fill():
+                    continue
+            break
+
+        read_size = chunk_size
+        pos = end
+        yield item
+
+        sep = next_char()
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"Expected ',' or ']' after an array element, got {sep or 'end of input'!r}")
+        pos += 1
+
+
+def _may_continue_number(item: Any, tail: str) -> bool:
+    """True when item is a number and tail is nothing but number characters (cut mid-number)."""
+    return isinstance(item, (int, float)) and not isinstance(item, bool) and not tail.strip("0123456789.eE+-")
+
+
+def _append_event_rows(cols: dict[str, list], event: dict) -> None:
+    """Append one event's outcomes straight into the per-column lists."""
+    event_id = event.get("id")
+    commence_time = event.get("commence_time")
+    home_team = event.get("home_team")
+    away_team = event.get("away_team")
+
+    bookmakers = event.get("bookmakers", []) or []
+    for bm in bookmakers:
+        bookmaker = bm.get("key") or bm.get("title") or "unknown"
+
+        markets = bm.get("markets", []) or []
+        for m in markets:
+            market_key = m.get("key")
+
+            outcomes = m.get("outcomes", []) or []
+            for o in outcomes:
+                # For player props, outcome name is usually the player name
+                player_name = o.get("name")
+                price = o.get("price")  # decimal odds
+
+                if player_name is None or price is None:
+                    continue
+
+                cols["event_id"].append(event_id)
+                cols["commence_time"].append(commence_time)
+                cols["home_team"].append(home_team)
+                cols["away_team"].append(away_team)
+                cols["bookmaker"].append(bookmaker)
+                cols["market_key"].append(market_key)
+                cols["player_name"].append(player_name)
+                cols["price_decimal"].append(price)
+
+
+def events_to_frame(events: Iterable[dict]) -> pd.DataFrame:
+    """Build the odds DataFrame from an iterable of events in one shot."""
+    cols: dict[str, list] = {c: [] for c in ODDS_COLUMNS}
+    for event in events:
+        if isinstance(event, dict):
+            _append_event_rows(cols, event)
+
+    df = pd.DataFrame(cols, columns=ODDS_COLUMNS)
+    df["price_decimal"] = pd.to_numeric(df["price_decimal"], errors="coerce")
+    return df
+
+
+def parse_anytime_goalscorer_odds_json(json_path: Path, chunk_size: int = 1 << 16) -> pd.DataFrame:
     """
     Parse The Odds API odds response for player anytime goalscorer.
 
@@ -21,48 +163,35 @@ def parse_anytime_goalscorer_odds_json(json_path: Path) -> pd.DataFrame:
     Notes:
     - The Odds API payload format can vary by market.
     - This parser is defensive: it skips missing pieces rather than crashing.
+    - The file is streamed event by event (see iter_json_array), so large
+      multi-region / multi-market payloads are never fully loaded as Python objects.
+    """
+    with Path(json_path).open("r", encoding="utf-8") as fp:
+        return events_to_frame(iter_json_array(fp, chunk_size=chunk_size))
+
+
+def parse_archive_odds(archive_path: Path, since_utc: Optional[str] = None) -> pd.DataFrame:
+    """
+    Parse every pull in an odds archive file (nhl_odds_fetcher archive mode),
+    tagging rows with the pull's fetched_at_utc. Useful for line-movement work.
     """
-    data = json.loads(json_path.read_text(encoding="utf-8"))
-
-    rows = []
-
-    for event in data:
-        event_id = event.get("id")
-        commence_time = event.get("commence_time")
-        home_team = event.get("home_team")
-        away_team = event.get("away_team")
-
-        bookmakers = event.get("bookmakers", []) or []
-        for bm in bookmakers:
-            bookmaker = bm.get("key") or bm.get("title") or "unknown"
-
-            markets = bm.get("markets", []) or []
-            for m in markets:
-                market_key = m.get("key")
-
-                outcomes = m.get("outcomes", []) or []
-                for o in outcomes:
-                    # For player props, outcome name is usually the player name
-                    player_name = o.get("name")
-                    price = o.get("price")  # decimal odds
-
-                    if player_name is None or price is None:
-                        continue
-
-                    rows.append(
-                        {
-                            "event_id": event_id,
-                            "commence_time": commence_time,
-                            "home_team": home_team,
-                            "away_team": away_team,
-                            "bookmaker": bookmaker,
-                            "market_key": market_key,
-                            "player_name": player_name,
-                            "price_decimal": price,
-                        }
-                    )
-
-    return pd.DataFrame(rows)
+    from nhl_odds_fetcher import iter_archive_records
+
+    frames = []
+    for record in iter_archive_records(archive_path):
+        fetched_at = record.get("fetched_at_utc")
+        if since_utc is not None and fetched_at is not None and fetched_at < since_utc:
+            continue
+        data = record.get("data")
+        if not isinstance(data, list):
+            continue
+        df = events_to_frame(data)
+        df.insert(0, "fetched_at_utc", fetched_at)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["fetched_at_utc", *ODDS_COLUMNS])
+    return pd.concat(frames, ignore_index=True)
 
 
 def main() -> None:
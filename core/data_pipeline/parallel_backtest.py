@@ -0,0 +1,294 @@
+"""
+parallel_backtest.py
+--------------------
+Date-parallel backtest of the full daily pipeline, for model variants that
+backtest.py can't vectorize: DailyFaceoff PP overrides (inputs/dailyfaceoff_pp_<date>.csv)
+and per-date odds joins (inputs/manual_odds_<date>.csv -> merge_and_calculate_ev).
+
+Dates fan out over a ProcessPoolExecutor. Shared inputs reach each worker once,
+through the pool initializer, never per task:
+- MoneyPuck: the parent builds the season feature matrix (feature_matrix.py) once;
+  each worker memory-maps it read-only (the OS shares the pages between workers)
+  and per date decodes only the "all" / "5on4" rows of that slate's teams
+- schedule: the parent loads the season index(es) and ships their JSON once per worker
+- PP units: the MoneyPuck-inferred table (pp_units.py) is built once per worker
+Tasks carry only a date string; results come back per date. Workers only read
+the alias table (identity.py); they never write it.
+
+Deterministic merge: results are collected in date order (executor.map) and rows
+sorted by playerId within a date, so the output doesn't depend on worker count
+or scheduling. Each worker runs the same build_predictions / merge_and_calculate_ev
+as run_daily.py.
+
+Outputs (--out-dir, default data/processed/backtest/):
+  predictions.csv   every player of every slate, with goals where outcomes exist
+  ev.csv            odds-matched rows with EV (dates that have a manual odds file)
+  per_date.csv      per-date Brier / log-loss and flat-stake ROI of EV > 0 bets
+
+Usage:
+  python core/data_pipeline/parallel_backtest.py --start 2024-10-08 --end 2025-04-17 --workers 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_matrix import feature_dir_for, load_season_features, open_season_features
+from fetch_outcomes import load_outcomes
+from model import DEFAULT_PARAMS, ModelParams
+from pp_units import PPUnitTable
+from run_daily import (
+    MODEL_SITUATIONS,
+    Paths,
+    build_predictions,
+    get_paths,
+    load_dailyfaceoff_pp,
+    load_manual_odds,
+    merge_and_calculate_ev,
+)
+from schedule_index import SeasonScheduleIndex, load_season_index, season_for_date
+
+
+PRED_COLUMNS = ["playerId", "name", "team", "pp_unit", "pp_source", "is_pp1", "is_pp2", "xg_per_game", "toi_multiplier", "lambda_goal", "goal_probability"]
+EV_COLUMNS = ["playerId", "player", "name", "team", "odds", "implied_prob", "goal_probability", "ev", "ev_percent", "is_pp1"]
+EPS = 1e-15
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class DateResult:
+    date: str
+    predictions: pd.DataFrame
+    ev: pd.DataFrame
+    used_dailyfaceoff: bool = False
+    error: Optional[str] = None
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+_WORKER: dict = {}
+
+
+def _init_worker(paths: Paths, feature_dir: str, seasons: dict[int, dict], params: ModelParams) -> None:
+    """Pool initializer: runs once per worker process."""
+    features = open_season_features(Path(feature_dir))
+    _WORKER["paths"] = paths
+    _WORKER["features"] = features
+    _WORKER["pp_units"] = PPUnitTable.from_moneypuck(features.to_frame(features.situation_mask("5on4")), params)
+    _WORKER["seasons"] = {s: SeasonScheduleIndex.from_json(data) for s, data in seasons.items()}
+    _WORKER["params"] = params
+
+
+def _run_date(target_date: str) -> DateResult:
+    paths: Paths = _WORKER["paths"]
+    empty = pd.DataFrame()
+    try:
+        teams = _WORKER["seasons"][season_for_date(target_date)].teams_on(target_date)
+        pp_df = load_dailyfaceoff_pp(paths, target_date)
+        features = _WORKER["features"]
+        mp = features.to_frame(features.rows_for(teams, MODEL_SITUATIONS))
+        pred = build_predictions(mp, teams, pp_df=pp_df, params=_WORKER["params"], pp_units=_WORKER["pp_units"])
+
+        ev = empty
+        if (paths.inputs / f"manual_odds_{target_date}.csv").exists():
+            ev = merge_and_calculate_ev(pred, load_manual_odds(paths, target_date))
+            ev = ev[[c for c in EV_COLUMNS if c in ev.columns]]
+
+        return DateResult(
+            date=target_date,
+            predictions=pred[[c for c in PRED_COLUMNS if c in pred.columns]],
+            ev=ev,
+            used_dailyfaceoff=not pp_df.empty,
+        )
+    except Exception as e:  # one bad date must not sink the run
+        return DateResult(date=target_date, predictions=empty, ev=empty, error=f"{type(e).__name__}: {e}")
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+
+def _combine(results: list[DateResult], attr: str) -> pd.DataFrame:
+    frames = [
+        getattr(r, attr).assign(date=r.date).sort_values("playerId", kind="stable")
+        for r in results
+        if not getattr(r, attr).empty
+    ]
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames, ignore_index=True)
+    return out[["date"] + [c for c in out.columns if c != "date"]]
+
+
+def _attach_outcomes(df: pd.DataFrame, outcomes: pd.DataFrame) -> pd.DataFrame:
+    if df.empty or outcomes.empty:
+        return df.assign(goals=np.nan)
+    goals = (
+        outcomes.dropna(subset=["player_id"])
+        .astype({"player_id": "int64"})
+        .groupby(["date", "player_id"], as_index=False)["goals"]
+        .sum()
+        .rename(columns={"player_id": "playerId"})
+    )
+    return df.merge(goals, on=["date", "playerId"], how="left")
+
+
+def per_date_metrics(predictions: pd.DataFrame, ev: pd.DataFrame) -> pd.DataFrame:
+    """Brier / log-loss of scored predictions and flat-stake ROI of EV > 0 bets, per date."""
+    scored = predictions.dropna(subset=["goals"])
+    y = (scored["goals"] > 0).to_numpy(dtype=np.float64)
+    p = scored["goal_probability"].to_numpy(dtype=np.float64)
+    pc = np.clip(p, EPS, 1 - EPS)
+    metrics = pd.DataFrame(
+        {
+            "date": scored["date"].to_numpy(),
+            "scored": 1,
+            "scorers": y,
+            "mean_p": p,
+            "brier": (p - y) ** 2,
+            "logloss": -(y * np.log(pc) + (1 - y) * np.log1p(-pc)),
+        }
+    ).groupby("date").agg(
+        scored=("scored", "sum"),
+        scorers=("scorers", "sum"),
+        mean_p=("mean_p", "mean"),
+        brier=("brier", "mean"),
+        logloss=("logloss", "mean"),
+    )
+
+    if not ev.empty and "goals" in ev.columns:
+        bets = ev[(ev["ev"] > 0) & ev["goals"].notna()]
+        pnl = np.where(bets["goals"] > 0, bets["odds"] - 1.0, -1.0)
+        roi = pd.DataFrame({"date": bets["date"], "bets": 1, "pnl": pnl}).groupby("date").sum()
+        metrics = metrics.join(roi, how="outer")
+        metrics["roi"] = metrics["pnl"] / metrics["bets"]
+    return metrics.reset_index()
+
+
+def pool_size(workers: Optional[int], n_dates: int) -> int:
+    """Worker processes actually started: requested (default all cores), at most one per date."""
+    return max(1, min(workers or os.cpu_count() or 1, n_dates or 1))
+
+
+def run_parallel_backtest(
+    start: str,
+    end: str,
+    workers: Optional[int] = None,
+    params: ModelParams = DEFAULT_PARAMS,
+    paths: Optional[Paths] = None,
+    skaters_csv: Optional[Path] = None,
+    outcomes_root: Optional[Path] = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, list[DateResult]]:
+    """
+    Returns (predictions, ev, results). predictions / ev carry a goals column
+    where the outcomes dataset has the game.
+    """
+    paths = paths or get_paths()
+    skaters_csv = Path(skaters_csv or paths.data_raw / "skaters.csv")
+    if not skaters_csv.exists():
+        raise FileNotFoundError(
+            f"Missing MoneyPuck file: {skaters_csv}\n"
+            "Put skaters.csv into data/raw/ (kept local, not committed)."
+        )
+
+    # Build / validate shared inputs once, before any worker starts
+    load_season_features(skaters_csv)
+    feature_dir = feature_dir_for(skaters_csv)
+    indexes = {}
+    for d in pd.date_range(start, end, freq="D").strftime("%Y-%m-%d"):
+        season = season_for_date(d)
+        if season not in indexes:
+            indexes[season] = load_season_index(d)
+    dates = sorted(d for idx in indexes.values() for d in idx.dates() if start <= d <= end)
+    seasons = {s: idx.to_json() for s, idx in indexes.items()}
+
+    workers = pool_size(workers, len(dates))
+    initargs = (paths, str(feature_dir), seasons, params)
+    if workers == 1:
+        _init_worker(*initargs)
+        results = [_run_date(d) for d in dates]
+    else:
+        chunksize = max(1, len(dates) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            results = list(pool.map(_run_date, dates, chunksize=chunksize))
+
+    outcomes = load_outcomes(start, end, dataset_root=outcomes_root)
+    predictions = _attach_outcomes(_combine(results, "predictions"), outcomes)
+    ev = _attach_outcomes(_combine(results, "ev"), outcomes)
+    return predictions, ev, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backtest the daily pipeline over a date range on all cores.")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: all cores).")
+    parser.add_argument("--pp1-boost", type=float, default=DEFAULT_PARAMS.pp1_boost)
+    parser.add_argument("--shrink", type=float, default=DEFAULT_PARAMS.shrink)
+    parser.add_argument("--lambda-cap", type=float, default=DEFAULT_PARAMS.lambda_cap)
+    parser.add_argument("--toi-clip-low", type=float, default=DEFAULT_PARAMS.toi_clip_low)
+    parser.add_argument("--toi-clip-high", type=float, default=DEFAULT_PARAMS.toi_clip_high)
+    parser.add_argument("--pp1-top-n", type=int, default=DEFAULT_PARAMS.pp1_top_n)
+    parser.add_argument("--out-dir", help="Output directory (default data/processed/backtest/).")
+    args = parser.parse_args()
+
+    params = ModelParams(
+        pp1_boost=args.pp1_boost,
+        shrink=args.shrink,
+        lambda_cap=args.lambda_cap,
+        toi_clip_low=args.toi_clip_low,
+        toi_clip_high=args.toi_clip_high,
+        pp1_top_n=args.pp1_top_n,
+    )
+
+    t0 = time.perf_counter()
+    predictions, ev, results = run_parallel_backtest(args.start, args.end, workers=args.workers, params=params)
+    elapsed = time.perf_counter() - t0
+    n_workers = pool_size(args.workers, len(results))
+
+    failed = [r for r in results if r.error]
+    for r in failed:
+        print(f"[warn] {r.date}: {r.error}")
+    n_dfo = sum(r.used_dailyfaceoff for r in results)
+    n_ev = sum(not r.ev.empty for r in results)
+    print(
+        f"{len(results)} dates ({len(failed)} failed, {n_dfo} with DailyFaceoff PP, {n_ev} with odds) "
+        f"in {elapsed:.1f} s on {n_workers} workers"
+    )
+
+    out_dir = Path(args.out_dir) if args.out_dir else _project_root() / "data" / "processed" / "backtest"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    metrics = per_date_metrics(predictions, ev) if not predictions.empty else pd.DataFrame()
+
+    predictions.to_csv(out_dir / "predictions.csv", index=False)
+    ev.to_csv(out_dir / "ev.csv", index=False)
+    metrics.to_csv(out_dir / "per_date.csv", index=False)
+
+    if not metrics.empty:
+        print(metrics.tail(10).to_string(index=False))
+        scored = predictions.dropna(subset=["goals"])
+        y = (scored["goals"] > 0).to_numpy(dtype=np.float64)
+        print(f"\nOverall Brier: {np.mean((scored['goal_probability'] - y) ** 2):.5f} over {len(scored)} player-games")
+        if "bets" in metrics.columns and metrics["bets"].sum() > 0:
+            print(f"EV > 0 bets: {int(metrics['bets'].sum())}, ROI {metrics['pnl'].sum() / metrics['bets'].sum():+.3f}")
+    print(f"Saved: {out_dir}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
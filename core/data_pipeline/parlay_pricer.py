@@ -0,0 +1,365 @@
+"""
+parlay_pricer.py
+----------------
+Same-game multi-scorer parlays ("A and B and C all score") priced with the
+correlation that independent legs miss: teammates' goals move together with
+their team's goal total.
+
+Model (one gamma shock per team, shared by its skaters):
+
+  G_team          ~ Gamma(shape=k, scale=1/k)      mean 1, variance 1/k
+  goals_i | G     ~ Poisson(lambda'_i * G_team(i))  independent given the shocks
+  team goals | G  ~ Poisson(G * sum lambda')        (so the shock is a team-total shock)
+
+lambda'_i = k * expm1(lambda_goal_i / k) keeps every single leg at the model's
+price: P(i scores) = 1 - (1 + lambda'/k)^-k = 1 - exp(-lambda_goal). Legs on
+different teams stay independent; k = inf is the independent product.
+
+Joint probability of a combo (all legs score):
+
+- exact (legs <= exact_max_legs): inclusion-exclusion over the 2^n leg subsets,
+  each term a product over teams of the gamma Laplace transform
+      P = sum_S (-1)^|S| prod_teams (1 + Lambda_team(S) / k)^-k
+  vectorized over all combos of the same size: (C, n, 2^n) per chunk
+- mc (larger combos): conditional Monte Carlo with seeded shocks per team,
+      P = mean_draws prod_i (1 - exp(-lambda'_i * G_team(i)))
+  batched as (C, n, draws) under max_cells; deterministic for a given seed
+
+Inputs: predictions_<date>.csv written by run_daily.py (playerId, name, team,
+lambda_goal, goal_probability) and the season schedule index (schedule_index.py)
+for the date's games. Per game the top --top players by goal_probability are
+combined into every 2..--max-legs leg parlay.
+
+The team shape k can be fitted from the outcomes dataset (fetch_outcomes.py):
+method of moments on per-team goal totals, var = mean + mean^2 / k.
+
+Outputs:
+  data/processed/parlays_<date>.csv   one row per combo, sorted by p_joint
+
+Usage:
+  python core/data_pipeline/parlay_pricer.py --date 2025-01-15
+  python core/data_pipeline/parlay_pricer.py --date 2025-01-15 --top 10 --max-legs 5 --shape 12
+  python core/data_pipeline/parlay_pricer.py --date 2025-01-15 --fit-start 2024-10-08 --fit-end 2025-01-14
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from fetch_outcomes import load_outcomes
+from schedule_index import load_season_index
+
+
+DEFAULT_SHAPE = 10.0          # team-shock shape k (CV of the team scoring rate = 1/sqrt(k))
+DEFAULT_EXACT_MAX_LEGS = 6
+DEFAULT_DRAWS = 20_000
+DEFAULT_SEED = 0
+DEFAULT_MAX_CELLS = 4_000_000
+COMBO_COLUMNS = ["game", "n_legs", "legs", "player_ids", "teams", "p_independent", "p_joint", "lift", "fair_odds", "method", "p_joint_se"]
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class Slate:
+    player_id: np.ndarray     # (P,) int64
+    name: np.ndarray          # (P,) str
+    team: np.ndarray          # (P,) str
+    team_code: np.ndarray     # (P,) int
+    game: np.ndarray          # (P,) str "AWAY@HOME"
+    lam: np.ndarray           # (P,) lambda_goal
+    p: np.ndarray             # (P,) goal_probability
+
+    @classmethod
+    def from_predictions(cls, pred: pd.DataFrame, matchups: Optional[Sequence[tuple[str, str]]] = None) -> "Slate":
+        """Slate from a predictions frame; with matchups, players outside them are dropped."""
+        missing = {"playerId", "name", "team", "lambda_goal"} - set(pred.columns)
+        if missing:
+            raise ValueError(f"Predictions are missing columns: {sorted(missing)}")
+        df = pred.dropna(subset=["playerId", "lambda_goal"]).drop_duplicates("playerId")
+        df = df.assign(team=df["team"].astype(str).str.upper())
+        if matchups is not None:
+            game_of = {t: f"{away}@{home}" for away, home in matchups for t in (away, home)}
+            df = df.assign(game=df["team"].map(game_of)).dropna(subset=["game"])
+        else:
+            df = df.assign(game=df["team"])
+        lam = df["lambda_goal"].to_numpy(dtype=np.float64)
+        p = df["goal_probability"].to_numpy(dtype=np.float64) if "goal_probability" in df else -np.expm1(-lam)
+        return cls(
+            player_id=df["playerId"].to_numpy(dtype=np.int64),
+            name=df["name"].astype(str).to_numpy(),
+            team=df["team"].to_numpy(dtype=str),
+            team_code=pd.factorize(df["team"])[0],
+            game=df["game"].astype(str).to_numpy(),
+            lam=lam,
+            p=p,
+        )
+
+    def __len__(self) -> int:
+        return self.player_id.size
+
+    def rows_for(self, player_ids: Sequence[int]) -> np.ndarray:
+        """Slate row per playerId; ValueError for ids not on the slate."""
+        index = pd.Index(self.player_id)
+        rows = index.get_indexer(np.asarray(player_ids, dtype=np.int64))
+        if (rows < 0).any():
+            unknown = np.asarray(player_ids)[rows < 0].tolist()
+            raise ValueError(f"Players not on the slate: {unknown}")
+        return rows
+
+
+# -----------------------------
+# Pricing core
+# -----------------------------
+
+def shocked_lambda(lam: np.ndarray, shape: float) -> np.ndarray:
+    """lambda' such that the gamma-shocked marginal equals 1 - exp(-lambda)."""
+    lam = np.asarray(lam, dtype=np.float64)
+    return lam if np.isinf(shape) else shape * np.expm1(lam / shape)
+
+
+def _log_laplace(total: np.ndarray, shape: float) -> np.ndarray:
+    """log E[exp(-total * G)] for G ~ Gamma(shape, 1/shape)."""
+    return -total if np.isinf(shape) else -shape * np.log1p(total / shape)
+
+
+def _exact(lam: np.ndarray, team: np.ndarray, shape: float, max_cells: int) -> np.ndarray:
+    """(C,) joint probability of combos (C, n) by inclusion-exclusion over leg subsets."""
+    c, n = lam.shape
+    subsets = ((np.arange(2 ** n)[:, None] >> np.arange(n)) & 1).astype(np.float64)   # (2^n, n)
+    signs = np.where(subsets.sum(axis=1) % 2, -1.0, 1.0)
+
+    same = team[:, :, None] == team[:, None, :]                                      # (C, n, n)
+    # count each team once: leg j represents its team if no earlier leg shares it
+    first = ~np.tril(same, k=-1).any(axis=2)                                          # (C, n)
+
+    out = np.empty(c)
+    step = max(1, max_cells // (n * n * subsets.shape[0]))
+    for s in range(0, c, step):
+        sl = slice(s, s + step)
+        # team total of leg j's team over each subset: (C, n, 2^n)
+        totals = np.einsum("cji,ci,si->cjs", same[sl], lam[sl], subsets)
+        log_e = (_log_laplace(totals, shape) * first[sl][:, :, None]).sum(axis=1)     # (C, 2^n)
+        out[sl] = np.exp(log_e) @ signs
+    return np.clip(out, 0.0, 1.0)
+
+
+def _monte_carlo(
+    lam: np.ndarray, team: np.ndarray, shape: float, draws: int, seed: int, max_cells: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """(C,) joint probability and its standard error, conditional on seeded team shocks."""
+    c, n = lam.shape
+    n_teams = int(team.max()) + 1
+    if np.isinf(shape):
+        shocks = np.ones((n_teams, 1))
+    else:
+        shocks = np.random.default_rng(seed).gamma(shape, 1.0 / shape, size=(n_teams, draws))
+
+    p = np.empty(c)
+    se = np.empty(c)
+    step = max(1, max_cells // (n * shocks.shape[1]))
+    for s in range(0, c, step):
+        sl = slice(s, s + step)
+        # (C, n, draws) -> product over legs
+        cond = (-np.expm1(-lam[sl][:, :, None] * shocks[team[sl]])).prod(axis=1)
+        p[sl] = cond.mean(axis=1)
+        se[sl] = cond.std(axis=1) / np.sqrt(cond.shape[1])
+    return p, se
+
+
+def joint_probability(
+    lam: np.ndarray,
+    team: np.ndarray,
+    shape: float = DEFAULT_SHAPE,
+    exact_max_legs: int = DEFAULT_EXACT_MAX_LEGS,
+    draws: int = DEFAULT_DRAWS,
+    seed: int = DEFAULT_SEED,
+    max_cells: int = DEFAULT_MAX_CELLS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    P(every leg scores) for C combos of n legs each.
+
+    lam: (C, n) lambda_goal per leg, team: (C, n) team codes. Returns (p, se);
+    se is 0 on the exact path.
+    """
+    lam = np.atleast_2d(np.asarray(lam, dtype=np.float64))
+    team = np.atleast_2d(np.asarray(team, dtype=np.int64))
+    if lam.shape != team.shape:
+        raise ValueError(f"lam {lam.shape} and team {team.shape} must have the same shape")
+    if shape <= 0:
+        raise ValueError(f"shape must be positive, got {shape}")
+    if lam.shape[0] == 0:
+        return np.zeros(0), np.zeros(0)
+
+    lam_s = shocked_lambda(lam, shape)
+    if lam.shape[1] <= exact_max_legs:
+        return _exact(lam_s, team, shape, max_cells), np.zeros(lam.shape[0])
+    return _monte_carlo(lam_s, team, shape, draws, seed, max_cells)
+
+
+# -----------------------------
+# Combos
+# -----------------------------
+
+def enumerate_combos(slate: Slate, top: int = 12, min_legs: int = 2, max_legs: int = 4) -> dict[int, np.ndarray]:
+    """
+    n_legs -> (C, n) slate rows: every combo of the top players (by goal
+    probability) within each game.
+    """
+    if min_legs < 1 or max_legs < min_legs:
+        raise ValueError(f"Need 1 <= min_legs <= max_legs, got {min_legs}..{max_legs}")
+    by_game = pd.DataFrame({"game": slate.game, "p": slate.p}).sort_values(["game", "p"], ascending=[True, False], kind="stable")
+    pools = [grp.index.to_numpy()[:top] for _, grp in by_game.groupby("game", sort=True)]
+
+    combos: dict[int, np.ndarray] = {}
+    for n in range(min_legs, max_legs + 1):
+        blocks = [np.array(list(itertools.combinations(pool, n)), dtype=np.int64) for pool in pools if pool.size >= n]
+        if blocks:
+            combos[n] = np.concatenate(blocks)
+    return combos
+
+
+def price_combos(
+    slate: Slate,
+    combos: dict[int, np.ndarray],
+    shape: float = DEFAULT_SHAPE,
+    exact_max_legs: int = DEFAULT_EXACT_MAX_LEGS,
+    draws: int = DEFAULT_DRAWS,
+    seed: int = DEFAULT_SEED,
+) -> pd.DataFrame:
+    """One row per combo (slate rows per leg, grouped by leg count), sorted by p_joint."""
+    frames = []
+    for n, rows in sorted(combos.items()):
+        p_joint, se = joint_probability(
+            slate.lam[rows], slate.team_code[rows], shape=shape, exact_max_legs=exact_max_legs, draws=draws, seed=seed
+        )
+        p_ind = slate.p[rows].prod(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lift = p_joint / p_ind
+            fair = 1.0 / p_joint
+        games = slate.game[rows]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "game": np.where((games == games[:, :1]).all(axis=1), games[:, 0], "MULTI"),
+                    "n_legs": n,
+                    "legs": [" + ".join(r) for r in slate.name[rows]],
+                    "player_ids": ["|".join(map(str, r)) for r in slate.player_id[rows]],
+                    "teams": ["|".join(r) for r in slate.team[rows]],
+                    "p_independent": p_ind,
+                    "p_joint": p_joint,
+                    "lift": lift,
+                    "fair_odds": fair,
+                    "method": "exact" if n <= exact_max_legs else "mc",
+                    "p_joint_se": se,
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=COMBO_COLUMNS)
+    out = pd.concat(frames, ignore_index=True)
+    return out.sort_values(["p_joint", "player_ids"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+
+def price_parlays(slate: Slate, parlays: Sequence[Sequence[int]], **kwargs) -> pd.DataFrame:
+    """Price arbitrary parlays given as playerId lists (any sizes, mixed freely)."""
+    combos: dict[int, list[np.ndarray]] = {}
+    for ids in parlays:
+        rows = slate.rows_for(ids)
+        if np.unique(rows).size != rows.size:
+            raise ValueError(f"Parlay repeats a player: {list(ids)}")
+        combos.setdefault(rows.size, []).append(rows)
+    return price_combos(slate, {n: np.stack(r) for n, r in combos.items()}, **kwargs)
+
+
+def fit_team_shape(outcomes: pd.DataFrame) -> float:
+    """
+    Gamma shape k from per-team goal totals (method of moments, pooled over
+    teams): sum(var - mean) = sum(mean^2) / k. inf when totals aren't overdispersed.
+    """
+    if outcomes.empty:
+        raise ValueError("No outcomes to fit the team shape from.")
+    totals = outcomes.groupby(["game_id", "team"])["goals"].sum().groupby(level="team")
+    stats = pd.DataFrame({"mean": totals.mean(), "var": totals.var(ddof=1), "n": totals.size()})
+    stats = stats[stats["n"] >= 2]
+    if stats.empty:
+        raise ValueError("Need at least two games per team to fit the team shape.")
+    excess = float(((stats["var"] - stats["mean"]) * stats["n"]).sum())
+    if excess <= 0:
+        return float("inf")
+    return float((stats["mean"] ** 2 * stats["n"]).sum() / excess)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Price correlated same-game anytime-scorer parlays for a slate.")
+    parser.add_argument("--date", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--predictions", help="Predictions CSV (default data/processed/predictions_<date>.csv)")
+    parser.add_argument("--top", type=int, default=12, help="Players per game to combine (by goal probability).")
+    parser.add_argument("--min-legs", type=int, default=2)
+    parser.add_argument("--max-legs", type=int, default=4)
+    parser.add_argument("--shape", type=float, default=DEFAULT_SHAPE, help="Team shock shape k (inf = independent legs).")
+    parser.add_argument("--fit-start", help="Fit --shape from outcomes from this date (YYYY-MM-DD).")
+    parser.add_argument("--fit-end", help="... to this date (inclusive).")
+    parser.add_argument("--exact-max-legs", type=int, default=DEFAULT_EXACT_MAX_LEGS)
+    parser.add_argument("--draws", type=int, default=DEFAULT_DRAWS, help="Monte Carlo shock draws per team.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--out", help="Output CSV (default data/processed/parlays_<date>.csv)")
+    args = parser.parse_args()
+
+    target_date = args.date.strip()
+    processed = _project_root() / "data" / "processed"
+    pred_path = Path(args.predictions) if args.predictions else processed / f"predictions_{target_date}.csv"
+    if not pred_path.exists():
+        raise FileNotFoundError(
+            f"Missing predictions file: {pred_path}\n"
+            f"Run: python core/data_pipeline/run_daily.py --date {target_date}"
+        )
+
+    shape = args.shape
+    if args.fit_start or args.fit_end:
+        if not (args.fit_start and args.fit_end):
+            parser.error("use both --fit-start and --fit-end")
+        shape = fit_team_shape(load_outcomes(args.fit_start, args.fit_end))
+        print(f"Fitted team shape k = {shape:.2f} ({args.fit_start}..{args.fit_end})")
+
+    matchups = load_season_index(target_date).matchups_on(target_date)
+    if not matchups:
+        print(f"No games on {target_date} in the schedule index.")
+        return 3
+    slate = Slate.from_predictions(pd.read_csv(pred_path), matchups)
+
+    t0 = time.perf_counter()
+    combos = enumerate_combos(slate, top=args.top, min_legs=args.min_legs, max_legs=args.max_legs)
+    priced = price_combos(
+        slate, combos, shape=shape, exact_max_legs=args.exact_max_legs, draws=args.draws, seed=args.seed
+    )
+    elapsed = time.perf_counter() - t0
+
+    print(f"{len(priced)} parlays over {len(matchups)} games ({len(slate)} players) in {elapsed:.2f} s, k = {shape:g}")
+    with pd.option_context("display.width", 160, "display.max_colwidth", 60):
+        print(priced.head(15)[["game", "legs", "p_independent", "p_joint", "lift", "fair_odds"]].to_string(index=False))
+
+    out = Path(args.out) if args.out else processed / f"parlays_{target_date}.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    priced.to_csv(out, index=False)
+    print(f"Saved: {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
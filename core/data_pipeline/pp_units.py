@@ -0,0 +1,190 @@
+"""
+pp_units.py
+-----------
+Power-play unit per (playerId, team), computed once per MoneyPuck refresh and
+looked up in constant time by every runner.
+
+Base (pp_source = "moneypuck"): the top pp1_top_n of each team by season 5on4
+icetime ("min" rank, model.pp1_flags) are unit 1, everyone else with a 5on4 row
+is 0. MoneyPuck can't tell PP2 from the rest, so the inference never says 2.
+
+Overrides (pp_source = "dailyfaceoff"): rows of inputs/dailyfaceoff_pp_<date>.csv
+are resolved to playerIds through identity.PlayerRegistry (not by name string)
+and replace the inferred unit. A team DailyFaceoff covers is taken whole: its
+unlisted players drop to unit 0 (pp_source "dailyfaceoff"), so demotions count.
+Teams missing from the file keep the inference; players the table doesn't know
+get unit 0 / pp_source "none".
+
+Lookups are by (playerId, team); a miss falls back to playerId alone, so a player
+traded since the MoneyPuck pull still finds their row.
+
+Cache (LOCAL ONLY):
+  data/cache/pp_units/<skaters stem>/   columnar table, rebuilt when the skaters.csv
+                                        content (sha1) or pp1_top_n changes
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar import read_frame, read_schema, write_frame
+from identity import PlayerRegistry
+from model import DEFAULT_PARAMS, ModelParams, pp1_flags
+from skaters_cache import ensure_skaters_cache, load_skaters_cached
+
+
+PP_COLUMNS = ["playerId", "team", "pp_unit", "pp_icetime", "pp_source"]
+UNKNOWN_SOURCE = "none"
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_pp_units_root() -> Path:
+    return _project_root() / "data" / "cache" / "pp_units"
+
+
+class PPUnitTable:
+    def __init__(self, table: pd.DataFrame, covered_teams: frozenset[str] = frozenset()):
+        """covered_teams: teams whose units all come from DailyFaceoff (see with_dailyfaceoff)."""
+        self.table = table[PP_COLUMNS].reset_index(drop=True)
+        self.covered_teams = frozenset(covered_teams)
+        ids = self.table["playerId"].to_numpy(dtype=np.int64)
+        teams = self.table["team"].astype(str).to_numpy()
+        self._units = self.table["pp_unit"].to_numpy(dtype=np.int64)
+        self._sources = self.table["pp_source"].astype(str).to_numpy(dtype=object)
+
+        self._by_key = pd.MultiIndex.from_arrays([ids, teams])
+        # id-only fallback: one row per player, DailyFaceoff rows first
+        order = np.argsort(self._sources != "dailyfaceoff", kind="stable")
+        first = pd.Index(ids[order]).duplicated(keep="first")
+        self._id_rows = order[~first]
+        self._by_id = pd.Index(ids[self._id_rows])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @classmethod
+    def from_moneypuck(cls, mp: pd.DataFrame, params: ModelParams = DEFAULT_PARAMS) -> "PPUnitTable":
+        """Infer units from a MoneyPuck skaters frame (needs playerId, team, situation, icetime)."""
+        pp = mp[mp["situation"].astype(str) == "5on4"]
+        pp = pp.drop_duplicates(["playerId", "team"])
+        team_codes, _ = pd.factorize(pp["team"].astype(str))
+        icetime = pp["icetime"].to_numpy(dtype=np.float64)
+        return cls(
+            pd.DataFrame(
+                {
+                    "playerId": pp["playerId"].to_numpy(dtype=np.int64),
+                    "team": pp["team"].astype(str).str.upper().to_numpy(),
+                    "pp_unit": pp1_flags(icetime, team_codes, params).astype(np.int64),
+                    "pp_icetime": icetime,
+                    "pp_source": "moneypuck",
+                }
+            )
+        )
+
+    def with_dailyfaceoff(self, pp_df: Optional[pd.DataFrame], registry: PlayerRegistry) -> "PPUnitTable":
+        """
+        New table with DailyFaceoff units (player, team, pp_unit) applied by playerId.
+        Every team in pp_df is covered: its players DailyFaceoff doesn't list get unit 0.
+        """
+        if pp_df is None or pp_df.empty:
+            return self
+        covered = self.covered_teams | set(pp_df["team"].astype(str).str.upper())
+        ids = registry.resolve_frame(pp_df, "player", "team", source="dailyfaceoff")
+        dfo = pp_df.assign(playerId=ids).dropna(subset=["playerId"]).astype({"playerId": "int64"})
+        dfo = dfo.drop_duplicates("playerId", keep="last")
+        if dfo.empty:
+            return PPUnitTable(self._demoted(self.table, covered), covered)
+
+        base = self.table
+        icetime = base.drop_duplicates("playerId").set_index("playerId")["pp_icetime"]
+        override = pd.DataFrame(
+            {
+                "playerId": dfo["playerId"].to_numpy(),
+                "team": dfo["team"].astype(str).str.upper().to_numpy(),
+                "pp_unit": pd.to_numeric(dfo["pp_unit"], errors="coerce").fillna(0).astype(np.int64).to_numpy(),
+                "pp_icetime": dfo["playerId"].map(icetime).to_numpy(dtype=np.float64),
+                "pp_source": "dailyfaceoff",
+            }
+        )
+        kept = self._demoted(base[~base["playerId"].isin(override["playerId"])], covered)
+        return PPUnitTable(pd.concat([kept, override], ignore_index=True), covered)
+
+    @staticmethod
+    def _demoted(table: pd.DataFrame, covered: set[str]) -> pd.DataFrame:
+        """Inferred rows of covered teams set to unit 0 / pp_source "dailyfaceoff"."""
+        demote = table["team"].astype(str).isin(covered).to_numpy() & (table["pp_source"] != "dailyfaceoff").to_numpy()
+        return table.assign(
+            pp_unit=np.where(demote, 0, table["pp_unit"].to_numpy(dtype=np.int64)),
+            pp_source=np.where(demote, "dailyfaceoff", table["pp_source"].astype(str).to_numpy(dtype=object)),
+        )
+
+    def _rows(self, player_ids: np.ndarray, teams: np.ndarray) -> np.ndarray:
+        """Row position per (playerId, team), -1 where unknown."""
+        pos = self._by_key.get_indexer(pd.MultiIndex.from_arrays([player_ids, teams]))
+        miss = pos < 0
+        if miss.any():
+            by_id = self._by_id.get_indexer(player_ids[miss])
+            pos[miss] = np.where(by_id >= 0, self._id_rows[np.maximum(by_id, 0)], -1)
+        return pos
+
+    def lookup(self, player_id: int, team: str = "") -> tuple[int, str]:
+        """(pp_unit, pp_source) for one player."""
+        pos = self._rows(np.array([player_id], dtype=np.int64), np.array([team.upper()], dtype=object))[0]
+        if pos < 0:
+            return 0, UNKNOWN_SOURCE
+        return int(self._units[pos]), str(self._sources[pos])
+
+    def assign(self, df: pd.DataFrame, id_col: str = "playerId", team_col: str = "team") -> pd.DataFrame:
+        """df plus pp_unit, pp_source, is_pp1, is_pp2 (any existing ones are replaced)."""
+        ids = pd.to_numeric(df[id_col], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        teams = df[team_col].astype(str).str.upper().to_numpy(dtype=object)
+        pos = self._rows(ids, teams)
+        found = pos >= 0
+        unit = np.where(found, self._units[np.maximum(pos, 0)], 0) if len(self) else np.zeros(len(df), dtype=np.int64)
+        source = np.where(found, self._sources[np.maximum(pos, 0)], UNKNOWN_SOURCE) if len(self) else UNKNOWN_SOURCE
+        if self.covered_teams:
+            # Covered team, but the row found isn't DailyFaceoff's (traded player via the id fallback, unknown player)
+            demote = np.isin(teams, list(self.covered_teams)) & (np.asarray(source, dtype=object) != "dailyfaceoff")
+            unit = np.where(demote, 0, unit)
+            source = np.where(demote, "dailyfaceoff", source)
+        return df.assign(
+            pp_unit=unit,
+            pp_source=source,
+            is_pp1=(unit == 1).astype(int),
+            is_pp2=(unit == 2).astype(int),
+        )
+
+
+def load_pp_units(
+    skaters_csv: Path,
+    params: ModelParams = DEFAULT_PARAMS,
+    cache_root: Optional[Path] = None,
+    rebuild: bool = False,
+) -> PPUnitTable:
+    """MoneyPuck-inferred table for skaters_csv, from the cache when still valid."""
+    skaters_csv = Path(skaters_csv)
+    if not skaters_csv.exists():
+        raise FileNotFoundError(
+            f"Missing MoneyPuck file: {skaters_csv}\n"
+            "Put skaters.csv into data/raw/ (kept local, not committed)."
+        )
+    source = (read_schema(ensure_skaters_cache(skaters_csv)) or {}).get("meta", {}).get("source", {})
+    meta = {"source_sha1": source.get("sha1"), "pp1_top_n": params.pp1_top_n}
+    out_dir = (cache_root or default_pp_units_root()) / skaters_csv.stem
+
+    schema = None if rebuild else read_schema(out_dir)
+    if schema is not None and meta["source_sha1"] and schema.get("meta") == meta:
+        return PPUnitTable(read_frame(out_dir, mmap=False))
+
+    mp = load_skaters_cached(skaters_csv, columns=["playerId", "team", "situation", "icetime"])
+    table = PPUnitTable.from_moneypuck(mp, params)
+    write_frame(table.table, out_dir, meta=meta)
+    return table
@@ -0,0 +1,284 @@
+"""
+replay_server.py
+----------------
+Record real HTTP responses as fixtures and replay them from a local stand-in
+server, so the fetchers (NHL API, The Odds API, DailyFaceoff) run offline.
+
+Record (any fetcher, through http_client.default_client()):
+  NHLSCORER_RECORD_DIR=data/fixtures/http python fetch_outcomes.py --date 2025-01-15
+
+Replay:
+  python replay_server.py serve --fixtures data/fixtures/http --port 8765 \
+      --latency-ms 80 --jitter-ms 40 --error-rate 0.1 --seed 0
+  NHLSCORER_REPLAY_URL=http://127.0.0.1:8765 python fetch_outcomes.py --date 2025-01-15
+
+Fixture layout:
+  <fixtures>/<host>/<sha256(path?query)>.json   {request, status, headers, body}
+The apiKey query parameter is never recorded and is ignored when matching.
+
+Server behaviour:
+- latency: latency_ms + uniform(0, jitter_ms) per request
+- errors: with probability error_rate a request gets error_status (503 by default,
+  with Retry-After: 0) instead of the fixture
+- both are drawn from (seed, request, how many times that request was seen), not a
+  shared RNG, so which requests fail doesn't depend on thread timing
+- recording skips 304s (empty revalidation bodies) and never replaces a 2xx
+  fixture with an error response
+- ETag / If-None-Match is honored (304), so http_cache revalidation can be exercised
+- unknown requests -> 404; GET /_stats -> counters as JSON
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+
+
+IGNORED_PARAMS = {"apiKey"}
+KEPT_HEADERS = {
+    "content-type",
+    "cache-control",
+    "etag",
+    "last-modified",
+    "retry-after",
+    "x-requests-last",
+    "x-requests-remaining",
+    "x-requests-used",
+}
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_fixtures_dir() -> Path:
+    return _project_root() / "data" / "fixtures" / "http"
+
+
+def _canonical_query(query: str, params: Optional[dict] = None) -> str:
+    pairs = parse_qsl(query, keep_blank_values=True) + [(k, str(v)) for k, v in (params or {}).items()]
+    return urlencode(sorted((k, v) for k, v in pairs if k not in IGNORED_PARAMS))
+
+
+def fixture_key(path: str, query: str = "", params: Optional[dict] = None) -> str:
+    canon = f"{path}?{_canonical_query(query, params)}"
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or default_fixtures_dir())
+
+    def path_for(self, host: str, path: str, query: str = "", params: Optional[dict] = None) -> Path:
+        return self.root / host / f"{fixture_key(path, query, params)}.json"
+
+    def record(self, url: str, params: Optional[dict], resp: requests.Response) -> None:
+        """
+        http_client response hook: save one response. 304s are skipped, and an
+        error response doesn't replace a recorded 2xx.
+        """
+        if resp.status_code == 304:
+            return
+        parsed = urlparse(url)
+        out = self.path_for(parsed.netloc, parsed.path, parsed.query, params)
+        if resp.status_code >= 300 and out.exists():
+            try:
+                if 200 <= int(json.loads(out.read_text(encoding="utf-8"))["status"]) < 300:
+                    return
+            except (ValueError, KeyError):
+                pass  # unreadable fixture: replace it
+        out.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {
+            "request": {
+                "method": resp.request.method if resp.request is not None else "GET",
+                "host": parsed.netloc,
+                "path": parsed.path,
+                "query": _canonical_query(parsed.query, params),
+            },
+            "status": resp.status_code,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() in KEPT_HEADERS},
+            "body": resp.text,
+        }
+        tmp = out.parent / f".{out.name}.{uuid.uuid4().hex}.tmp"
+        tmp.write_text(json.dumps(fixture, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, out)
+
+    def load(self, host: str, path: str, query: str = "") -> Optional[dict]:
+        p = self.path_for(host, path, query)
+        if not p.exists():
+            return None
+        return json.loads(p.read_text(encoding="utf-8"))
+
+    def count(self) -> int:
+        return sum(1 for _ in self.root.glob("*/*.json")) if self.root.exists() else 0
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        fixtures: FixtureStore,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+    ):
+        super().__init__((host, port), _ReplayHandler)
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.seen: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "served": 0, "not_modified": 0, "injected_errors": 0, "missing": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self, host: str, path: str, query: str = "") -> tuple[float, bool]:
+        """
+        (delay seconds, inject error?) for one request, a function of the seed, the
+        request and its per-request count only.
+        """
+        key = f"{host}/{fixture_key(path, query)}"
+        with self.lock:
+            self.stats["requests"] += 1
+            n = self.seen.get(key, 0)
+            self.seen[key] = n + 1
+        digest = hashlib.sha256(f"{self.seed}|{key}|{n}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        delay = (self.latency_ms + rng.uniform(0.0, self.jitter_ms)) / 1000.0
+        fail = self.error_rate > 0 and rng.random() < self.error_rate
+        return delay, fail
+
+    def bump(self, counter: str) -> None:
+        with self.lock:
+            self.stats[counter] += 1
+
+    def start(self) -> "ReplayServer":
+        """Serve from a background thread (in-process benchmarks); returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real hosts
+    server: ReplayServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        if parsed.path == "/_stats":
+            with self.server.lock:
+                body = json.dumps(self.server.stats).encode("utf-8")
+            self._send(200, body, {"Content-Type": "application/json"})
+            return
+
+        # /<host>/<path...>
+        host, _, rest = parsed.path.lstrip("/").partition("/")
+
+        delay, fail = self.server.draw(host, "/" + rest, parsed.query)
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            self.server.bump("injected_errors")
+            self._send(self.server.error_status, b"injected error", {"Retry-After": "0"})
+            return
+        fixture = self.server.fixtures.load(host, "/" + rest, parsed.query)
+        if fixture is None:
+            self.server.bump("missing")
+            self._send(404, f"no fixture for {host}/{rest}?{parsed.query}".encode("utf-8"))
+            return
+
+        headers = dict(fixture["headers"])
+        etag = next((v for k, v in headers.items() if k.lower() == "etag"), None)
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            self.server.bump("not_modified")
+            self._send(304, b"", {"ETag": etag})
+            return
+
+        self.server.bump("served")
+        self._send(int(fixture["status"]), fixture["body"].encode("utf-8"), headers)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in server replaying recorded HTTP fixtures.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Replay fixtures over HTTP.")
+    p_serve.add_argument("--fixtures", default=str(default_fixtures_dir()))
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay per request.")
+    p_serve.add_argument("--jitter-ms", type=float, default=0.0, help="Extra uniform random delay per request.")
+    p_serve.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error.")
+    p_serve.add_argument("--error-status", type=int, default=503)
+    p_serve.add_argument("--seed", type=int, default=0, help="Seed for latency/error injection (per request, thread-independent).")
+
+    p_list = sub.add_parser("list", help="List recorded fixtures.")
+    p_list.add_argument("--fixtures", default=str(default_fixtures_dir()))
+
+    args = parser.parse_args()
+    store = FixtureStore(Path(args.fixtures))
+
+    if args.command == "list":
+        for p in sorted(store.root.glob("*/*.json")):
+            req = json.loads(p.read_text(encoding="utf-8"))["request"]
+            print(f"{req['host']}{req['path']}" + (f"?{req['query']}" if req["query"] else ""))
+        print(f"{store.count()} fixtures in {store.root}")
+        return 0
+
+    server = ReplayServer(
+        store,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    print(f"Replaying {store.count()} fixtures from {store.root} on {server.base_url}")
+    print(f"  export NHLSCORER_REPLAY_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Stats: {server.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
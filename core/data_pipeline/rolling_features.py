@@ -0,0 +1,347 @@
+"""
+rolling_features.py
+-------------------
+Recency-sensitive player form from game-by-game data, maintained incrementally.
+
+Ingest: MoneyPuck game-by-game skater CSVs (data/raw/gamebygame/*.csv, one file
+per player as downloaded from MoneyPuck) -> warehouse table player_games, one row
+per player-game: icetime, 5on4 (PP) icetime, xG, goals. Only games not already
+in the table, or whose values changed (MoneyPuck corrections), are loaded.
+
+Features per player, state in warehouse table player_form:
+- EWMA over games (span, default 10) of xG, icetime and PP icetime, kept as decayed
+  sums  s = x + d * s,  w = 1 + d * w  (d = 1 - 2 / (span + 1)); s / w equals
+  pandas ewm(span=span, adjust=True).mean()
+- sums over the last N games (default 10)
+form_frame() turns the state into per-game / per-60 features (form_xg_per_game,
+form_toi_per_game, form_pp_toi_per_game, form_xg_per60, lastn_*).
+
+Incremental: every load_player_games() call gets a loaded_seq, and update_form()
+folds only rows above the applied watermark into the state - O(new games), no
+season recompute. A player whose new rows aren't strictly after their last
+applied game (late or corrected game) is refolded from their own history.
+Changing span / N refolds everything.
+
+Backtests: form_as_of(date) only ever uses games before date.
+
+Usage:
+  python core/data_pipeline/rolling_features.py ingest --dir data/raw/gamebygame
+  python core/data_pipeline/rolling_features.py update
+  python core/data_pipeline/rolling_features.py show --top 20
+  python core/data_pipeline/run_daily.py --date 2025-01-15 --use-form
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import warehouse
+from schemas import read_csv_schema
+
+
+DEFAULT_SPAN = 10
+DEFAULT_LAST_N = 10
+FORM_VERSION = 1
+
+GAME_COLUMNS = ["date", "game_id", "player_id", "player", "team", "icetime", "pp_icetime", "xg", "goals"]
+FEATURES = ["xg", "icetime", "pp_icetime"]
+STATE_COLUMNS = warehouse.PLAYER_FORM_COLUMNS
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_gamebygame_dir() -> Path:
+    return _project_root() / "data" / "raw" / "gamebygame"
+
+
+# -----------------------------
+# Ingest
+# -----------------------------
+
+def parse_gamebygame(df: pd.DataFrame) -> pd.DataFrame:
+    """MoneyPuck game-by-game rows (one per situation) -> one row per player-game."""
+    df = df.assign(
+        date=pd.to_datetime(df["gameDate"].astype(str), format="%Y%m%d").dt.strftime("%Y-%m-%d"),
+        situation=df["situation"].astype(str),
+    )
+    base = df[df["situation"] == "all"].rename(
+        columns={"gameId": "game_id", "playerId": "player_id", "name": "player", "playerTeam": "team",
+                 "I_F_xGoals": "xg", "I_F_goals": "goals"}
+    )
+    pp = df[df["situation"] == "5on4"][["gameId", "playerId", "icetime"]].rename(
+        columns={"gameId": "game_id", "playerId": "player_id", "icetime": "pp_icetime"}
+    )
+    games = base.merge(pp, on=["game_id", "player_id"], how="left")
+    games["pp_icetime"] = games["pp_icetime"].fillna(0.0)
+    games["team"] = games["team"].astype(str).str.upper()
+    games["goals"] = games["goals"].fillna(0).astype(int)
+    return games[GAME_COLUMNS].drop_duplicates(["game_id", "player_id"], keep="last")
+
+
+def read_gamebygame_dir(src_dir: Optional[Path] = None) -> pd.DataFrame:
+    src_dir = Path(src_dir or default_gamebygame_dir())
+    files = sorted(src_dir.glob("*.csv"))
+    if not files:
+        raise FileNotFoundError(
+            f"No game-by-game CSVs in {src_dir}\n"
+            "Download MoneyPuck skater game-by-game files (one per player) into that folder."
+        )
+    return parse_gamebygame(pd.concat([read_csv_schema(f, "moneypuck_gamebygame") for f in files], ignore_index=True))
+
+
+def ingest_player_games(conn: sqlite3.Connection, games: pd.DataFrame, replace: bool = False) -> int:
+    """
+    Load player-games the warehouse doesn't have yet or whose values changed
+    (all of them with replace=True). Loaded rows get a new loaded_seq, so
+    update_form() refolds players with corrected games.
+    """
+    if not replace and not games.empty:
+        have = pd.read_sql_query(f"SELECT {', '.join(GAME_COLUMNS)} FROM player_games", conn)
+        if not have.empty:
+            both = games[GAME_COLUMNS].merge(
+                have, on=["game_id", "player_id"], how="left", suffixes=("", "_have"), indicator=True
+            )
+            changed = (both["_merge"] == "left_only").to_numpy(copy=True)
+            for col in (c for c in GAME_COLUMNS if c not in ("game_id", "player_id")):
+                new, old = both[col], both[f"{col}_have"]
+                if col in ("icetime", "pp_icetime", "xg", "goals"):
+                    new = new.to_numpy(dtype=np.float64)
+                    old = old.to_numpy(dtype=np.float64)
+                    same = np.isclose(new, old, rtol=1e-12, atol=0.0, equal_nan=True)
+                else:
+                    same = (new.astype(str) == old.astype(str)).to_numpy()
+                changed |= ~same
+            games = games[changed]
+    return warehouse.load_player_games(conn, games)
+
+
+# -----------------------------
+# State
+# -----------------------------
+
+def _decay(span: int) -> float:
+    return 1.0 - 2.0 / (span + 1.0)
+
+
+def _fold(state: pd.DataFrame, rows: pd.DataFrame, span: int) -> pd.DataFrame:
+    """
+    Fold rows (any number of games per player, in any order) into the EWMA state.
+    For a player with m new games x_1..x_m:  s' = d^m * s + sum_j d^(m-j) * x_j
+    (same for the weight with x = 1). State is indexed by player_id; players
+    absent from it start at zero.
+    """
+    d = _decay(span)
+    rows = rows.sort_values(["player_id", "date", "game_id"], kind="stable")
+    by_player = rows.groupby("player_id", sort=True)
+    m = by_player.size()
+    w = d ** by_player.cumcount(ascending=False).to_numpy(dtype=np.float64)   # 1 for the newest game
+
+    sums = rows[FEATURES].fillna(0.0).mul(w, axis=0).groupby(rows["player_id"]).sum()
+    wsum = pd.Series(w, index=rows.index).groupby(rows["player_id"]).sum()
+    last = by_player[["date", "game_id", "player", "team"]].last()
+
+    prev = state.reindex(m.index)
+
+    def before(col: str) -> np.ndarray:
+        return prev[col].fillna(0).to_numpy(dtype=np.float64)
+
+    carry = d ** m.to_numpy(dtype=np.float64)
+    out = pd.DataFrame(index=m.index)
+    out["player"] = last["player"]
+    out["team"] = last["team"]
+    out["last_date"] = last["date"]
+    out["last_game_id"] = last["game_id"]
+    out["games"] = (before("games") + m.to_numpy()).astype(np.int64)
+    out["ewm_weight"] = before("ewm_weight") * carry + wsum.to_numpy()
+    for f in FEATURES:
+        out[f"ewm_{f}"] = before(f"ewm_{f}") * carry + sums[f].to_numpy()
+    return out
+
+
+def _last_n(history: pd.DataFrame, last_n: int) -> pd.DataFrame:
+    """Sums over each player's last_n games of history."""
+    tail = history.sort_values(["player_id", "date", "game_id"], kind="stable").groupby("player_id").tail(last_n)
+    out = tail.groupby("player_id")[FEATURES].sum().add_prefix("lastn_")
+    out["lastn_games"] = tail.groupby("player_id").size()
+    return out
+
+
+LAST_N_SQL = """
+SELECT player_id, date, game_id, xg, icetime, pp_icetime FROM (
+    SELECT g.*, ROW_NUMBER() OVER (PARTITION BY g.player_id ORDER BY g.date DESC, g.game_id DESC) AS rn
+    FROM player_games g JOIN _form_players p ON p.player_id = g.player_id
+) WHERE rn <= :n
+"""
+
+
+def _meta(conn: sqlite3.Connection) -> dict[str, str]:
+    return dict(conn.execute("SELECT key, value FROM form_meta").fetchall())
+
+
+def _params_json(span: int, last_n: int) -> str:
+    return json.dumps({"span": span, "last_n": last_n, "version": FORM_VERSION}, sort_keys=True)
+
+
+def update_form(conn: sqlite3.Connection, span: int = DEFAULT_SPAN, last_n: int = DEFAULT_LAST_N) -> dict[str, int]:
+    """Fold player_games rows loaded since the last update into player_form."""
+    params = _params_json(span, last_n)
+    meta = _meta(conn)
+    applied = int(meta.get("applied_seq", 0)) if meta.get("params") == params else 0
+    if applied == 0:
+        with conn:
+            conn.execute("DELETE FROM player_form")
+
+    new = pd.read_sql_query(
+        f"SELECT {', '.join(GAME_COLUMNS)}, loaded_seq FROM player_games WHERE loaded_seq > ?",
+        conn,
+        params=(applied,),
+    )
+    if new.empty:
+        return {"new_games": 0, "players": 0, "refolded": 0}
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _form_players (player_id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM _form_players")
+    conn.executemany("INSERT INTO _form_players VALUES (?)", ((int(p),) for p in new["player_id"].unique()))
+
+    state = pd.read_sql_query(
+        "SELECT f.* FROM player_form f JOIN _form_players p ON p.player_id = f.player_id", conn
+    ).set_index("player_id")
+
+    # Late / corrected games: new rows at or before the applied position -> refold that player
+    first = new.sort_values(["player_id", "date", "game_id"]).groupby("player_id")[["date", "game_id"]].first()
+    known = first.join(state[["last_date", "last_game_id"]], how="inner")
+    late = known.index[
+        (known["date"] < known["last_date"])
+        | ((known["date"] == known["last_date"]) & (known["game_id"] <= known["last_game_id"]))
+    ]
+    rows = new[~new["player_id"].isin(late)]
+    if len(late):
+        history = pd.read_sql_query(
+            f"SELECT {', '.join(GAME_COLUMNS)} FROM player_games WHERE player_id IN ({', '.join('?' * len(late))})",
+            conn,
+            params=[int(p) for p in late],
+        )
+        rows = pd.concat([rows, history], ignore_index=True)
+        state = state.drop(index=late)
+
+    folded = _fold(state, rows, span)
+    lastn = _last_n(pd.read_sql_query(LAST_N_SQL, conn, params={"n": last_n}), last_n)
+    folded = folded.join(lastn, how="left").fillna({c: 0 for c in lastn.columns})
+    warehouse.load_player_form(conn, folded.reset_index())
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO form_meta (key, value) VALUES (?, ?)",
+            [("params", params), ("applied_seq", str(int(new["loaded_seq"].max())))],
+        )
+    return {"new_games": len(new), "players": len(folded), "refolded": len(late)}
+
+
+# -----------------------------
+# Features
+# -----------------------------
+
+def form_frame(state: pd.DataFrame) -> pd.DataFrame:
+    """Per-player form features from a state frame (player_form rows)."""
+    s = state.reset_index() if "player_id" not in state.columns else state
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = pd.DataFrame(
+            {
+                "playerId": s["player_id"].astype("int64").to_numpy(),
+                "form_last_date": s["last_date"].to_numpy(),
+                "form_games": s["games"].astype(int).to_numpy(),
+                "form_xg_per_game": (s["ewm_xg"] / s["ewm_weight"]).to_numpy(),
+                "form_toi_per_game": (s["ewm_icetime"] / s["ewm_weight"]).to_numpy(),
+                "form_pp_toi_per_game": (s["ewm_pp_icetime"] / s["ewm_weight"]).to_numpy(),
+                "form_xg_per60": (s["ewm_xg"] / s["ewm_icetime"] * 3600).to_numpy(),
+                "lastn_games": s["lastn_games"].astype(int).to_numpy(),
+                "lastn_xg_per60": (s["lastn_xg"] / s["lastn_icetime"] * 3600).to_numpy(),
+                "lastn_toi_per_game": (s["lastn_icetime"] / s["lastn_games"]).to_numpy(),
+                "lastn_pp_toi_per_game": (s["lastn_pp_icetime"] / s["lastn_games"]).to_numpy(),
+            }
+        )
+    return out.replace([np.inf, -np.inf], np.nan)
+
+
+def load_form(conn: sqlite3.Connection) -> pd.DataFrame:
+    return form_frame(pd.read_sql_query("SELECT * FROM player_form", conn))
+
+
+def form_version(conn: sqlite3.Connection) -> dict[str, str]:
+    """What the current state reflects (for stage-cache keys)."""
+    meta = _meta(conn)
+    return {"params": meta.get("params", ""), "applied_seq": meta.get("applied_seq", "0")}
+
+
+def form_as_of(
+    conn: sqlite3.Connection,
+    target_date: str,
+    span: int = DEFAULT_SPAN,
+    last_n: int = DEFAULT_LAST_N,
+) -> pd.DataFrame:
+    """
+    Form entering target_date (games strictly before it). Served from the
+    incremental state when it is fully applied and older than target_date;
+    otherwise (backtests) recomputed from player_games.
+    """
+    meta = _meta(conn)
+    watermark = conn.execute("SELECT MAX(last_date) FROM player_form").fetchone()[0]
+    max_seq = conn.execute("SELECT COALESCE(MAX(loaded_seq), 0) FROM player_games").fetchone()[0]
+    up_to_date = meta.get("params") == _params_json(span, last_n) and int(meta.get("applied_seq", 0)) == max_seq
+    if up_to_date and watermark is not None and watermark < target_date:
+        return load_form(conn)
+
+    history = pd.read_sql_query(
+        f"SELECT {', '.join(GAME_COLUMNS)} FROM player_games WHERE date < ?", conn, params=(target_date,)
+    )
+    if history.empty:
+        return form_frame(pd.DataFrame(columns=STATE_COLUMNS))
+    state = _fold(pd.DataFrame(columns=STATE_COLUMNS).set_index("player_id"), history, span)
+    return form_frame(state.join(_last_n(history, last_n), how="left"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Game-by-game ingest and incremental rolling form features.")
+    parser.add_argument("--db", default=str(warehouse.default_db_path()))
+    parser.add_argument("--span", type=int, default=DEFAULT_SPAN, help="EWMA span in games.")
+    parser.add_argument("--last-n", type=int, default=DEFAULT_LAST_N, help="Window for last-N features.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Load new player-games from MoneyPuck game-by-game CSVs, then update.")
+    p_ingest.add_argument("--dir", default=str(default_gamebygame_dir()))
+    p_ingest.add_argument("--replace", action="store_true", help="Re-load games already in the warehouse.")
+
+    sub.add_parser("update", help="Fold newly loaded player-games into the form state.")
+
+    p_show = sub.add_parser("show", help="Print form features.")
+    p_show.add_argument("--as-of", help="YYYY-MM-DD: form entering this date (default: current state)")
+    p_show.add_argument("--top", type=int, default=20)
+
+    args = parser.parse_args()
+    conn = warehouse.connect(Path(args.db))
+
+    if args.command == "ingest":
+        n = ingest_player_games(conn, read_gamebygame_dir(Path(args.dir)), replace=args.replace)
+        print(f"Loaded player-games: {n}")
+    if args.command in ("ingest", "update"):
+        stats = update_form(conn, span=args.span, last_n=args.last_n)
+        print(f"Form update: {stats}")
+    else:
+        form = form_as_of(conn, args.as_of, args.span, args.last_n) if args.as_of else load_form(conn)
+        print(form.sort_values("form_xg_per60", ascending=False).head(args.top).to_string(index=False))
+
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
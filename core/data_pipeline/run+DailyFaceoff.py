@@ -22,7 +22,13 @@ from datetime import datetime
 from pathlib import Path
 import numpy as np
 import pandas as pd
-import requests
+
+from http_cache import nhl_api_cache
+from identity import PlayerRegistry
+from names import normalize_names
+from pp_units import PPUnitTable, load_pp_units
+from schemas import read_csv_schema, schema_columns
+from skaters_cache import load_skaters_cached
 
 
 # -----------------------------
@@ -39,12 +45,6 @@ def iso_today_utc() -> str:
     return datetime.utcnow().strftime("%Y-%m-%d")
 
 
-def normalize_name(s: str) -> str:
-    """Basic name normalization for joins."""
-    if pd.isna(s):
-        return ""
-    return str(s).strip().lower()
-
 def load_dailyfaceoff_pp(paths: Paths, target_date: str) -> pd.DataFrame:
     """
     Load DailyFaceoff powerplay units for a given date.
@@ -58,8 +58,8 @@ def load_dailyfaceoff_pp(paths: Paths, target_date: str) -> pd.DataFrame:
     if not pp_path.exists():
         raise FileNotFoundError(f"Missing DailyFaceoff PP file: {pp_path}")
 
-    df = pd.read_csv(pp_path)
-    df["player_norm"] = df["player"].map(normalize_name)
+    df = read_csv_schema(pp_path, "dailyfaceoff_pp")
+    df["player_norm"] = normalize_names(df["player"])
     df["team"] = df["team"].astype(str).str.upper()
     df["pp_unit"] = pd.to_numeric(df["pp_unit"], errors="coerce").fillna(0).astype(int)
 
@@ -99,6 +99,7 @@ def get_paths() -> Paths:
 def load_moneypuck_skaters_csv(paths: Paths) -> pd.DataFrame:
     """
     Load MoneyPuck skaters CSV from data/raw/skaters.csv.
+    Served from the columnar cache in data/cache/skaters/ after the first parse.
     """
     skaters_path = paths.data_raw / "skaters.csv"
     if not skaters_path.exists():
@@ -106,7 +107,7 @@ def load_moneypuck_skaters_csv(paths: Paths) -> pd.DataFrame:
             f"Missing MoneyPuck file: {skaters_path}\n"
             "Put skaters.csv into data/raw/ (kept local, not committed)."
         )
-    mp = pd.read_csv(skaters_path)
+    mp = load_skaters_cached(skaters_path, columns=schema_columns("moneypuck_skaters"))
     return mp
 
 
@@ -114,11 +115,10 @@ def fetch_nhl_schedule_now() -> dict:
     """
     Fetch current NHL schedule block (official API).
     Note: This returns 'now' schedule window, not arbitrary date.
+    Served from the on-disk HTTP cache (short TTL, see http_cache.py).
     """
     url = "https://api-web.nhle.com/v1/schedule/now"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    return nhl_api_cache().get_json(url, timeout=30)
 
 
 def extract_teams_for_date(schedule_json: dict, target_date: str) -> set[str]:
@@ -146,7 +146,12 @@ def extract_teams_for_date(schedule_json: dict, target_date: str) -> set[str]:
 # Model: predictions-only (same logic as your status doc)
 # -----------------------------
 
-def build_predictions(mp: pd.DataFrame, teams_today: set[str], pp_df: pd.DataFrame | None = None) -> pd.DataFrame:
+def build_predictions(
+    mp: pd.DataFrame,
+    teams_today: set[str],
+    pp_df: pd.DataFrame | None = None,
+    pp_units: PPUnitTable | None = None,
+) -> pd.DataFrame:
 
     """
     Build player goal probabilities using MoneyPuck xG per game + PP1 boost.
@@ -181,46 +186,12 @@ def build_predictions(mp: pd.DataFrame, teams_today: set[str], pp_df: pd.DataFra
     todays_players["toi_multiplier"] = todays_players["toi_ratio"].clip(lower=0.6, upper=1.4)
 
 
-    # Determine PP1 via 5on4 icetime rank (top 5 per team)
-    mp_pp = mp[mp["situation"] == "5on4"].copy()
-    mp_pp["pp_toi_rank"] = mp_pp.groupby("team")["icetime"].rank(
-        ascending=False, method="min"
-    )
-    mp_pp["is_pp1"] = (mp_pp["pp_toi_rank"] <= 5).astype(int)
-
-    # Merge PP1 indicator (by name)
-    todays_players = todays_players.merge(
-        mp_pp[["name", "is_pp1"]],
-        on="name",
-        how="left",
-    )
-    todays_players["is_pp1"] = todays_players["is_pp1"].fillna(0).astype(int)
-
-    # --- Override PP unit from DailyFaceoff if provided ---
+    # PP units from the precomputed (playerId, team) table (pp_units.py);
+    # DailyFaceoff wins where available, resolved by player identity, not name string
+    units = pp_units if pp_units is not None else PPUnitTable.from_moneypuck(mp)
     if pp_df is not None and not pp_df.empty:
-        # Merge by normalized name + team
-        todays_players["player_norm"] = todays_players["name"].map(normalize_name)
-        todays_players = todays_players.merge(
-            pp_df[["player_norm", "team", "pp_unit"]],
-            left_on=["player_norm", "team"],
-            right_on=["player_norm", "team"],
-            how="left",
-        )
-
-    # DailyFaceoff wins when available
-    todays_players["is_pp1"] = (todays_players["pp_unit"] == 1).astype(int)
-
-    # Optional: keep PP2 flag for later modeling
-    todays_players["is_pp2"] = (todays_players["pp_unit"] == 2).astype(int)
-
-    # If pp_unit missing (NaN), fallback to MoneyPuck inference
-    # (so we don’t accidentally set everyone to 0)
-    missing_pp = todays_players["pp_unit"].isna()
-    todays_players.loc[missing_pp, "is_pp1"] = todays_players.loc[missing_pp, "is_pp1"].fillna(0).astype(int)
-    todays_players.loc[missing_pp, "is_pp2"] = 0
-else:
-    todays_players["is_pp2"] = 0
-
+        units = units.with_dailyfaceoff(pp_df, PlayerRegistry.from_frame(todays_players))
+    todays_players = units.assign(todays_players)
 
     # Apply PP1 boost (50% increase), cap at 0.35
     # Note: We'll improve calibration later using Poisson transform.
@@ -237,7 +208,7 @@ else:
 
 
     # Normalized name for downstream merges
-    todays_players["name_norm"] = todays_players["name"].map(normalize_name)
+    todays_players["name_norm"] = normalize_names(todays_players["name"])
     # Debug: confirm columns exist
     assert "lambda_goal" in todays_players.columns, "lambda_goal was not created"
     assert "goal_probability" in todays_players.columns, "goal_probability was not created"
@@ -289,17 +260,10 @@ def load_manual_odds(paths: Paths, target_date: str) -> pd.DataFrame:
             "Example: inputs/manual_odds_YYYY-MM-DD.csv"
         )
 
-    odds_df = pd.read_csv(odds_path)
+    # Raises ValueError if player/odds columns are missing
+    odds_df = read_csv_schema(odds_path, "manual_odds")
 
-    required = {"player", "odds"}
-    missing = required - set(odds_df.columns)
-    if missing:
-        raise ValueError(
-            f"Odds file missing required columns {missing}. Found: {list(odds_df.columns)}"
-        )
-
-    odds_df = odds_df.copy()
-    odds_df["player_norm"] = odds_df["player"].map(normalize_name)
+    odds_df["player_norm"] = normalize_names(odds_df["player"])
     odds_df["odds"] = pd.to_numeric(odds_df["odds"], errors="coerce")
     odds_df = odds_df.dropna(subset=["odds", "player_norm"])
 
@@ -433,7 +397,9 @@ def main() -> int:
     pp_df = load_dailyfaceoff_pp(paths, target_date)
 
     # Predictions-only (DailyFaceoff PP overrides MoneyPuck where available)
-    pred = build_predictions(mp, teams_today, pp_df=pp_df)
+    pred = build_predictions(
+        mp, teams_today, pp_df=pp_df, pp_units=load_pp_units(paths.data_raw / "skaters.csv")
+    )
 
     pred_out = paths.data_processed / f"predictions_{target_date}.csv"
     pred.sort_values("goal_probability", ascending=False).to_csv(pred_out, index=False)
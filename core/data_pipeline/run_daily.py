@@ -9,7 +9,7 @@ Behavior (as requested):
 - Runs predictions-only every time
 - If odds file is missing: FAIL LOUDLY (exit with message)
 - Writes outputs to data/processed/ (gitignored)
-- Appends logs to logs/predictions_log.csv (LOCAL ONLY; gitignored)
+- Logs predictions + EV rows to logs/store/ (date-partitioned; LOCAL ONLY; gitignored)
 """
 
 from __future__ import annotations
@@ -22,7 +22,30 @@ from datetime import datetime
 from pathlib import Path
 import numpy as np
 import pandas as pd
-import requests
+
+import log_store
+import warehouse
+from feature_matrix import load_season_features
+from http_cache import nhl_api_cache
+from http_client import print_timing_summary
+from identity import PlayerRegistry, default_alias_path
+from model import DEFAULT_PARAMS, ModelParams, goal_lambda, goal_probability, per_game, toi_multiplier
+from names import NORMALIZER_VERSION, normalize_names
+from pp_units import PPUnitTable, load_pp_units
+from rolling_features import form_as_of, form_version, update_form
+from schedule_index import load_season_index
+from schemas import read_csv_schema, schema_columns
+from skaters_cache import load_skaters_cached
+from stage_cache import StageCache
+
+
+# Source files whose code shapes the predictions stage (hashed into its cache key)
+PREDICTION_CODE = [
+    Path(__file__).with_name(name)
+    for name in ("run_daily.py", "model.py", "pp_units.py", "rolling_features.py", "identity.py")
+]
+# MoneyPuck situations build_predictions reads ("all" rates, "5on4" PP icetime)
+MODEL_SITUATIONS = {"all", "5on4"}
 
 
 # -----------------------------
@@ -39,12 +62,6 @@ def iso_today_utc() -> str:
     return datetime.utcnow().strftime("%Y-%m-%d")
 
 
-def normalize_name(s: str) -> str:
-    """Basic name normalization for joins."""
-    if pd.isna(s):
-        return ""
-    return str(s).strip().lower()
-
 def load_dailyfaceoff_pp(paths: Paths, target_date: str) -> pd.DataFrame:
     """
     Load DailyFaceoff powerplay units for a given date.
@@ -61,8 +78,8 @@ def load_dailyfaceoff_pp(paths: Paths, target_date: str) -> pd.DataFrame:
         return pd.DataFrame(columns=["player", "team", "pp_unit", "player_norm"])
 
 
-    df = pd.read_csv(pp_path)
-    df["player_norm"] = df["player"].map(normalize_name)
+    df = read_csv_schema(pp_path, "dailyfaceoff_pp")
+    df["player_norm"] = normalize_names(df["player"])
     df["team"] = df["team"].astype(str).str.upper()
     df["pp_unit"] = pd.to_numeric(df["pp_unit"], errors="coerce").fillna(0).astype(int)
 
@@ -102,6 +119,7 @@ def get_paths() -> Paths:
 def load_moneypuck_skaters_csv(paths: Paths) -> pd.DataFrame:
     """
     Load MoneyPuck skaters CSV from data/raw/skaters.csv.
+    Served from the columnar cache in data/cache/skaters/ after the first parse.
     """
     skaters_path = paths.data_raw / "skaters.csv"
     if not skaters_path.exists():
@@ -109,29 +127,43 @@ def load_moneypuck_skaters_csv(paths: Paths) -> pd.DataFrame:
             f"Missing MoneyPuck file: {skaters_path}\n"
             "Put skaters.csv into data/raw/ (kept local, not committed)."
         )
-    mp = pd.read_csv(skaters_path)
+    mp = load_skaters_cached(skaters_path, columns=schema_columns("moneypuck_skaters"))
     return mp
 
 
+def load_moneypuck_features(paths: Paths, teams: set[str] | None = None) -> pd.DataFrame:
+    """
+    Load only the MoneyPuck columns the model uses, from the memory-mapped
+    season feature matrix (data/cache/features/). Built on first use.
+    Only the "all" / "5on4" rows of `teams` (None = every team) are decoded.
+    """
+    skaters_path = paths.data_raw / "skaters.csv"
+    if not skaters_path.exists():
+        raise FileNotFoundError(
+            f"Missing MoneyPuck file: {skaters_path}\n"
+            "Put skaters.csv into data/raw/ (kept local, not committed)."
+        )
+    features = load_season_features(skaters_path)
+    return features.to_frame(features.rows_for(teams, MODEL_SITUATIONS))
+
+
 def fetch_nhl_schedule_now() -> dict:
     """
     Fetch current NHL schedule block (official API).
     Note: This returns 'now' schedule window, not arbitrary date.
+    Served from the on-disk HTTP cache (short TTL, see http_cache.py).
     """
     url = "https://api-web.nhle.com/v1/schedule/now"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    return nhl_api_cache().get_json(url, timeout=30)
 
 def fetch_schedule_for_date(date_str: str) -> dict:
     """
     Fetch NHL schedule for a specific date (YYYY-MM-DD).
     Use this for backtests / historical validation.
+    Weeks whose games are all final are cached forever (see http_cache.py).
     """
     url = f"https://api-web.nhle.com/v1/schedule/{date_str}"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    return nhl_api_cache().get_json(url, timeout=30)
 
 
 
@@ -162,12 +194,25 @@ def extract_teams_for_date(schedule_json: dict, target_date: str) -> set[str]:
 # Model: predictions-only (same logic as your status doc)
 # -----------------------------
 
-def build_predictions(mp: pd.DataFrame, teams_today: set[str], pp_df: pd.DataFrame | None = None) -> pd.DataFrame:
+def build_predictions(
+    mp: pd.DataFrame,
+    teams_today: set[str],
+    pp_df: pd.DataFrame | None = None,
+    params: ModelParams = DEFAULT_PARAMS,
+    form: pd.DataFrame | None = None,
+    pp_units: PPUnitTable | None = None,
+) -> pd.DataFrame:
 
     """
     Build player goal probabilities using MoneyPuck xG per game + PP1 boost.
 
-    This is intentionally simple and deterministic (no ML).
+    This is intentionally simple and deterministic (no ML). The arithmetic lives in
+    model.py so backtest.py scores exactly the same model.
+
+    form (rolling_features.form_as_of) swaps the season-aggregate xG and TOI per game
+    for the recency-weighted ones, for players with at least params.form_min_games.
+
+    pp_units (pp_units.load_pp_units) skips re-deriving the MoneyPuck PP units.
     """
     # Filter to "all" situation for base player rows
     mp_all = mp[mp["situation"] == "all"].copy()
@@ -175,105 +220,67 @@ def build_predictions(mp: pd.DataFrame, teams_today: set[str], pp_df: pd.DataFra
     # Keep only players whose teams play today
     todays_players = mp_all[mp_all["team"].isin(teams_today)].copy()
 
-    # Guard against division by zero
-    todays_players["games_played"] = todays_players["games_played"].replace(0, pd.NA)
+    # Guard against division by zero (0 games -> missing, per-game rates -> 0)
+    todays_players["games_played"] = todays_players["games_played"].replace(0, np.nan)
 
     # Base xG per game
-    todays_players["xg_per_game"] = (
-        todays_players["I_F_xGoals"] / todays_players["games_played"]
-    ).fillna(0.0)
+    todays_players["xg_per_game"] = per_game(todays_players["I_F_xGoals"], todays_players["games_played"])
 
     # ---- TOI opportunity features (from MoneyPuck icetime) ----
-    todays_players["toi_per_game"] = (
-        todays_players["icetime"] / todays_players["games_played"]
-    ).fillna(0.0)
-
-    todays_players["team_avg_toi_per_game"] = todays_players.groupby("team")["toi_per_game"].transform("mean")
+    todays_players["toi_per_game"] = per_game(todays_players["icetime"], todays_players["games_played"])
 
-    todays_players["toi_ratio"] = (
-        todays_players["toi_per_game"] / todays_players["team_avg_toi_per_game"]
-    ).replace([pd.NA, float("inf")], 0.0).fillna(0.0)
-
-    todays_players["toi_multiplier"] = todays_players["toi_ratio"].clip(lower=0.6, upper=1.4)
-
-
-    # Determine PP1 via 5on4 icetime rank (top 5 per team)
-    mp_pp = mp[mp["situation"] == "5on4"].copy()
-    mp_pp["pp_toi_rank"] = mp_pp.groupby("team")["icetime"].rank(
-        ascending=False, method="min"
-    )
-    mp_pp["is_pp1"] = (mp_pp["pp_toi_rank"] <= 5).astype(int)
-
-    # Merge PP1 indicator (by name)
-    todays_players = todays_players.merge(
-        mp_pp[["name", "is_pp1"]],
-        on="name",
-        how="left",
-    )
-    todays_players["is_pp1"] = todays_players["is_pp1"].fillna(0).astype(int)
-
-    # --- Override PP unit from DailyFaceoff if provided ---
-    if pp_df is not None and not pp_df.empty:
-        # Merge by normalized name + team
-        todays_players["player_norm"] = todays_players["name"].map(normalize_name)
+    # Rolling form (optional): recency-weighted rates where there's enough history
+    todays_players["uses_form"] = 0
+    if form is not None and not form.empty:
         todays_players = todays_players.merge(
-            pp_df[["player_norm", "team", "pp_unit"]],
-            left_on=["player_norm", "team"],
-            right_on=["player_norm", "team"],
+            form[["playerId", "form_games", "form_xg_per_game", "form_toi_per_game"]],
+            on="playerId",
             how="left",
         )
+        use = (todays_players["form_games"] >= params.form_min_games).to_numpy()
+        todays_players["xg_per_game"] = np.where(use, todays_players["form_xg_per_game"], todays_players["xg_per_game"])
+        todays_players["toi_per_game"] = np.where(use, todays_players["form_toi_per_game"], todays_players["toi_per_game"])
+        todays_players["uses_form"] = use.astype(int)
 
-        # DailyFaceoff wins when available
-        todays_players["is_pp1"] = (todays_players["pp_unit"] == 1).astype(int)
-
-        # Optional: keep PP2 flag for later modeling
-        todays_players["is_pp2"] = (todays_players["pp_unit"] == 2).astype(int)
-
-        # If pp_unit missing (NaN), fallback to MoneyPuck inference
-        # (so we don’t accidentally set everyone to 0)
-        missing_pp = todays_players["pp_unit"].isna()
-        todays_players.loc[missing_pp, "is_pp1"] = todays_players.loc[missing_pp, "is_pp1"].fillna(0).astype(int)
-        todays_players.loc[missing_pp, "is_pp2"] = 0
-    else:
-        todays_players["is_pp2"] = 0
-
-
-    # Apply PP1 boost (50% increase), cap at 0.35
-    # Note: We'll improve calibration later using Poisson transform.
-    # Apply PP1 boost on the rate (lambda), then Poisson -> probability
-    pp1_boost = 0.5
-    todays_players["lambda_goal"] = (
-    todays_players["xg_per_game"]
-    * todays_players["toi_multiplier"]
-    * (1 + todays_players["is_pp1"] * pp1_boost)
-    )
+    # TOI relative to the team mean, clipped
+    team_codes, _ = pd.factorize(todays_players["team"])
+    todays_players["toi_multiplier"] = toi_multiplier(todays_players["toi_per_game"].to_numpy(), team_codes, params)
 
-    # Clamp lambda to avoid absurd probabilities, but don't cap probability directly
-    todays_players["lambda_goal"] = todays_players["lambda_goal"].clip(lower=0.0, upper=1.2)
 
-    todays_players["goal_probability"] = 1 - np.exp(-todays_players["lambda_goal"])
-    # ---- FINAL NORMALIZATION FOR CALIBRATION & JOINS ----
-    todays_players["player_norm"] = todays_players["name"].map(normalize_name)
+    # PP units: (playerId, team) table inferred from MoneyPuck 5on4 icetime once per
+    # refresh (pp_units.py); DailyFaceoff overrides it, resolved by player identity
+    units = pp_units if pp_units is not None else PPUnitTable.from_moneypuck(mp, params)
+    if pp_df is not None and not pp_df.empty:
+        units = units.with_dailyfaceoff(pp_df, PlayerRegistry.from_frame(todays_players))
+    todays_players = units.assign(todays_players)
 
 
-    # --- GLOBAL CALIBRATION SHRINKAGE ---
-    SHRINK = 0.65   # start conservative
-    todays_players["lambda_goal"] *= SHRINK
+    # Apply PP1 boost on the rate (lambda), clamp it (don't cap probability directly),
+    # then global calibration shrinkage, then Poisson -> probability
+    todays_players["lambda_goal"] = goal_lambda(
+        todays_players["xg_per_game"].to_numpy(),
+        todays_players["toi_multiplier"].to_numpy(),
+        todays_players["is_pp1"].to_numpy(),
+        params,
+    )
+    todays_players["goal_probability"] = goal_probability(todays_players["lambda_goal"].to_numpy())
 
-    todays_players["goal_probability"] = 1 - np.exp(-todays_players["lambda_goal"])
+    # ---- FINAL NORMALIZATION FOR CALIBRATION & JOINS ----
+    todays_players["player_norm"] = normalize_names(todays_players["name"])
 
 
     # Normalized name for downstream merges
-    todays_players["name_norm"] = todays_players["name"].map(normalize_name)
+    todays_players["name_norm"] = normalize_names(todays_players["name"])
     # Debug: confirm columns exist
     assert "lambda_goal" in todays_players.columns, "lambda_goal was not created"
     assert "goal_probability" in todays_players.columns, "goal_probability was not created"
 
     return todays_players
 
-def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -> None:
-    ensure_dir(paths.logs)
-    log_path = paths.logs / "predictions_log.csv"
+def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -> Path:
+    """
+    Log this run's predictions as a new partition in logs/store/predictions/<date>/.
+    """
 
     out = pred.copy()
     out.insert(0, "date", target_date)
@@ -283,6 +290,7 @@ def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -
     keep = [
         "date",
         "logged_at_utc",
+        "playerId",
         "name",
         "team",
         "xg_per_game",
@@ -295,8 +303,7 @@ def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -
 
     out = out[keep].rename(columns={"name": "player"})
 
-    write_header = not log_path.exists()
-    out.to_csv(log_path, mode="a", index=False, header=write_header)
+    return log_store.append_run("predictions", target_date, out, root=paths.logs / "store")
 
 # -----------------------------
 # Odds + EV
@@ -316,17 +323,10 @@ def load_manual_odds(paths: Paths, target_date: str) -> pd.DataFrame:
             "Example: inputs/manual_odds_YYYY-MM-DD.csv"
         )
 
-    odds_df = pd.read_csv(odds_path)
-
-    required = {"player", "odds"}
-    missing = required - set(odds_df.columns)
-    if missing:
-        raise ValueError(
-            f"Odds file missing required columns {missing}. Found: {list(odds_df.columns)}"
-        )
+    # Raises ValueError if player/odds columns are missing
+    odds_df = read_csv_schema(odds_path, "manual_odds")
 
-    odds_df = odds_df.copy()
-    odds_df["player_norm"] = odds_df["player"].map(normalize_name)
+    odds_df["player_norm"] = normalize_names(odds_df["player"])
     odds_df["odds"] = pd.to_numeric(odds_df["odds"], errors="coerce")
     odds_df = odds_df.dropna(subset=["odds", "player_norm"])
 
@@ -339,10 +339,22 @@ def load_manual_odds(paths: Paths, target_date: str) -> pd.DataFrame:
 def merge_and_calculate_ev(pred: pd.DataFrame, odds_df: pd.DataFrame) -> pd.DataFrame:
     """
     Merge predictions with odds and compute EV.
+
+    Odds names (plus team, when the odds file has one) are resolved to playerIds
+    against today's predictions; the join itself is on the integer id.
     """
+    registry = PlayerRegistry.from_frame(pred)
+    odds_df = odds_df.assign(playerId=registry.resolve_frame(odds_df, "player", "team", source="manual_odds"))
+    unresolved = odds_df.loc[odds_df["playerId"].isna(), "player"]
+    if not unresolved.empty:
+        print(f"[warn] {len(unresolved)} odds rows not matched to a player: {sorted(unresolved.astype(str))[:10]}")
+    # team comes from the predictions (the odds' optional team only helped resolution)
+    odds_df = odds_df.dropna(subset=["playerId"]).astype({"playerId": "int64"}).drop(columns=["team"], errors="ignore")
+
     merged = odds_df.merge(
         pred[
             [
+                "playerId",
                 "name_norm",
                 "name",
                 "team",
@@ -353,8 +365,7 @@ def merge_and_calculate_ev(pred: pd.DataFrame, odds_df: pd.DataFrame) -> pd.Data
                 "is_pp1",
             ]
         ],
-        left_on="player_norm",
-        right_on="name_norm",
+        on="playerId",
         how="inner",
     )
 
@@ -369,12 +380,11 @@ def merge_and_calculate_ev(pred: pd.DataFrame, odds_df: pd.DataFrame) -> pd.Data
 # Logging
 # -----------------------------
 
-def append_log(paths: Paths, target_date: str, merged: pd.DataFrame) -> None:
+def append_log(paths: Paths, target_date: str, merged: pd.DataFrame) -> Path:
     """
-    Append merged rows to logs/predictions_log.csv (local only).
+    Log merged EV rows as a new partition in logs/store/ev/<date>/ (local only).
+    Run `python core/data_pipeline/log_store.py compact --kind ev` to deduplicate.
     """
-    ensure_dir(paths.logs)
-    log_path = paths.logs / "predictions_log.csv"
 
     log_df = merged.copy()
     log_df.insert(0, "date", target_date)
@@ -399,8 +409,7 @@ def append_log(paths: Paths, target_date: str, merged: pd.DataFrame) -> None:
             log_df[col] = pd.NA
     log_df = log_df[keep_cols]
 
-    write_header = not log_path.exists()
-    log_df.to_csv(log_path, mode="a", index=False, header=write_header)
+    return log_store.append_run("ev", target_date, log_df, root=paths.logs / "store")
 
 
 # -----------------------------
@@ -424,6 +433,22 @@ def parse_args() -> argparse.Namespace:
         default=25,
         help="How many top predictions to print to console (default 25).",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute every stage (ignore data/cache/stages/).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Size bound for the stage cache directory; LRU entries are evicted (default 512).",
+    )
+    parser.add_argument(
+        "--use-form",
+        action="store_true",
+        help="Use rolling form (warehouse player_games, see rolling_features.py) instead of season xG/TOI rates.",
+    )
 
     return parser.parse_args()
 
@@ -447,47 +472,76 @@ def main() -> int:
     ensure_dir(paths.inputs)
     ensure_dir(paths.logs)
 
-    # Load MoneyPuck
-    mp = load_moneypuck_skaters_csv(paths)
+    # Stage cache: each stage is keyed on its inputs, so a re-run only recomputes
+    # stages downstream of what changed (e.g. a new manual_odds file -> EV only)
+    cache = StageCache(max_bytes=args.cache_max_mb * 1024 * 1024, enabled=not args.no_cache)
 
     from datetime import date
 
     is_today = (target_date == date.today().isoformat())
 
-    # Fetch schedule for the requested date
-    if is_today:
-        schedule = fetch_nhl_schedule_now()
-    else:
-        schedule = fetch_schedule_for_date(target_date)
+    # schedule/now moves during the day; bucket today's key to 10 minutes
+    schedule_bucket = datetime.now(timezone.utc).strftime("%Y%m%d%H%M")[:-1] if is_today else None
 
-    print("[debug] schedule keys:", list(schedule.keys()))
+    def _teams_for_date() -> set[str]:
+        # Today: freshest view from schedule/now
+        if is_today:
+            schedule = fetch_nhl_schedule_now()
+            return extract_teams_for_date(schedule, target_date)
+        # Backtests: the season index answers any date without a schedule call
+        return load_season_index(target_date).teams_on(target_date)
 
-    teams_today = extract_teams_for_date(schedule, target_date)
+    teams_today, _ = cache.cached("teams", _teams_for_date, date=target_date, bucket=schedule_bucket)
 
     if not teams_today:
-        print(
-            f"[debug] teams_today empty for {target_date}. schedule keys: {list(schedule.keys())}",
-            file=sys.stderr,
-        )
         print(
             f"ERROR: No games found for {target_date} in schedule endpoint response.",
             file=sys.stderr,
         )
         return 3
 
+    # Load DailyFaceoff PP units (optional; empty -> MoneyPuck inference)
+    pp_path = paths.inputs / f"dailyfaceoff_pp_{target_date}.csv"
+    pp_df, pp_key = cache.cached(
+        "dailyfaceoff_pp",
+        lambda: load_dailyfaceoff_pp(paths, target_date),
+        date=target_date,
+        pp_file=pp_path,
+        names=NORMALIZER_VERSION,
+    )
 
-
-    if is_today:
-        sched = fetch_schedule_now()
-    else:
-        sched = fetch_schedule_for_date(target_date)
-
-
-    # Load DailyFaceoff PP units (fail loudly if missing)
-    pp_df = load_dailyfaceoff_pp(paths, target_date)
+    # Rolling form entering target_date (folds any newly loaded games first)
+    form, form_key = None, None
+    if args.use_form:
+        conn = warehouse.connect()
+        try:
+            update_form(conn)
+            form = form_as_of(conn, target_date)
+            form_key = {"as_of": target_date, **form_version(conn)}
+        finally:
+            conn.close()
+        print(f"[form] {int((form['form_games'] >= DEFAULT_PARAMS.form_min_games).sum())} players with rolling form")
 
     # Predictions-only (DailyFaceoff PP overrides MoneyPuck where available)
-    pred = build_predictions(mp, teams_today, pp_df=pp_df)
+    # MoneyPuck (model columns only, memory-mapped feature matrix) is only loaded on a miss
+    pred, pred_key = cache.cached(
+        "predictions",
+        lambda: build_predictions(
+            load_moneypuck_features(paths, teams_today),
+            teams_today,
+            pp_df=pp_df,
+            form=form,
+            pp_units=load_pp_units(paths.data_raw / "skaters.csv"),
+        ),
+        teams=teams_today,
+        form=form_key,
+        pp=pp_key,
+        skaters=paths.data_raw / "skaters.csv",
+        code=PREDICTION_CODE,
+        names=NORMALIZER_VERSION,
+        aliases=default_alias_path(),
+        params=DEFAULT_PARAMS.as_dict(),
+    )
 
     # === CALIBRATION SNAPSHOT (ALWAYS WRITE, EVEN IF SOME COLS MISSING) ===
     calib_out = paths.data_processed / f"calibration_snapshot_{target_date}.csv"
@@ -497,8 +551,10 @@ def main() -> int:
         "team",
         "player_norm",
         "pp_unit",
+        "pp_source",
         "is_pp1",
         "is_pp2",
+        "uses_form",
         "xg_per_game",
         "toi_per_game",
         "toi_multiplier",
@@ -523,8 +579,8 @@ def main() -> int:
 
 
     # ✅ NEW: log predictions BEFORE odds (so it still logs even if odds are missing)
-    append_predictions_log(paths, target_date, pred)
-    print(f"Appended predictions log: {paths.logs / 'predictions_log.csv'}")
+    pred_log = append_predictions_log(paths, target_date, pred)
+    print(f"Logged predictions: {pred_log}")
 
     # Console preview
     print("\n🎯 TOP PREDICTIONS (probability ranking)")
@@ -535,14 +591,15 @@ def main() -> int:
 
     print(f"\nSaved predictions: {pred_out}")
 
-    # Strict odds load (fail loudly if missing)
-    odds_df = load_manual_odds(paths, target_date)
-
-
-    # Strict odds load (fail loudly if missing)
-    odds_df = load_manual_odds(paths, target_date)
-
-    merged = merge_and_calculate_ev(pred, odds_df)
+    # Strict odds load (fail loudly if missing) + EV
+    odds_path = paths.inputs / f"manual_odds_{target_date}.csv"
+    merged, _ = cache.cached(
+        "ev",
+        lambda: merge_and_calculate_ev(pred, load_manual_odds(paths, target_date)),
+        predictions=pred_key,
+        odds_file=odds_path,
+        aliases=default_alias_path(),
+    )
 
     merged_out = paths.data_processed / f"goal_scorer_ev_{target_date}.csv"
     merged.sort_values("ev_percent", ascending=False).to_csv(merged_out, index=False)
@@ -568,9 +625,11 @@ def main() -> int:
     print(f"Saved positive EV:  {pos_out}")
 
     # Log (local only)
-    append_log(paths, target_date, merged)
+    ev_log = append_log(paths, target_date, merged)
 
-    print(f"\nAppended log: {paths.logs / 'predictions_log.csv'}")
+    print(f"\nLogged EV rows: {ev_log}")
+    print(f"[cache] reused={cache.hits} recomputed={cache.misses}")
+    print_timing_summary()
     return 0
 
 
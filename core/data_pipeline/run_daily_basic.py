@@ -9,7 +9,7 @@ Behavior (as requested):
 - Runs predictions-only every time
 - If odds file is missing: FAIL LOUDLY (exit with message)
 - Writes outputs to data/processed/ (gitignored)
-- Appends logs to logs/predictions_log.csv (LOCAL ONLY; gitignored)
+- Logs runs to the partitioned store logs/store/ (log_store.py; LOCAL ONLY)
 """
 
 from __future__ import annotations
@@ -22,7 +22,13 @@ from datetime import datetime
 from pathlib import Path
 import numpy as np
 import pandas as pd
-import requests
+
+import log_store
+from http_cache import nhl_api_cache
+from names import normalize_names
+from pp_units import PPUnitTable, load_pp_units
+from schemas import read_csv_schema, schema_columns
+from skaters_cache import load_skaters_cached
 
 
 # -----------------------------
@@ -39,13 +45,6 @@ def iso_today_utc() -> str:
     return datetime.utcnow().strftime("%Y-%m-%d")
 
 
-def normalize_name(s: str) -> str:
-    """Basic name normalization for joins."""
-    if pd.isna(s):
-        return ""
-    return str(s).strip().lower()
-
-
 @dataclass(frozen=True)
 class Paths:
     project_root: Path
@@ -78,6 +77,7 @@ def get_paths() -> Paths:
 def load_moneypuck_skaters_csv(paths: Paths) -> pd.DataFrame:
     """
     Load MoneyPuck skaters CSV from data/raw/skaters.csv.
+    Served from the columnar cache in data/cache/skaters/ after the first parse.
     """
     skaters_path = paths.data_raw / "skaters.csv"
     if not skaters_path.exists():
@@ -85,7 +85,7 @@ def load_moneypuck_skaters_csv(paths: Paths) -> pd.DataFrame:
             f"Missing MoneyPuck file: {skaters_path}\n"
             "Put skaters.csv into data/raw/ (kept local, not committed)."
         )
-    mp = pd.read_csv(skaters_path)
+    mp = load_skaters_cached(skaters_path, columns=schema_columns("moneypuck_skaters"))
     return mp
 
 
@@ -93,11 +93,10 @@ def fetch_nhl_schedule_now() -> dict:
     """
     Fetch current NHL schedule block (official API).
     Note: This returns 'now' schedule window, not arbitrary date.
+    Served from the on-disk HTTP cache (short TTL, see http_cache.py).
     """
     url = "https://api-web.nhle.com/v1/schedule/now"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    return nhl_api_cache().get_json(url, timeout=30)
 
 
 def extract_teams_for_date(schedule_json: dict, target_date: str) -> set[str]:
@@ -125,7 +124,7 @@ def extract_teams_for_date(schedule_json: dict, target_date: str) -> set[str]:
 # Model: predictions-only (same logic as your status doc)
 # -----------------------------
 
-def build_predictions(mp: pd.DataFrame, teams_today: set[str]) -> pd.DataFrame:
+def build_predictions(mp: pd.DataFrame, teams_today: set[str], pp_units: PPUnitTable | None = None) -> pd.DataFrame:
     """
     Build player goal probabilities using MoneyPuck xG per game + PP1 boost.
 
@@ -159,20 +158,9 @@ def build_predictions(mp: pd.DataFrame, teams_today: set[str]) -> pd.DataFrame:
     todays_players["toi_multiplier"] = todays_players["toi_ratio"].clip(lower=0.6, upper=1.4)
 
 
-    # Determine PP1 via 5on4 icetime rank (top 5 per team)
-    mp_pp = mp[mp["situation"] == "5on4"].copy()
-    mp_pp["pp_toi_rank"] = mp_pp.groupby("team")["icetime"].rank(
-        ascending=False, method="min"
-    )
-    mp_pp["is_pp1"] = (mp_pp["pp_toi_rank"] <= 5).astype(int)
-
-    # Merge PP1 indicator (by name)
-    todays_players = todays_players.merge(
-        mp_pp[["name", "is_pp1"]],
-        on="name",
-        how="left",
-    )
-    todays_players["is_pp1"] = todays_players["is_pp1"].fillna(0).astype(int)
+    # PP1 from the precomputed (playerId, team) unit table (pp_units.py)
+    units = pp_units if pp_units is not None else PPUnitTable.from_moneypuck(mp)
+    todays_players = units.assign(todays_players)
 
     # Apply PP1 boost (50% increase), cap at 0.35
     # Note: We'll improve calibration later using Poisson transform.
@@ -189,16 +177,17 @@ def build_predictions(mp: pd.DataFrame, teams_today: set[str]) -> pd.DataFrame:
 
 
     # Normalized name for downstream merges
-    todays_players["name_norm"] = todays_players["name"].map(normalize_name)
+    todays_players["name_norm"] = normalize_names(todays_players["name"])
     # Debug: confirm columns exist
     assert "lambda_goal" in todays_players.columns, "lambda_goal was not created"
     assert "goal_probability" in todays_players.columns, "goal_probability was not created"
 
     return todays_players
 
-def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -> None:
-    ensure_dir(paths.logs)
-    log_path = paths.logs / "predictions_log.csv"
+def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -> Path:
+    """
+    Log this run's predictions as a new partition in logs/store/predictions/<date>/.
+    """
 
     out = pred.copy()
     out.insert(0, "date", target_date)
@@ -208,6 +197,7 @@ def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -
     keep = [
         "date",
         "logged_at_utc",
+        "playerId",
         "name",
         "team",
         "xg_per_game",
@@ -220,8 +210,7 @@ def append_predictions_log(paths: Paths, target_date: str, pred: pd.DataFrame) -
 
     out = out[keep].rename(columns={"name": "player"})
 
-    write_header = not log_path.exists()
-    out.to_csv(log_path, mode="a", index=False, header=write_header)
+    return log_store.append_run("predictions", target_date, out, root=paths.logs / "store")
 
 # -----------------------------
 # Odds + EV
@@ -241,17 +230,10 @@ def load_manual_odds(paths: Paths, target_date: str) -> pd.DataFrame:
             "Example: inputs/manual_odds_YYYY-MM-DD.csv"
         )
 
-    odds_df = pd.read_csv(odds_path)
+    # Raises ValueError if player/odds columns are missing
+    odds_df = read_csv_schema(odds_path, "manual_odds")
 
-    required = {"player", "odds"}
-    missing = required - set(odds_df.columns)
-    if missing:
-        raise ValueError(
-            f"Odds file missing required columns {missing}. Found: {list(odds_df.columns)}"
-        )
-
-    odds_df = odds_df.copy()
-    odds_df["player_norm"] = odds_df["player"].map(normalize_name)
+    odds_df["player_norm"] = normalize_names(odds_df["player"])
     odds_df["odds"] = pd.to_numeric(odds_df["odds"], errors="coerce")
     odds_df = odds_df.dropna(subset=["odds", "player_norm"])
 
@@ -294,12 +276,11 @@ def merge_and_calculate_ev(pred: pd.DataFrame, odds_df: pd.DataFrame) -> pd.Data
 # Logging
 # -----------------------------
 
-def append_log(paths: Paths, target_date: str, merged: pd.DataFrame) -> None:
+def append_log(paths: Paths, target_date: str, merged: pd.DataFrame) -> Path:
     """
-    Append merged rows to logs/predictions_log.csv (local only).
+    Log merged EV rows as a new partition in logs/store/ev/<date>/ (local only).
+    Run `python core/data_pipeline/log_store.py compact --kind ev` to deduplicate.
     """
-    ensure_dir(paths.logs)
-    log_path = paths.logs / "predictions_log.csv"
 
     log_df = merged.copy()
     log_df.insert(0, "date", target_date)
@@ -324,8 +305,7 @@ def append_log(paths: Paths, target_date: str, merged: pd.DataFrame) -> None:
             log_df[col] = pd.NA
     log_df = log_df[keep_cols]
 
-    write_header = not log_path.exists()
-    log_df.to_csv(log_path, mode="a", index=False, header=write_header)
+    return log_store.append_run("ev", target_date, log_df, root=paths.logs / "store")
 
 
 # -----------------------------
@@ -382,14 +362,14 @@ def main() -> int:
         return 3
 
     # Predictions-only
-    pred = build_predictions(mp, teams_today)
+    pred = build_predictions(mp, teams_today, pp_units=load_pp_units(paths.data_raw / "skaters.csv"))
 
     pred_out = paths.data_processed / f"predictions_{target_date}.csv"
     pred.sort_values("goal_probability", ascending=False).to_csv(pred_out, index=False)
 
     # ✅ NEW: log predictions BEFORE odds (so it still logs even if odds are missing)
-    append_predictions_log(paths, target_date, pred)
-    print(f"Appended predictions log: {paths.logs / 'predictions_log.csv'}")
+    pred_log = append_predictions_log(paths, target_date, pred)
+    print(f"Logged predictions: {pred_log}")
 
     # Console preview
     print("\n🎯 TOP PREDICTIONS (probability ranking)")
@@ -433,9 +413,9 @@ def main() -> int:
     print(f"Saved positive EV:  {pos_out}")
 
     # Log (local only)
-    append_log(paths, target_date, merged)
+    ev_log = append_log(paths, target_date, merged)
 
-    print(f"\nAppended log: {paths.logs / 'predictions_log.csv'}")
+    print(f"\nLogged EV rows: {ev_log}")
     return 0
 
 
@@ -0,0 +1,244 @@
+"""
+schedule_index.py
+-----------------
+Season-wide NHL schedule index with constant-time lookups.
+
+Built once per season by walking /v1/schedule/{date} week by week (nextStartDate),
+~40 requests through the HTTP cache, then saved locally:
+
+  data/cache/schedule/season_<YYYYYYYY>.json
+
+Answers teams-on-date, games-on-date, game IDs, opponent and home/away for any
+date in the season from dicts, so backtests over 180+ dates make zero schedule
+calls after the first build. An index built after its season was over (past the
+last scheduled date, and after the July rollover so the playoffs are in) never
+expires; any other index, including one of a finished season built mid-season, is
+rebuilt when older than max_age_s (start times / states / reschedules move).
+Parsed indexes are memoized per (season, cache dir) for the life of the process
+and re-read only when the file's mtime changes, so per-date callers
+(fetch_outcomes.py) parse the season file once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from http_cache import nhl_api_cache
+from http_client import HttpClient
+
+
+NHL_API = "https://api-web.nhle.com/v1"
+
+# (season, cache file) -> (file mtime_ns, parsed index)
+_LOADED: dict[tuple[int, str], tuple[int, "SeasonScheduleIndex"]] = {}
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_schedule_cache_dir() -> Path:
+    return _project_root() / "data" / "cache" / "schedule"
+
+
+def season_for_date(date_str: str) -> int:
+    """Season id (e.g. 20252026) a YYYY-MM-DD date belongs to (seasons roll over in July)."""
+    d = datetime.strptime(date_str, "%Y-%m-%d").date()
+    start_year = d.year if d.month >= 7 else d.year - 1
+    return start_year * 10000 + start_year + 1
+
+
+@dataclass(frozen=True)
+class Game:
+    game_id: int
+    date: str
+    away: str
+    home: str
+    game_type: int      # 1 preseason, 2 regular season, 3 playoffs
+    game_state: str
+    start_time_utc: str
+
+
+class SeasonScheduleIndex:
+    def __init__(self, season: int, games: list[Game], built_at: float):
+        self.season = season
+        self.built_at = built_at
+        self.games = sorted(games, key=lambda g: (g.date, g.game_id))
+
+        self.by_id: dict[int, Game] = {}
+        self.by_date: dict[str, list[Game]] = {}
+        self.by_team_date: dict[tuple[str, str], Game] = {}
+        for g in self.games:
+            self.by_id[g.game_id] = g
+            self.by_date.setdefault(g.date, []).append(g)
+            self.by_team_date[(g.away, g.date)] = g
+            self.by_team_date[(g.home, g.date)] = g
+
+        self._teams_by_date = {
+            d: frozenset(t for g in games for t in (g.away, g.home)) for d, games in self.by_date.items()
+        }
+
+    # -----------------------------
+    # Lookups (all O(1))
+    # -----------------------------
+
+    def dates(self) -> list[str]:
+        return sorted(self.by_date)
+
+    def games_on(self, date_str: str) -> list[Game]:
+        return self.by_date.get(date_str, [])
+
+    def game_ids_on(self, date_str: str) -> list[int]:
+        return [g.game_id for g in self.games_on(date_str)]
+
+    def teams_on(self, date_str: str) -> set[str]:
+        return set(self._teams_by_date.get(date_str, frozenset()))
+
+    def matchups_on(self, date_str: str) -> list[tuple[str, str]]:
+        """(away, home) pairs."""
+        return [(g.away, g.home) for g in self.games_on(date_str)]
+
+    def game_for(self, team: str, date_str: str) -> Optional[Game]:
+        return self.by_team_date.get((team, date_str))
+
+    def opponent(self, team: str, date_str: str) -> Optional[str]:
+        g = self.game_for(team, date_str)
+        if g is None:
+            return None
+        return g.home if g.away == team else g.away
+
+    def is_home(self, team: str, date_str: str) -> Optional[bool]:
+        g = self.game_for(team, date_str)
+        return None if g is None else g.home == team
+
+    def game(self, game_id: int) -> Optional[Game]:
+        return self.by_id.get(game_id)
+
+    def is_complete(self) -> bool:
+        """Built after the last scheduled date and after the season rolled over."""
+        built = datetime.fromtimestamp(self.built_at, tz=timezone.utc).date().isoformat()
+        last = self.games[-1].date if self.games else ""
+        return built > last and season_for_date(built) > self.season
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def to_json(self) -> dict:
+        return {"season": self.season, "built_at": self.built_at, "games": [asdict(g) for g in self.games]}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "SeasonScheduleIndex":
+        return cls(int(data["season"]), [Game(**g) for g in data["games"]], float(data["built_at"]))
+
+
+def _games_from_week(payload: dict, season: int) -> list[Game]:
+    games = []
+    for day in payload.get("gameWeek", []):
+        for g in day.get("games", []):
+            if g.get("season") not in (None, season):
+                continue
+            gid = g.get("id")
+            away = g.get("awayTeam", {}).get("abbrev")
+            home = g.get("homeTeam", {}).get("abbrev")
+            if not isinstance(gid, int) or not away or not home:
+                continue
+            games.append(
+                Game(
+                    game_id=gid,
+                    date=day.get("date"),
+                    away=away,
+                    home=home,
+                    game_type=int(g.get("gameType") or 0),
+                    game_state=g.get("gameState") or "",
+                    start_time_utc=g.get("startTimeUTC") or "",
+                )
+            )
+    return games
+
+
+def build_season_index(season: int, client: Optional[HttpClient] = None) -> SeasonScheduleIndex:
+    """Walk the season week by week from September to the end of June."""
+    start_year = season // 10000
+    cursor: Optional[str] = f"{start_year}-09-01"
+    end = f"{start_year + 1}-06-30"
+    cache = nhl_api_cache()
+
+    games: dict[int, Game] = {}
+    seen: set[str] = set()
+    while cursor and cursor <= end and cursor not in seen:
+        seen.add(cursor)
+        payload = cache.get_json(f"{NHL_API}/schedule/{cursor}", client=client)
+        for g in _games_from_week(payload, season):
+            games[g.game_id] = g
+
+        nxt = payload.get("nextStartDate")
+        if not nxt:
+            # Off-season gaps: step a week forward ourselves
+            nxt = (datetime.strptime(cursor, "%Y-%m-%d").date() + timedelta(days=7)).isoformat()
+        cursor = nxt
+
+    return SeasonScheduleIndex(season, list(games.values()), time.time())
+
+
+def load_season_index(
+    date_str: str,
+    cache_dir: Optional[Path] = None,
+    max_age_s: float = 12 * 3600,
+    refresh: bool = False,
+) -> SeasonScheduleIndex:
+    """
+    Index for the season containing date_str, from the local file when fresh.
+    A finished season's index is rebuilt once if it was built before the season ended.
+    """
+    season = season_for_date(date_str)
+    cache_dir = Path(cache_dir or default_schedule_cache_dir())
+    path = cache_dir / f"season_{season}.json"
+
+    memo_key = (season, str(path.resolve()))
+
+    if not refresh and path.exists():
+        mtime = path.stat().st_mtime_ns
+        loaded = _LOADED.get(memo_key)
+        if loaded is not None and loaded[0] == mtime:
+            index = loaded[1]
+        else:
+            index = SeasonScheduleIndex.from_json(json.loads(path.read_text(encoding="utf-8")))
+            _LOADED[memo_key] = (mtime, index)
+        if index.is_complete() or time.time() - index.built_at < max_age_s:
+            return index
+
+    index = build_season_index(season)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cache_dir / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    tmp.write_text(json.dumps(index.to_json()), encoding="utf-8")
+    os.replace(tmp, path)
+    _LOADED[memo_key] = (path.stat().st_mtime_ns, index)
+    return index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build / query the season schedule index.")
+    parser.add_argument("--date", required=True, help="YYYY-MM-DD (any date in the season)")
+    parser.add_argument("--refresh", action="store_true")
+    args = parser.parse_args()
+
+    target_date = args.date.strip()
+    index = load_season_index(target_date, refresh=args.refresh)
+    print(f"Season {index.season}: {len(index.games)} games over {len(index.by_date)} dates")
+    for g in index.games_on(target_date):
+        print(f"  {g.game_id}  {g.away} @ {g.home}  ({g.game_state})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
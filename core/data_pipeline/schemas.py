@@ -0,0 +1,146 @@
+"""
+schemas.py
+----------
+Central registry of the CSV inputs the pipeline reads: which columns each stage
+needs and what dtype they should be parsed as.
+
+Why it's written this way:
+- pd.read_csv(usecols=...) skips every column we don't use (skaters.csv has ~150)
+- Explicit dtypes skip inference: categoricals for low-cardinality strings
+  (team / situation / position / bookmaker), float32 for rates and counts,
+  float64 for odds prices (they feed EV math and the warehouse verbatim)
+- One place to update when MoneyPuck / The Odds API change a column name
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class CsvSchema:
+    name: str
+    # column -> dtype passed to read_csv (None = let pandas infer, e.g. odds typed by hand)
+    columns: dict[str, Optional[str]]
+    # columns read when present but not required
+    optional: dict[str, Optional[str]] = field(default_factory=dict)
+
+    @property
+    def required(self) -> list[str]:
+        return list(self.columns)
+
+    def dtypes(self) -> dict[str, str]:
+        both = {**self.columns, **self.optional}
+        return {c: t for c, t in both.items() if t is not None}
+
+
+SCHEMAS: dict[str, CsvSchema] = {
+    # MoneyPuck season skaters (data/raw/skaters.csv, moneypuck_skaters_*.csv)
+    "moneypuck_skaters": CsvSchema(
+        name="moneypuck_skaters",
+        columns={
+            "playerId": "int64",
+            "name": None,
+            "team": "category",
+            "position": "category",
+            "situation": "category",
+            "games_played": "float32",
+            "icetime": "float32",
+            "I_F_xGoals": "float32",
+            "I_F_goals": "float32",
+            "I_F_shotsOnGoal": "float32",
+        },
+    ),
+    # MoneyPuck game-by-game skaters (data/raw/gamebygame/*.csv, one file per player)
+    "moneypuck_gamebygame": CsvSchema(
+        name="moneypuck_gamebygame",
+        columns={
+            "playerId": "int64",
+            "name": None,
+            "gameId": "int64",
+            "gameDate": None,  # YYYYMMDD, converted by rolling_features
+            "playerTeam": "category",
+            "situation": "category",
+            "icetime": "float32",
+            "I_F_xGoals": "float32",
+            "I_F_goals": "float32",
+        },
+    ),
+    # inputs/manual_odds_{date}.csv (OCR'd)
+    "manual_odds": CsvSchema(
+        name="manual_odds",
+        columns={"player": None, "odds": None},  # odds coerced by load_manual_odds
+        optional={"team": "category"},
+    ),
+    # inputs/dailyfaceoff_pp_{date}.csv (dailyfaceoff_pp_scraper.py)
+    "dailyfaceoff_pp": CsvSchema(
+        name="dailyfaceoff_pp",
+        columns={"player": None, "team": None, "pp_unit": None},
+    ),
+    # data/processed/odds_anytime_goalscorer.csv (odds_parse_anytime.py)
+    "odds_anytime": CsvSchema(
+        name="odds_anytime",
+        columns={
+            "event_id": None,
+            "commence_time": None,
+            "bookmaker": "category",
+            "market_key": "category",
+            "player_name": None,
+            "price_decimal": "float64",  # prices stay exact (2.35, not 2.3499999)
+        },
+        optional={"home_team": "category", "away_team": "category"},
+    ),
+    # data/processed/player_signal_table.csv
+    "player_signal_table": CsvSchema(
+        name="player_signal_table",
+        columns={"name": None, "team": "category", "signal": "float32"},
+    ),
+}
+
+
+def get_schema(name: str) -> CsvSchema:
+    if name not in SCHEMAS:
+        raise KeyError(f"Unknown CSV schema {name!r}. Known: {sorted(SCHEMAS)}")
+    return SCHEMAS[name]
+
+
+def schema_columns(name: str) -> list[str]:
+    """Required + optional columns of a schema (e.g. for column-pruned cache reads)."""
+    schema = get_schema(name)
+    return [*schema.columns, *schema.optional]
+
+
+def read_csv_schema(
+    path: Path,
+    schema_name: str,
+    extra_columns: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read only the columns `schema_name` declares (plus extra_columns), with its dtypes.
+
+    Raises ValueError listing missing required columns, which usually means the
+    upstream format changed or the wrong file was downloaded.
+    """
+    schema = get_schema(schema_name)
+    header = pd.read_csv(path, nrows=0).columns
+
+    missing = [c for c in schema.required if c not in header]
+    if missing:
+        raise ValueError(
+            f"{path} is missing required columns for schema {schema_name!r}:\n"
+            f"{missing}\n"
+            f"Found: {list(header)}"
+        )
+
+    wanted = [*schema.required, *(c for c in schema.optional if c in header)]
+    for c in extra_columns or []:
+        if c in header and c not in wanted:
+            wanted.append(c)
+
+    dtypes = {c: t for c, t in schema.dtypes().items() if c in wanted}
+    df = pd.read_csv(path, usecols=wanted, dtype=dtypes)
+    return df[wanted]
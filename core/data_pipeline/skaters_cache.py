@@ -0,0 +1,132 @@
+"""
+skaters_cache.py
+----------------
+On-disk columnar cache for the MoneyPuck skaters table.
+
+What it does:
+- Parses data/raw/skaters.csv once and stores it under data/cache/skaters/
+  in the columnar format from columnar.py
+- Serves later loads from the cache (only the columns you ask for)
+- Invalidates automatically when the source CSV changes
+
+Fingerprint:
+- size + mtime are checked first (free)
+- if they differ, the SHA-1 of the file decides: same content -> re-stamp and reuse,
+  different content -> rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from columnar import read_frame, read_schema, write_frame
+from schemas import get_schema
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_cache_root() -> Path:
+    return _project_root() / "data" / "cache" / "skaters"
+
+
+def file_sha1(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_fingerprint(path: Path, with_hash: bool = True) -> dict:
+    st = Path(path).stat()
+    fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if with_hash:
+        fp["sha1"] = file_sha1(path)
+    return fp
+
+
+def _cache_dir_for(csv_path: Path, cache_root: Path) -> Path:
+    return cache_root / Path(csv_path).stem
+
+
+def _restamp(cache_dir: Path, schema: dict, fp: dict) -> None:
+    schema["meta"]["source"] = fp
+    (cache_dir / "_schema.json").write_text(json.dumps(schema, indent=2), encoding="utf-8")
+
+
+def ensure_skaters_cache(
+    csv_path: Path,
+    cache_root: Optional[Path] = None,
+    refresh: bool = False,
+) -> Path:
+    """
+    Make sure a valid columnar cache exists for csv_path and return its directory.
+    """
+    csv_path = Path(csv_path)
+    cache_root = cache_root or default_cache_root()
+    cache_dir = _cache_dir_for(csv_path, cache_root)
+
+    dtypes = get_schema("moneypuck_skaters").dtypes()
+
+    schema = None if refresh else read_schema(cache_dir)
+    if schema is not None and schema.get("meta", {}).get("dtypes") != dtypes:
+        schema = None  # built under an older schema registry
+    if schema is not None:
+        cached = schema.get("meta", {}).get("source", {})
+        quick = source_fingerprint(csv_path, with_hash=False)
+
+        # Fast path: file untouched since the cache was built
+        if cached.get("size") == quick["size"] and cached.get("mtime_ns") == quick["mtime_ns"]:
+            return cache_dir
+
+        # Touched (copied, re-downloaded) but maybe identical content
+        fp = source_fingerprint(csv_path)
+        if cached.get("sha1") == fp["sha1"]:
+            _restamp(cache_dir, schema, fp)
+            return cache_dir
+
+    fp = source_fingerprint(csv_path)
+    # Whole table is cached; registry dtypes make team/situation/position categorical
+    df = pd.read_csv(csv_path, dtype=dtypes)
+    write_frame(df, cache_dir, meta={"source": {"path": str(csv_path), **fp}, "dtypes": dtypes})
+    return cache_dir
+
+
+def load_skaters_cached(
+    csv_path: Path,
+    columns: Optional[Iterable[str]] = None,
+    cache_root: Optional[Path] = None,
+    refresh: bool = False,
+) -> pd.DataFrame:
+    """
+    Load the MoneyPuck skaters table, converting the CSV to the columnar cache on
+    first use. Pass `columns` to read only what the caller needs.
+    """
+    cache_dir = ensure_skaters_cache(csv_path, cache_root=cache_root, refresh=refresh)
+    # Copy out of the mmap so callers can mutate freely (the pipeline does)
+    return read_frame(cache_dir, columns=columns, mmap=False)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build / refresh the MoneyPuck skaters columnar cache.")
+    parser.add_argument("--csv", default=str(_project_root() / "data" / "raw" / "skaters.csv"))
+    parser.add_argument("--refresh", action="store_true", help="Rebuild even if the fingerprint matches.")
+    args = parser.parse_args()
+
+    cache_dir = ensure_skaters_cache(Path(args.csv), refresh=args.refresh)
+    schema = read_schema(cache_dir) or {}
+    print(f"Cache ready: {cache_dir} (rows={schema.get('rows')}, cols={len(schema.get('columns', []))})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
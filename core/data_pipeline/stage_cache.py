@@ -0,0 +1,173 @@
+"""
+stage_cache.py
+--------------
+Content-addressed cache for pipeline stage outputs.
+
+Each stage output is stored under a key derived from everything it depends on:
+input file contents, the date, model parameters, and the keys of upstream stages.
+If none of those changed the stage is served from disk; if one changed, only that
+stage and the stages downstream of it (whose keys include it) are recomputed.
+
+Layout (LOCAL ONLY):
+  data/cache/stages/<stage>-<sha256>.pkl
+  data/cache/stages/_file_digests.json   size/mtime -> sha1 memo (big files aren't rehashed)
+
+The directory is bounded by max_bytes; least-recently-used entries are evicted
+(hits touch the file's mtime).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from skaters_cache import file_sha1
+
+
+DIGEST_INDEX = "_file_digests.json"
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_stage_cache_root() -> Path:
+    return _project_root() / "data" / "cache" / "stages"
+
+
+class StageCache:
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = 512 * 1024 * 1024, enabled: bool = True):
+        self.root = Path(root or default_stage_cache_root())
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._digests: Optional[dict[str, dict]] = None
+        self.hits: list[str] = []
+        self.misses: list[str] = []
+
+    # -----------------------------
+    # Keys
+    # -----------------------------
+
+    def _digest_index(self) -> dict[str, dict]:
+        if self._digests is None:
+            path = self.root / DIGEST_INDEX
+            try:
+                self._digests = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                self._digests = {}
+        return self._digests
+
+    def _save_digest_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{DIGEST_INDEX}.{uuid.uuid4().hex}"
+        tmp.write_text(json.dumps(self._digest_index()), encoding="utf-8")
+        os.replace(tmp, self.root / DIGEST_INDEX)
+
+    def file_digest(self, path: Path) -> str:
+        """SHA-1 of a file's content ('missing' if absent), memoized on size + mtime."""
+        path = Path(path).resolve()
+        if not path.exists():
+            return "missing"
+
+        st = path.stat()
+        index = self._digest_index()
+        entry = index.get(str(path))
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha1"]
+
+        digest = file_sha1(path)
+        index[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+        self._save_digest_index()
+        return digest
+
+    def key(self, stage: str, **inputs: Any) -> str:
+        """
+        Key for a stage from its inputs. Path values are replaced by their content
+        digest; sets are sorted; everything else must be JSON-serializable.
+        """
+        def canon(v: Any) -> Any:
+            if isinstance(v, Path):
+                return {"file": self.file_digest(v)}
+            if isinstance(v, (set, frozenset)):
+                return sorted(canon(x) for x in v)
+            if isinstance(v, (list, tuple)):
+                return [canon(x) for x in v]
+            if isinstance(v, dict):
+                return {str(k): canon(x) for k, x in sorted(v.items())}
+            return v
+
+        payload = json.dumps({"stage": stage, "inputs": canon(inputs)}, sort_keys=True, default=str)
+        return f"{stage}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    # -----------------------------
+    # Storage
+    # -----------------------------
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        path = self._path(key)
+        if not self.enabled or not path.exists():
+            return False, None
+        try:
+            with path.open("rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False, None
+        os.utime(path)  # LRU: mark as recently used
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        with tmp.open("wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def cached(self, stage: str, compute: Callable[[], Any], **inputs: Any) -> tuple[Any, str]:
+        """
+        Return (value, key) for a stage, computing and storing it on a miss.
+        Downstream stages should pass the returned key as one of their inputs.
+        """
+        key = self.key(stage, **inputs)
+        hit, value = self.get(key)
+        if hit:
+            self.hits.append(stage)
+            return value, key
+
+        self.misses.append(stage)
+        value = compute()
+        self.put(key, value)
+        return value, key
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        if not self.root.exists():
+            return 0
+        entries = []
+        for p in self.root.glob("*.pkl"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
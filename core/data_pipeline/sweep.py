@@ -0,0 +1,289 @@
+"""
+sweep.py
+--------
+Grid search over the goal model's tuning constants (model.ModelParams):
+
+  pp1_boost, shrink, toi_clip_low, toi_clip_high, lambda_cap
+
+scored against what actually happened, in one broadcasted NumPy computation per
+chunk of grid points instead of editing constants and re-running a date at a time.
+
+Rows = scored (date, player) pairs, flattened. Sources:
+- logs (default): the predictions log (log_store "predictions", written by run_daily.py)
+  joined to the outcomes dataset (fetch_outcomes.py) on date + playerId (boxscores
+  abbreviate first names, so a name join would drop most rows). Runs logged before
+  the log carried playerId are skipped.
+  The logged is_pp1 (DailyFaceoff or MoneyPuck) is kept as-is.
+- backtest: the season tensor from backtest.py (MoneyPuck PP1 inference), for
+  ranges that were never run live.
+
+Per row the parameter-free inputs are precomputed once: xg_per_game, the raw
+(unclipped) TOI ratio to the team mean of that date's slate, is_pp1, scored.
+Then for a chunk of G grid points:
+
+  lambda (G, N) = clip(xg * clip(toi_ratio, low, high) * (1 + boost * is_pp1), 0, cap) * shrink
+
+and Brier, log-loss and calibration (ECE over fixed probability bins, plus
+mean_p - goal_rate) are reduced along N. Chunks keep G x N under max_cells.
+
+Usage:
+  python core/data_pipeline/sweep.py --start 2025-01-01 --end 2025-02-28
+  python core/data_pipeline/sweep.py --start 2024-10-08 --end 2025-04-17 --source backtest \
+      --shrink 0.5,0.6,0.65,0.7 --pp1-boost 0,0.5,1 --out data/processed/sweep.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import log_store
+from fetch_outcomes import load_outcomes
+from model import DEFAULT_PARAMS, ModelParams, per_game, pp1_flags
+
+
+PARAM_NAMES = ["pp1_boost", "shrink", "toi_clip_low", "toi_clip_high", "lambda_cap"]
+
+DEFAULT_GRID: dict[str, list[float]] = {
+    "pp1_boost": [0.0, 0.25, 0.5, 0.75, 1.0],
+    "shrink": [0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8],
+    "toi_clip_low": [0.5, 0.6, 0.7],
+    "toi_clip_high": [1.2, 1.4, 1.6],
+    "lambda_cap": [0.8, 1.0, 1.2, 1.5],
+}
+
+EPS = 1e-15
+CALIBRATION_BINS = 10
+DEFAULT_MAX_CELLS = 4_000_000
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+# -----------------------------
+# Rows
+# -----------------------------
+
+def _toi_ratio(df: pd.DataFrame) -> np.ndarray:
+    """toi_per_game / mean toi_per_game of the player's team on that date (raw, unclipped)."""
+    toi = df["toi_per_game"].to_numpy(dtype=np.float64)
+    team_mean = df.groupby(["date", "team"])["toi_per_game"].transform("mean").to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = toi / team_mean
+    return np.where(np.isfinite(ratio), ratio, 0.0)
+
+
+def rows_from_logs(
+    start: str,
+    end: str,
+    log_root: Optional[Path] = None,
+    outcomes_root: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Logged predictions (latest run per date) joined to outcomes."""
+    log_root = Path(log_root or _project_root() / "logs" / "store")
+    # All columns: older runs have no playerId column (concat fills it with NaN)
+    pred = log_store.read_range("predictions", start=start, end=end, root=log_root)
+    pred = pred.dropna(subset=["playerId"]) if "playerId" in pred.columns else pred.iloc[0:0]
+    if pred.empty:
+        raise FileNotFoundError(
+            f"No logged predictions with playerId in {log_root} for {start}..{end}\n"
+            "Run run_daily.py for those dates, or use --source backtest."
+        )
+    last_run = pred.groupby("date")["logged_at_utc"].transform("max")
+    pred = pred[pred["logged_at_utc"] == last_run].astype({"playerId": "int64"}).drop_duplicates(["date", "playerId"])
+    pred = pred.assign(toi_ratio=_toi_ratio(pred))
+
+    outcomes = load_outcomes(start, end, dataset_root=outcomes_root)
+    if outcomes.empty:
+        raise FileNotFoundError(
+            f"No outcomes for {start}..{end}\n"
+            f"Backfill them first: python fetch_outcomes.py --start {start} --end {end}"
+        )
+    outcomes = (
+        outcomes.dropna(subset=["player_id"])
+        .astype({"player_id": "int64"})
+        .groupby(["date", "player_id"], as_index=False)["goals"]
+        .sum()
+        .rename(columns={"player_id": "playerId"})
+    )
+
+    rows = pred.merge(outcomes, on=["date", "playerId"], how="inner")
+    return pd.DataFrame(
+        {
+            "date": rows["date"].astype(str),
+            "xg_per_game": rows["xg_per_game"].astype(float).fillna(0.0),
+            "toi_ratio": rows["toi_ratio"],
+            "is_pp1": rows["is_pp1"].fillna(0).astype(int),
+            "scored": rows["goals"] > 0,
+        }
+    )
+
+
+def rows_from_backtest(
+    start: str,
+    end: str,
+    skaters_csv: Optional[Path] = None,
+    outcomes_root: Optional[Path] = None,
+    pp1_top_n: int = DEFAULT_PARAMS.pp1_top_n,
+) -> pd.DataFrame:
+    """Scored cells of the backtest.py (date x player) tensor."""
+    from backtest import load_backtest_inputs
+
+    inputs = load_backtest_inputs(start, end, skaters_csv=skaters_csv, outcomes_root=outcomes_root)
+    # Season aggregates: the team mean is the same on every date
+    counts = np.bincount(inputs.team_code)
+    team_mean = per_game(np.bincount(inputs.team_code, weights=inputs.toi_per_game, minlength=counts.size), counts)
+    toi_ratio = per_game(inputs.toi_per_game, team_mean[inputs.team_code])
+    is_pp1 = pp1_flags(inputs.pp_icetime, inputs.team_code, ModelParams(pp1_top_n=pp1_top_n))
+
+    d, j = np.nonzero(inputs.mask & ~np.isnan(inputs.goals))
+    return pd.DataFrame(
+        {
+            "date": inputs.dates[d],
+            "xg_per_game": inputs.xg_per_game[j],
+            "toi_ratio": toi_ratio[j],
+            "is_pp1": is_pp1[j].astype(int),
+            "scored": inputs.goals[d, j] > 0,
+        }
+    )
+
+
+# -----------------------------
+# Sweep
+# -----------------------------
+
+def param_grid(grid: Optional[dict[str, list[float]]] = None) -> pd.DataFrame:
+    """Cartesian product of the grid values (missing names use DEFAULT_PARAMS)."""
+    grid = grid or {}
+    axes = [list(grid.get(k) or [getattr(DEFAULT_PARAMS, k)]) for k in PARAM_NAMES]
+    points = pd.DataFrame(list(itertools.product(*axes)), columns=PARAM_NAMES, dtype=float)
+    return points[points["toi_clip_low"] <= points["toi_clip_high"]].reset_index(drop=True)
+
+
+def _score_chunk(
+    params: dict[str, np.ndarray],
+    xg: np.ndarray,
+    toi_ratio: np.ndarray,
+    is_pp1: np.ndarray,
+    y: np.ndarray,
+    bins: int,
+) -> dict[str, np.ndarray]:
+    g = params["shrink"].shape[0]
+    col = {k: v[:, None] for k, v in params.items()}   # (G, 1) against (N,)
+
+    toi_mult = np.clip(toi_ratio, col["toi_clip_low"], col["toi_clip_high"])
+    lam = np.clip(xg * toi_mult * (1.0 + is_pp1 * col["pp1_boost"]), 0.0, col["lambda_cap"]) * col["shrink"]
+    p = -np.expm1(-lam)                                 # (G, N)
+
+    n = y.shape[0]
+    brier = ((p - y) ** 2).mean(axis=1)
+    pc = np.clip(p, EPS, 1 - EPS)
+    logloss = -(y * np.log(pc) + (1 - y) * np.log1p(-pc)).mean(axis=1)
+
+    # ECE: per grid point, |sum p - sum y| over fixed-width bins, / N
+    b = np.minimum((p * bins).astype(np.int64), bins - 1) + np.arange(g)[:, None] * bins
+    sum_p = np.bincount(b.ravel(), weights=p.ravel(), minlength=g * bins).reshape(g, bins)
+    sum_y = np.bincount(b.ravel(), weights=np.broadcast_to(y, p.shape).ravel(), minlength=g * bins).reshape(g, bins)
+    ece = np.abs(sum_p - sum_y).sum(axis=1) / n
+
+    return {"brier": brier, "logloss": logloss, "ece": ece, "mean_p": p.mean(axis=1)}
+
+
+def run_sweep(
+    rows: pd.DataFrame,
+    grid: Optional[pd.DataFrame] = None,
+    bins: int = CALIBRATION_BINS,
+    max_cells: int = DEFAULT_MAX_CELLS,
+) -> pd.DataFrame:
+    """
+    One result row per grid point: the parameters, brier, logloss, ece,
+    mean_p, calibration_gap (mean_p - goal_rate). Sorted by brier.
+    """
+    if rows.empty:
+        raise ValueError("No scored rows to sweep over (no prediction/outcome overlap).")
+    grid = param_grid(DEFAULT_GRID) if grid is None else grid.reset_index(drop=True)
+
+    xg = rows["xg_per_game"].to_numpy(dtype=np.float64)
+    toi_ratio = rows["toi_ratio"].to_numpy(dtype=np.float64)
+    is_pp1 = rows["is_pp1"].to_numpy(dtype=np.float64)
+    y = rows["scored"].to_numpy(dtype=np.float64)
+
+    step = max(1, max_cells // len(rows))
+    parts: dict[str, list[np.ndarray]] = {"brier": [], "logloss": [], "ece": [], "mean_p": []}
+    for s in range(0, len(grid), step):
+        chunk = {k: grid[k].to_numpy(dtype=np.float64)[s : s + step] for k in PARAM_NAMES}
+        for k, v in _score_chunk(chunk, xg, toi_ratio, is_pp1, y, bins).items():
+            parts[k].append(v)
+
+    out = grid.copy()
+    for k, v in parts.items():
+        out[k] = np.concatenate(v)
+    out["calibration_gap"] = out["mean_p"] - y.mean()
+    return out.sort_values(["brier", "logloss"], kind="stable").reset_index(drop=True)
+
+
+def _floats(text: str) -> list[float]:
+    try:
+        return [float(x) for x in text.split(",") if x.strip()]
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"expected comma-separated numbers, got {text!r}") from e
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Broadcasted parameter sweep for the goal model.")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--source", choices=["logs", "backtest"], default="logs")
+    parser.add_argument("--skaters", help="--source backtest: MoneyPuck skaters CSV (default data/raw/skaters.csv)")
+    for name in PARAM_NAMES:
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=_floats,
+            help=f"Comma-separated values (default {','.join(map(str, DEFAULT_GRID[name]))}).",
+        )
+    parser.add_argument("--bins", type=int, default=CALIBRATION_BINS, help="Calibration bins for ECE.")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--out", help="Write the full result grid to this CSV.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.source == "logs":
+        rows = rows_from_logs(args.start, args.end)
+    else:
+        rows = rows_from_backtest(args.start, args.end, skaters_csv=Path(args.skaters) if args.skaters else None)
+    t1 = time.perf_counter()
+
+    grid = param_grid({k: getattr(args, k) or DEFAULT_GRID[k] for k in PARAM_NAMES})
+    result = run_sweep(rows, grid, bins=args.bins)
+    t2 = time.perf_counter()
+
+    print(
+        f"{len(rows)} player-dates over {rows['date'].nunique()} dates, goal rate {rows['scored'].mean():.4f}; "
+        f"{len(grid)} grid points"
+    )
+    print(result.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    current = result
+    for k in PARAM_NAMES:
+        current = current[np.isclose(current[k], getattr(DEFAULT_PARAMS, k))]
+    if not current.empty:
+        rank = int(current.index[0]) + 1
+        print(f"\nCurrent model.DEFAULT_PARAMS: rank {rank}/{len(result)}, brier {current['brier'].iloc[0]:.5f}")
+
+    print(f"\nLoad {t1 - t0:.2f} s, sweep {t2 - t1:.2f} s")
+    if args.out:
+        result.to_csv(args.out, index=False)
+        print(f"Saved: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
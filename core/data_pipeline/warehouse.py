@@ -0,0 +1,503 @@
+"""
+warehouse.py
+------------
+Local SQLite warehouse (stdlib sqlite3) for everything the pipeline produces.
+
+Tables (keyed by date / game_id / player_id; MoneyPuck playerId is the NHL player id):
+- predictions   <- data/processed/predictions_{date}.csv        (run_daily.py)
+- ev            <- data/processed/goal_scorer_ev_{date}.csv     (run_daily.py)
+- odds          <- data/processed/odds_anytime_goalscorer.csv   (odds_parse_anytime.py)
+- outcomes      <- data/processed/outcomes/{date}/ dataset       (fetch_outcomes.py)
+- player_games  <- MoneyPuck game-by-game CSVs                  (rolling_features.py ingest)
+- player_form   <- derived: incremental EWMA / last-N state per player (rolling_features.py)
+- settlements   <- derived: ev rows graded against outcomes (1 unit flat stake)
+
+Why it's written this way:
+- Loads are idempotent (INSERT OR REPLACE on the natural key), so re-ingesting a date is safe
+- Each loader is one executemany in one transaction (bulk insert)
+- Joins go on (date, player_id), never on names: boxscores abbreviate first names
+  ("C. McDavid"), so name joins between MoneyPuck and NHL rows silently miss.
+  game_id comes from the frame when present, else from the season schedule index
+- player_norm is kept for display / lookups by name only
+- Warehouses created before predictions / ev / settlements were keyed on player_id
+  have those tables renamed to <table>_by_name on connect; re-run `ingest` per date
+  to reload them from the CSVs
+- The analytical queries live here as SQL constants so notebooks don't re-implement joins
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from fetch_outcomes import load_outcomes as read_outcomes
+from names import normalize_names
+from schedule_index import SeasonScheduleIndex, load_season_index
+
+
+def _project_root() -> Path:
+    # core/data_pipeline/... -> parents[2] = repo root
+    return Path(__file__).resolve().parents[2]
+
+
+def default_db_path() -> Path:
+    return _project_root() / "data" / "processed" / "nhlscorer.sqlite"
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    date             TEXT    NOT NULL,
+    game_id          INTEGER NOT NULL,
+    player_id        INTEGER NOT NULL,
+    player           TEXT    NOT NULL,
+    player_norm      TEXT    NOT NULL,
+    team             TEXT    NOT NULL,
+    xg_per_game      REAL,
+    toi_per_game     REAL,
+    toi_multiplier   REAL,
+    lambda_goal      REAL,
+    goal_probability REAL,
+    is_pp1           INTEGER,
+    is_pp2           INTEGER,
+    PRIMARY KEY (date, game_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS ix_predictions_player_id ON predictions (player_id);
+CREATE INDEX IF NOT EXISTS ix_predictions_player_norm ON predictions (player_norm);
+
+CREATE TABLE IF NOT EXISTS ev (
+    date             TEXT    NOT NULL,
+    game_id          INTEGER NOT NULL,
+    player_id        INTEGER NOT NULL,
+    bookmaker        TEXT    NOT NULL DEFAULT 'manual',
+    player           TEXT    NOT NULL,
+    player_norm      TEXT    NOT NULL,
+    team             TEXT    NOT NULL,
+    odds             REAL    NOT NULL,
+    implied_prob     REAL,
+    goal_probability REAL,
+    lambda_goal      REAL,
+    ev               REAL,
+    ev_percent       REAL,
+    is_pp1           INTEGER,
+    PRIMARY KEY (date, game_id, player_id, bookmaker)
+);
+CREATE INDEX IF NOT EXISTS ix_ev_player_id ON ev (player_id);
+CREATE INDEX IF NOT EXISTS ix_ev_player_norm ON ev (player_norm);
+
+CREATE TABLE IF NOT EXISTS odds (
+    snapshot_date    TEXT    NOT NULL,
+    event_id         TEXT    NOT NULL,
+    commence_time    TEXT,
+    home_team        TEXT,
+    away_team        TEXT,
+    bookmaker        TEXT    NOT NULL,
+    market_key       TEXT    NOT NULL,
+    player_name      TEXT    NOT NULL,
+    player_norm      TEXT    NOT NULL,
+    price_decimal    REAL    NOT NULL,
+    PRIMARY KEY (snapshot_date, event_id, bookmaker, market_key, player_name)
+);
+CREATE INDEX IF NOT EXISTS ix_odds_event ON odds (event_id);
+CREATE INDEX IF NOT EXISTS ix_odds_player_norm ON odds (player_norm);
+
+CREATE TABLE IF NOT EXISTS outcomes (
+    date             TEXT    NOT NULL,
+    game_id          INTEGER NOT NULL,
+    team             TEXT    NOT NULL,
+    player_id        INTEGER NOT NULL,
+    player           TEXT,
+    player_norm      TEXT,
+    goals            INTEGER NOT NULL,
+    PRIMARY KEY (game_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS ix_outcomes_date ON outcomes (date);
+CREATE INDEX IF NOT EXISTS ix_outcomes_player_id ON outcomes (date, player_id);
+CREATE INDEX IF NOT EXISTS ix_outcomes_player_norm ON outcomes (date, player_norm);
+
+CREATE TABLE IF NOT EXISTS player_games (
+    date             TEXT    NOT NULL,
+    game_id          INTEGER NOT NULL,
+    player_id        INTEGER NOT NULL,
+    player           TEXT,
+    team             TEXT    NOT NULL,
+    icetime          REAL,
+    pp_icetime       REAL,
+    xg               REAL,
+    goals            INTEGER,
+    loaded_seq       INTEGER NOT NULL,
+    PRIMARY KEY (game_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS ix_player_games_player ON player_games (player_id, date);
+CREATE INDEX IF NOT EXISTS ix_player_games_seq ON player_games (loaded_seq);
+
+CREATE TABLE IF NOT EXISTS player_form (
+    player_id          INTEGER PRIMARY KEY,
+    player             TEXT,
+    team               TEXT,
+    last_date          TEXT    NOT NULL,
+    last_game_id       INTEGER NOT NULL,
+    games              INTEGER NOT NULL,
+    ewm_weight         REAL    NOT NULL,
+    ewm_xg             REAL    NOT NULL,
+    ewm_icetime        REAL    NOT NULL,
+    ewm_pp_icetime     REAL    NOT NULL,
+    lastn_games        INTEGER NOT NULL,
+    lastn_xg           REAL    NOT NULL,
+    lastn_icetime      REAL    NOT NULL,
+    lastn_pp_icetime   REAL    NOT NULL,
+    updated_at_utc     TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS form_meta (
+    key              TEXT    PRIMARY KEY,
+    value            TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS settlements (
+    date             TEXT    NOT NULL,
+    game_id          INTEGER NOT NULL,
+    player_id        INTEGER NOT NULL,
+    bookmaker        TEXT    NOT NULL,
+    player_norm      TEXT,
+    team             TEXT    NOT NULL,
+    odds             REAL    NOT NULL,
+    ev               REAL,
+    stake            REAL    NOT NULL,
+    scored           INTEGER NOT NULL,
+    pnl              REAL    NOT NULL,
+    settled_at_utc   TEXT    NOT NULL,
+    PRIMARY KEY (date, game_id, player_id, bookmaker)
+);
+"""
+
+# Tables whose key moved from (date, player_norm, team) to (date, game_id, player_id)
+ID_KEYED_TABLES = ["predictions", "ev", "settlements"]
+
+
+# -----------------------------
+# Connection
+# -----------------------------
+
+def connect(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """Open (and create if needed) the warehouse."""
+    db_path = Path(db_path or default_db_path())
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _retire_name_keyed_tables(conn)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _retire_name_keyed_tables(conn: sqlite3.Connection) -> None:
+    """Rename pre-player_id tables to <table>_by_name (kept, not dropped) so SCHEMA recreates them."""
+    for table in ID_KEYED_TABLES:
+        cols = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if not cols or "game_id" in cols:
+            continue
+        indexes = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+        ).fetchall()
+        with conn:
+            for (name,) in indexes:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_by_name")
+        print(f"[warehouse] {table}: name-keyed table renamed to {table}_by_name; re-ingest dates to reload it")
+
+
+def _bulk_upsert(conn: sqlite3.Connection, table: str, df: pd.DataFrame, columns: list[str]) -> int:
+    """INSERT OR REPLACE df[columns] into table in one transaction."""
+    if df.empty:
+        return 0
+
+    out = df.copy()
+    for col in columns:
+        if col not in out.columns:
+            out[col] = None
+    out = out[columns].astype(object).where(out[columns].notna(), None)
+
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    with conn:
+        conn.executemany(sql, out.itertuples(index=False, name=None))
+    return len(out)
+
+
+def _with_game_ids(
+    df: pd.DataFrame, target_date: str, schedule: Optional[SeasonScheduleIndex] = None
+) -> pd.DataFrame:
+    """
+    df (player_id, team) with game_id filled from the schedule where missing; rows
+    without a player_id or a game on target_date are dropped.
+    """
+    df = df.dropna(subset=["player_id"])
+    if "game_id" not in df.columns:
+        df = df.assign(game_id=pd.NA)
+    if df["game_id"].isna().any():
+        schedule = schedule or load_season_index(target_date)
+        game_of = {t: g.game_id for g in schedule.games_on(target_date) for t in (g.away, g.home)}
+        df = df.assign(game_id=df["game_id"].fillna(df["team"].astype(str).str.upper().map(game_of)))
+    dropped = int(df["game_id"].isna().sum())
+    if dropped:
+        print(f"[warn] {dropped} rows on {target_date} have no scheduled game; not loaded")
+    return df.dropna(subset=["game_id"]).astype({"player_id": "int64", "game_id": "int64"})
+
+
+# -----------------------------
+# Loaders (one per pipeline stage)
+# -----------------------------
+
+def load_predictions(
+    conn: sqlite3.Connection, target_date: str, pred: pd.DataFrame, schedule: Optional[SeasonScheduleIndex] = None
+) -> int:
+    df = pred.rename(columns={"name": "player", "playerId": "player_id"})
+    df = _with_game_ids(df, target_date, schedule)
+    df = df.assign(date=target_date, player_norm=normalize_names(df["player"]))
+    cols = [
+        "date", "game_id", "player_id", "player", "player_norm", "team", "xg_per_game", "toi_per_game",
+        "toi_multiplier", "lambda_goal", "goal_probability", "is_pp1", "is_pp2",
+    ]
+    return _bulk_upsert(conn, "predictions", df, cols)
+
+
+def load_ev(
+    conn: sqlite3.Connection,
+    target_date: str,
+    merged: pd.DataFrame,
+    bookmaker: str = "manual",
+    schedule: Optional[SeasonScheduleIndex] = None,
+) -> int:
+    df = _with_game_ids(merged.rename(columns={"playerId": "player_id"}), target_date, schedule)
+    df = df.assign(date=target_date, player_norm=normalize_names(df["player"]))
+    if "bookmaker" not in df.columns:
+        df["bookmaker"] = bookmaker
+    cols = [
+        "date", "game_id", "player_id", "bookmaker", "player", "player_norm", "team", "odds", "implied_prob",
+        "goal_probability", "lambda_goal", "ev", "ev_percent", "is_pp1",
+    ]
+    return _bulk_upsert(conn, "ev", df, cols)
+
+
+def load_odds(conn: sqlite3.Connection, snapshot_date: str, odds: pd.DataFrame) -> int:
+    df = odds.assign(snapshot_date=snapshot_date, player_norm=normalize_names(odds["player_name"]))
+    cols = [
+        "snapshot_date", "event_id", "commence_time", "home_team", "away_team",
+        "bookmaker", "market_key", "player_name", "player_norm", "price_decimal",
+    ]
+    return _bulk_upsert(conn, "odds", df, cols)
+
+
+def load_outcomes(conn: sqlite3.Connection, outcomes: pd.DataFrame) -> int:
+    df = outcomes.dropna(subset=["player_id"])
+    df = df.assign(player_norm=normalize_names(df["player"]))
+    cols = ["date", "game_id", "team", "player_id", "player", "player_norm", "goals"]
+    return _bulk_upsert(conn, "outcomes", df, cols)
+
+
+def load_player_games(conn: sqlite3.Connection, games: pd.DataFrame) -> int:
+    """
+    Upsert per-game player rows. Every call gets the next loaded_seq, which is the
+    watermark rolling_features.update_form() uses to find rows it hasn't applied.
+    """
+    seq = conn.execute("SELECT COALESCE(MAX(loaded_seq), 0) + 1 FROM player_games").fetchone()[0]
+    cols = ["date", "game_id", "player_id", "player", "team", "icetime", "pp_icetime", "xg", "goals", "loaded_seq"]
+    return _bulk_upsert(conn, "player_games", games.assign(loaded_seq=seq), cols)
+
+
+PLAYER_FORM_COLUMNS = [
+    "player_id", "player", "team", "last_date", "last_game_id", "games",
+    "ewm_weight", "ewm_xg", "ewm_icetime", "ewm_pp_icetime",
+    "lastn_games", "lastn_xg", "lastn_icetime", "lastn_pp_icetime",
+]
+
+
+def load_player_form(conn: sqlite3.Connection, state: pd.DataFrame) -> int:
+    """Upsert rolling-form state rows (rolling_features.update_form)."""
+    df = state.assign(updated_at_utc=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    return _bulk_upsert(conn, "player_form", df, PLAYER_FORM_COLUMNS + ["updated_at_utc"])
+
+
+SETTLE_SQL = """
+INSERT OR REPLACE INTO settlements
+    (date, game_id, player_id, bookmaker, player_norm, team, odds, ev, stake, scored, pnl, settled_at_utc)
+SELECT
+    e.date, e.game_id, e.player_id, e.bookmaker, e.player_norm, e.team, e.odds, e.ev,
+    1.0                                              AS stake,
+    (o.goals > 0)                                    AS scored,
+    CASE WHEN o.goals > 0 THEN e.odds - 1.0 ELSE -1.0 END AS pnl,
+    :settled_at
+FROM ev e
+JOIN outcomes o
+  ON o.date = e.date AND o.player_id = e.player_id
+WHERE e.date = :date AND e.ev > :min_ev
+"""
+
+
+def settle_date(conn: sqlite3.Connection, target_date: str, min_ev: float = 0.0) -> int:
+    """
+    Grade the date's EV rows (ev > min_ev) against outcomes, 1 unit flat stake.
+    Players without an outcome row (scratched / not matched) are left unsettled.
+    """
+    settled_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with conn:
+        cur = conn.execute(SETTLE_SQL, {"date": target_date, "min_ev": min_ev, "settled_at": settled_at})
+    return cur.rowcount
+
+
+def ingest_date(
+    conn: sqlite3.Connection,
+    target_date: str,
+    processed_dir: Optional[Path] = None,
+    schedule: Optional[SeasonScheduleIndex] = None,
+) -> dict[str, int]:
+    """
+    Load whatever pipeline outputs exist for target_date, then settle it.
+    Missing files are skipped (e.g. outcomes before the games are played).
+    """
+    processed_dir = Path(processed_dir or _project_root() / "data" / "processed")
+    counts: dict[str, int] = {}
+
+    pred_path = processed_dir / f"predictions_{target_date}.csv"
+    if pred_path.exists():
+        counts["predictions"] = load_predictions(conn, target_date, pd.read_csv(pred_path), schedule)
+
+    ev_path = processed_dir / f"goal_scorer_ev_{target_date}.csv"
+    if ev_path.exists():
+        counts["ev"] = load_ev(conn, target_date, pd.read_csv(ev_path), schedule=schedule)
+
+    outcomes = read_outcomes(target_date, target_date, dataset_root=processed_dir)
+    if not outcomes.empty:
+        counts["outcomes"] = load_outcomes(conn, outcomes)
+
+    if counts.get("ev") or counts.get("outcomes"):
+        counts["settlements"] = settle_date(conn, target_date)
+
+    return counts
+
+
+# -----------------------------
+# Prepared analytical queries
+# -----------------------------
+
+CALIBRATION_SQL = """
+SELECT p.date, p.player, p.team, p.lambda_goal, p.goal_probability, p.is_pp1,
+       o.goals, (o.goals > 0) AS scored
+FROM predictions p
+JOIN outcomes o
+  ON o.date = p.date AND o.player_id = p.player_id
+WHERE p.date BETWEEN :start AND :end
+ORDER BY p.date, p.goal_probability DESC
+"""
+
+ROI_BY_DATE_SQL = """
+SELECT date,
+       COUNT(*)                 AS bets,
+       SUM(scored)              AS wins,
+       SUM(stake)               AS staked,
+       SUM(pnl)                 AS pnl,
+       SUM(pnl) / SUM(stake)    AS roi,
+       AVG(ev)                  AS avg_ev
+FROM settlements
+WHERE date BETWEEN :start AND :end
+GROUP BY date
+ORDER BY date
+"""
+
+PLAYER_HISTORY_SQL = """
+SELECT p.date, p.player_id, p.player, p.team, p.lambda_goal, p.goal_probability, p.is_pp1,
+       e.bookmaker, e.odds, e.ev, o.goals
+FROM predictions p
+LEFT JOIN ev e
+  ON e.date = p.date AND e.player_id = p.player_id
+LEFT JOIN outcomes o
+  ON o.date = p.date AND o.player_id = p.player_id
+WHERE p.player_id = :player_id
+ORDER BY p.date
+"""
+
+PLAYER_IDS_SQL = """
+SELECT DISTINCT player_id FROM predictions WHERE player_norm = :player_norm ORDER BY player_id
+"""
+
+
+def calibration_frame(conn: sqlite3.Connection, start: str = "0000-00-00", end: str = "9999-99-99") -> pd.DataFrame:
+    """Predictions joined to what actually happened (one row per player-date)."""
+    return pd.read_sql_query(CALIBRATION_SQL, conn, params={"start": start, "end": end})
+
+
+def roi_by_date(conn: sqlite3.Connection, start: str = "0000-00-00", end: str = "9999-99-99") -> pd.DataFrame:
+    """Flat-stake ROI of settled EV bets per date."""
+    return pd.read_sql_query(ROI_BY_DATE_SQL, conn, params={"start": start, "end": end})
+
+
+def player_ids_for(conn: sqlite3.Connection, player_norm: str) -> list[int]:
+    """player_ids predicted under a normalized name (namesakes -> several)."""
+    return [row[0] for row in conn.execute(PLAYER_IDS_SQL, {"player_norm": player_norm})]
+
+
+def player_history(conn: sqlite3.Connection, player_id: int) -> pd.DataFrame:
+    """Every prediction for one player with odds / outcome where known."""
+    return pd.read_sql_query(PLAYER_HISTORY_SQL, conn, params={"player_id": int(player_id)})
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NHL scorer SQLite warehouse.")
+    parser.add_argument("--db", default=str(default_db_path()))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Load a date's pipeline outputs and settle it.")
+    p_ingest.add_argument("--date", required=True, help="YYYY-MM-DD")
+
+    p_odds = sub.add_parser("ingest-odds", help="Load a parsed odds CSV (odds_parse_anytime.py output).")
+    p_odds.add_argument("--csv", required=True)
+    p_odds.add_argument("--snapshot-date", required=True, help="YYYY-MM-DD the odds were pulled")
+
+    p_query = sub.add_parser("query", help="Run a prepared query and print it.")
+    p_query.add_argument("name", choices=["calibration", "roi", "player"])
+    p_query.add_argument("--start", default="0000-00-00")
+    p_query.add_argument("--end", default="9999-99-99")
+    p_query.add_argument("--player-id", type=int, help="NHL player id (for 'player')")
+    p_query.add_argument("--player", help="player name, resolved to ids via predictions (for 'player')")
+
+    args = parser.parse_args()
+    conn = connect(Path(args.db))
+
+    if args.command == "ingest":
+        counts = ingest_date(conn, args.date.strip())
+        print(f"Ingested {args.date}: {counts}")
+    elif args.command == "ingest-odds":
+        n = load_odds(conn, args.snapshot_date.strip(), pd.read_csv(args.csv))
+        print(f"Ingested odds rows: {n}")
+    else:
+        if args.name == "calibration":
+            df = calibration_frame(conn, args.start, args.end)
+        elif args.name == "roi":
+            df = roi_by_date(conn, args.start, args.end)
+        else:
+            if args.player_id is not None:
+                ids = [args.player_id]
+            elif args.player:
+                ids = player_ids_for(conn, normalize_names(pd.Series([args.player]))[0])
+            else:
+                parser.error("query player requires --player-id or --player")
+            frames = [player_history(conn, pid) for pid in ids]
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        print(df.to_string(index=False))
+
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The pipeline modules import each other flat (scripts run from core/data_pipeline/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "data_pipeline"))
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
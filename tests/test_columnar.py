@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar import read_frame, read_schema, write_frame
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "playerId": np.array([8478402, 8479318, 8477934, 8480012], dtype=np.int64),
+            "icetime": [1520.5, np.nan, 0.0, 88.25],
+            "is_pp1": [True, False, False, True],
+            "name": ["Connor McDavid", None, "Leon Draisaitl", "Evan Bouchard"],
+            "situation": pd.Categorical(["all", "5on4", "all", "other"]),
+            "gameDate": pd.to_datetime(["2024-10-08", "2024-10-10", "2024-10-12", "2024-10-15"]),
+            "games": pd.array([82, None, 3, 1], dtype="Int64"),
+        }
+    )
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, mmap):
+    df = _frame()
+    write_frame(df, tmp_path / "t", meta={"sha1": "abc"})
+    back = read_frame(tmp_path / "t", mmap=mmap)
+
+    assert list(back.columns) == list(df.columns)
+    np.testing.assert_array_equal(back["playerId"], df["playerId"])
+    np.testing.assert_array_equal(back["icetime"], df["icetime"])     # NaN == NaN here
+    np.testing.assert_array_equal(back["is_pp1"], df["is_pp1"])
+    assert back["name"].tolist()[::2] == df["name"].tolist()[::2]
+    assert pd.isna(back["name"].iloc[1])
+    assert isinstance(back["situation"].dtype, pd.CategoricalDtype)
+    assert back["situation"].tolist() == df["situation"].tolist()
+    np.testing.assert_array_equal(back["gameDate"].to_numpy(), df["gameDate"].to_numpy())
+    # nullable ints come back as float with NaN
+    np.testing.assert_array_equal(back["games"], [82.0, np.nan, 3.0, 1.0])
+    assert read_schema(tmp_path / "t")["meta"] == {"sha1": "abc"}
+
+
+def test_column_projection_and_missing(tmp_path):
+    write_frame(_frame(), tmp_path / "t")
+    back = read_frame(tmp_path / "t", columns=["name", "playerId"])
+    assert list(back.columns) == ["name", "playerId"]
+    with pytest.raises(KeyError):
+        read_frame(tmp_path / "t", columns=["nope"])
+
+
+def test_rewrite_replaces_and_leaves_no_temp_dirs(tmp_path):
+    write_frame(_frame(), tmp_path / "t")
+    write_frame(_frame().head(1), tmp_path / "t")
+    assert len(read_frame(tmp_path / "t")) == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["t"]
+
+
+def test_not_a_columnar_dir(tmp_path):
+    assert read_schema(tmp_path) is None
+    with pytest.raises(FileNotFoundError):
+        read_frame(tmp_path)
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+import dailyfaceoff_pp_scraper as dfo
+from conftest import FIXTURES
+
+
+PAGES = FIXTURES / "dailyfaceoff"
+
+EXPECTED = {
+    "toronto-maple-leafs": {
+        "pp1": ["Auston Matthews", "Mitch Marner", "William Nylander", "John Tavares", "Morgan Rielly"],
+        "pp2": ["Matthew Knies", "Max Domi", "Bobby McMann", "Nick Robertson", "Oliver Ekman-Larsson"],
+    },
+    "montreal-canadiens": {
+        "pp1": ["Cole Caufield", "Nick Suzuki", "Juraj Slafkovský", "Patrik Laine", "Lane Hutson"],
+        "pp2": ["Kirby Dach", "Alex Newhook", "Brendan Gallagher", "Josh Anderson", "Mike Matheson"],
+    },
+    "seattle-kraken": {
+        "pp1": ["Jared McCann", "Matty Beniers", "Jordan Eberle", "Chandler Stephenson", "Vince Dunn"],
+        "pp2": [],
+    },
+}
+
+
+class _PageClient:
+    """Stands in for http_client.HttpClient: serves the saved page for a slug."""
+
+    class _Response:
+        def __init__(self, text: str):
+            self.text = text
+
+        def raise_for_status(self) -> None:
+            pass
+
+    def get(self, url: str, **kwargs):
+        slug = url.rstrip("/").split("/")[-2]
+        return self._Response((PAGES / f"{slug}.html").read_text(encoding="utf-8"))
+
+
+def _html(slug: str) -> str:
+    return (PAGES / f"{slug}.html").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("slug", sorted(EXPECTED))
+def test_scrape_powerplay_units_on_saved_pages(slug):
+    assert dfo.scrape_powerplay_units(slug, client=_PageClient()) == {"team_slug": slug, **EXPECTED[slug]}
+
+
+@pytest.mark.parametrize("backend", ["auto", "regex", "lxml", "bs4"])
+@pytest.mark.parametrize("slug", sorted(EXPECTED))
+def test_extractors_agree_with_scrape(slug, backend):
+    if backend == "lxml" and dfo.lxml_html is None:
+        pytest.skip("lxml not installed")
+    scraped = dfo.scrape_powerplay_units(slug, client=_PageClient())
+    assert dfo.parse_powerplay_units(_html(slug), backend=backend) == {k: scraped[k] for k in ("pp1", "pp2")}
+
+
+def test_auto_falls_back_to_dom_when_regex_finds_nothing():
+    # entity inside the heading: the raw-HTML regex misses it, the DOM parsers decode it
+    html = _html("toronto-maple-leafs").replace("1st Powerplay Unit", "1st Powerplay Un&#105;t")
+    html = html.replace("2nd Powerplay Unit", "2nd Power Play Unit")
+    assert dfo._extract_regex(html) == {"pp1": [], "pp2": []}
+    assert dfo.parse_powerplay_units(html)["pp1"] == EXPECTED["toronto-maple-leafs"]["pp1"]
+
+
+def test_benchmark_reports_all_backends_match():
+    res = dfo.benchmark_pp_extractors(sorted(PAGES.glob("*.html")), repeat=1)
+    assert res["matches_bs4"].all()
+    assert set(res["page"]) == {f"{slug}.html" for slug in EXPECTED}
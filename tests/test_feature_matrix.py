@@ -0,0 +1,32 @@
+import numpy as np
+
+from feature_matrix import SeasonFeatures
+
+
+def _features():
+    return SeasonFeatures(
+        features=np.arange(12, dtype=np.float32).reshape(2, 6),
+        feature_names=["games_played", "I_F_xGoals"],
+        player_id=np.array([1, 1, 2, 2, 3, 3], dtype=np.int32),
+        name_code=np.array([0, 0, 1, 1, 2, 2], dtype=np.int32),
+        team_code=np.array([0, 0, 1, 1, 2, 2], dtype=np.int16),
+        situation_code=np.array([0, 2, 0, 1, 0, 2], dtype=np.int8),
+        names=np.array(["A", "B", "C"]),
+        teams=np.array(["EDM", "MTL", "TOR"]),
+        situations=np.array(["5on4", "5on5", "all"]),
+    )
+
+
+def test_rows_for_masks_teams_and_situations():
+    sf = _features()
+    mask = sf.rows_for({"EDM", "TOR"}, {"all", "5on4"})
+    np.testing.assert_array_equal(mask, [True, True, False, False, True, True])
+    assert sf.rows_for().all()
+    assert not sf.rows_for({"SEA"}).any()
+
+
+def test_to_frame_decodes_only_masked_rows():
+    sf = _features()
+    df = sf.to_frame(sf.rows_for({"MTL"}, {"5on5"}))
+    assert df[["playerId", "name", "team", "situation"]].values.tolist() == [[2, "B", "MTL", "5on5"]]
+    assert df["I_F_xGoals"].tolist() == [9.0]
@@ -0,0 +1,28 @@
+import json
+
+import fetch_outcomes
+
+
+def _box(gid):
+    skater = {"playerId": gid % 1000, "fullName": f"Skater {gid}", "goals": 1}
+    team = {"teamAbbrev": {"default": "TOR"}, "forwards": [skater], "defense": []}
+    return {"gameState": "OFF", "playerByGameStats": {"awayTeam": team, "homeTeam": {}}}
+
+
+def test_backfill_keeps_a_date_incomplete_when_one_game_fails(tmp_path, monkeypatch):
+    games = {"2024-12-05": [1, 2], "2024-12-06": [3]}
+    monkeypatch.setattr(fetch_outcomes, "get_game_ids_for_date", lambda d: games[d])
+
+    def fake_get(url, **kwargs):
+        gid = int(url.split("/")[-2])
+        if gid == 2:
+            raise json.JSONDecodeError("truncated cache entry", "", 0)
+        return _box(gid)
+
+    monkeypatch.setattr(fetch_outcomes, "nhl_get_json", fake_get)
+    written = fetch_outcomes.backfill_outcomes("2024-12-05", "2024-12-06", max_in_flight=2, dataset_root=tmp_path)
+
+    assert written == {"2024-12-06": 1}
+    assert fetch_outcomes._load_checkpoint(tmp_path / "outcomes" / "_checkpoint.json") == {"2024-12-06"}
+    out = fetch_outcomes.load_outcomes(dataset_root=tmp_path)
+    assert out["game_id"].tolist() == [3]
@@ -0,0 +1,85 @@
+import json
+import threading
+
+from http_cache import HttpCache
+
+
+class _Response:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode("utf-8")
+        self.headers = {"Cache-Control": "max-age=3600"}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _Client:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+        return _Response({"url": url, "pad": "x" * 100})
+
+
+ENTRY = len(_Response({"url": "https://example.test/0", "pad": "x" * 100}).content)
+
+
+def _disk_bytes(root):
+    return sum(p.stat().st_size for p in root.glob("*.body"))
+
+
+def test_evict_scans_only_when_over_budget(tmp_path, monkeypatch):
+    cache = HttpCache(root=tmp_path, policies=[], max_bytes=1000, client=_Client(), evict_every=1000)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+
+    for i in range(20):
+        cache.get_json(f"https://example.test/{i}")
+    # one scan on the first write, then one each time the running total passes max_bytes
+    assert 1 < len(scans) < 20
+    assert _disk_bytes(tmp_path) <= 1000
+
+
+def test_rewriting_an_entry_does_not_evict_others(tmp_path):
+    client = _Client()
+    cache = HttpCache(root=tmp_path, policies=[], max_bytes=2 * ENTRY, client=client)
+    cache.get_json("https://example.test/a")
+    cache.get_json("https://example.test/b")
+    meta = tmp_path / f"{HttpCache._key('https://example.test/a', None)}.meta.json"
+    for _ in range(5):
+        meta.write_text(json.dumps({**json.loads(meta.read_text()), "expires_at": 0}))
+        cache.get_json("https://example.test/a")        # stale -> refetched and rewritten
+    calls = client.calls
+    cache.get_json("https://example.test/b")
+    assert client.calls == calls                        # b is still a hit
+
+
+def test_concurrent_hits_and_evictions(tmp_path):
+    client = _Client()
+    cache = HttpCache(root=tmp_path, policies=[], max_bytes=3 * ENTRY, client=client, evict_every=7)
+    errors = []
+
+    def worker(k):
+        try:
+            for i in range(200):
+                cache.get_json(f"https://example.test/{(i * k) % 9}")
+        except Exception as e:  # pragma: no cover - the assertion below reports it
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert sum(cache.stats.values()) == 8 * 200
+    assert cache.stats["miss"] == client.calls
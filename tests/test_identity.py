@@ -0,0 +1,36 @@
+import pandas as pd
+
+from identity import PlayerRegistry
+
+PLAYERS = pd.DataFrame(
+    {
+        "player_id": [1, 2, 3, 4],
+        "name": ["Connor McDavid", "Auston Matthews", "Nathan MacKinnon", "Mitch Marner"],
+        "team": ["EDM", "TOR", "COL", "TOR"],
+    }
+)
+ODDS = pd.DataFrame({"player": ["Conor McDavid", "Nate MacKinnon", "Auston Matthews"]})
+
+
+def test_resolve_frame_does_not_write_aliases(tmp_path):
+    alias_path = tmp_path / "player_aliases.csv"
+    registry = PlayerRegistry(PLAYERS, alias_path=alias_path)
+    ids = registry.resolve_frame(ODDS, "player", source="manual_odds")
+    assert ids.tolist() == [1, 3, 2]
+    assert not alias_path.exists()
+
+
+def test_save_keeps_only_strong_matches_with_team(tmp_path):
+    alias_path = tmp_path / "player_aliases.csv"
+    registry = PlayerRegistry(PLAYERS, alias_path=alias_path, save_min_score=0.95)
+    registry.resolve_frame(ODDS, "player", source="manual_odds")
+    assert registry.save_aliases() == 1      # McDavid (0.96); MacKinnon (0.87) is used but not kept
+
+    saved = pd.read_csv(alias_path, keep_default_na=False)
+    assert saved[["name_norm", "team", "player_id"]].values.tolist() == [["conor mcdavid", "EDM", 1]]
+
+    # A team-less query from the same source finds the team-keyed alias
+    reloaded = PlayerRegistry(PLAYERS.iloc[1:], alias_path=alias_path)
+    assert reloaded._alias("manual_odds", "conor mcdavid", "") is None     # player 1 not in this registry
+    reloaded = PlayerRegistry(PLAYERS, alias_path=alias_path)
+    assert reloaded._alias("manual_odds", "conor mcdavid", "") == 1
@@ -0,0 +1,32 @@
+import pandas as pd
+
+import log_store
+
+
+def _run(tmp_path, date, logged_at, players):
+    df = pd.DataFrame({"date": date, "logged_at_utc": logged_at, "player": players, "goal_probability": 0.2})
+    log_store.append_run("predictions", date, df, root=tmp_path)
+
+
+def test_read_range_only_opens_dates_in_range(tmp_path, monkeypatch):
+    for d in ("2024-10-08", "2024-10-09", "2024-10-10", "2024-10-11"):
+        _run(tmp_path, d, f"{d}T10:00:00+00:00", ["a", "b"])
+
+    opened = []
+    read_schema = log_store.read_schema
+    monkeypatch.setattr(log_store, "read_schema", lambda p: opened.append(p.parent.name) or read_schema(p))
+
+    out = log_store.read_range("predictions", start="2024-10-09", end="2024-10-10", root=tmp_path)
+    assert sorted(out["date"].unique()) == ["2024-10-09", "2024-10-10"]
+    assert set(opened) == {"2024-10-09", "2024-10-10"}
+
+
+def test_compact_latest_run_collapses_reruns(tmp_path):
+    d = "2024-10-08"
+    _run(tmp_path, d, f"{d}T10:00:00+00:00", ["a", "b", "c"])
+    _run(tmp_path, d, f"{d}T18:00:00+00:00", ["a", "b"])
+
+    assert log_store.compact_date("predictions", d, root=tmp_path) == 5
+    assert log_store.compact_date("predictions", d, root=tmp_path, latest_run=True) == 2
+    out = log_store.read_date("predictions", d, root=tmp_path)
+    assert out["logged_at_utc"].unique().tolist() == [f"{d}T18:00:00+00:00"]
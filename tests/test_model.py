@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from model import DEFAULT_PARAMS, ModelParams, goal_lambda, goal_probability, per_game, pp1_flags, toi_multiplier
+
+
+def test_pp1_flags_matches_pandas_min_rank():
+    rng = np.random.default_rng(0)
+    n = 400
+    teams = rng.integers(0, 12, n)
+    ice = np.round(rng.uniform(0, 300, n), 0)      # rounding forces ties at the cut
+    ice[rng.random(n) < 0.1] = np.nan
+    for top_n in (1, 5, 8):
+        df = pd.DataFrame({"team": teams, "ice": ice})
+        rank = df.groupby("team")["ice"].rank(ascending=False, method="min")
+        expected = (rank <= top_n).astype(int).to_numpy()
+        got = pp1_flags(ice, teams, ModelParams(pp1_top_n=top_n))
+        np.testing.assert_array_equal(got, expected)
+
+
+def test_per_game_zero_and_missing_games():
+    np.testing.assert_array_equal(per_game([10.0, 5.0, 3.0], [5, 0, np.nan]), [2.0, 0.0, 0.0])
+
+
+def test_toi_multiplier_relative_to_team_mean_and_clipped():
+    toi = np.array([100.0, 300.0, 200.0, 50.0, 50.0])
+    teams = np.array([0, 0, 0, 1, 1])
+    got = toi_multiplier(toi, teams, DEFAULT_PARAMS)
+    np.testing.assert_allclose(got, [0.6, 1.4, 1.0, 1.0, 1.0])
+
+
+def test_goal_lambda_boost_cap_shrink():
+    p = ModelParams(pp1_boost=0.5, lambda_cap=1.2, shrink=0.65)
+    lam = goal_lambda(np.array([0.4, 0.4, 2.0]), np.array([1.0, 1.0, 1.0]), np.array([0, 1, 0]), p)
+    np.testing.assert_allclose(lam, [0.4 * 0.65, 0.6 * 0.65, 1.2 * 0.65])
+    np.testing.assert_allclose(goal_probability(lam), 1 - np.exp(-lam))
+
+
+def test_pp1_flags_all_nan_team():
+    assert pp1_flags(np.array([np.nan, np.nan]), np.array([0, 0])).sum() == 0
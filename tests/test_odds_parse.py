@@ -0,0 +1,38 @@
+import io
+import json
+
+import pytest
+
+from odds_parse_anytime import iter_json_array
+
+
+def _items(text, chunk_size):
+    return list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[1,23,456]",
+        "[1.5e3, true]",
+        "[-0.25, false, null, 1E-2]",
+        ' [ {"a": [1, 2]} ,\n"x" ] ',
+        "[]",
+        '[{"id": "e1", "bookmakers": [{"key": "b", "markets": []}]}]',
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_matches_json_loads_at_every_chunk_size(text, chunk_size):
+    assert _items(text, chunk_size) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ['[{"a":1} {"b":2}]', "[1,,2]", "[1,]", "[,1]", "[1", "[1 2]"])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_rejects_bad_separators(text, chunk_size):
+    with pytest.raises(ValueError):
+        _items(text, chunk_size)
+
+
+def test_rejects_error_object():
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        _items('{"message": "quota"}', 4)
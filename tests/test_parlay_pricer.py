@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from parlay_pricer import Slate, enumerate_combos, fit_team_shape, joint_probability, price_parlays
+
+
+def _legs(c: int = 6, n: int = 4, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    lam = rng.uniform(0.05, 0.6, (c, n))
+    team = rng.integers(0, 2, (c, n))
+    return lam, team
+
+
+@pytest.mark.parametrize("shape", [2.0, 10.0])
+def test_exact_matches_monte_carlo(shape):
+    lam, team = _legs()
+    exact, se0 = joint_probability(lam, team, shape=shape)
+    mc, se = joint_probability(lam, team, shape=shape, exact_max_legs=0, draws=200_000, seed=3)
+    assert (se0 == 0).all()
+    assert np.all(np.abs(exact - mc) < 5 * se + 1e-12)
+
+
+def test_single_leg_keeps_model_price():
+    lam = np.array([[0.05], [0.3], [0.9]])
+    for shape in (0.5, 5.0, np.inf):
+        p, _ = joint_probability(lam, np.zeros_like(lam, dtype=int), shape=shape)
+        np.testing.assert_allclose(p, 1 - np.exp(-lam[:, 0]), rtol=1e-12)
+
+
+def test_infinite_shape_is_independent_product():
+    lam, team = _legs()
+    p, _ = joint_probability(lam, team, shape=np.inf)
+    np.testing.assert_allclose(p, (1 - np.exp(-lam)).prod(axis=1), rtol=1e-10)
+
+
+def test_teammates_positively_correlated_opponents_independent():
+    lam = np.array([[0.3, 0.4], [0.3, 0.4]])
+    p, _ = joint_probability(lam, np.array([[0, 0], [0, 1]]), shape=5.0)
+    independent = (1 - np.exp(-0.3)) * (1 - np.exp(-0.4))
+    assert p[0] > independent
+    assert p[1] == pytest.approx(independent, rel=1e-12)
+
+
+def test_monte_carlo_is_seeded():
+    lam, team = _legs(n=7)
+    a, _ = joint_probability(lam, team, exact_max_legs=4, draws=2000, seed=5)
+    b, _ = joint_probability(lam, team, exact_max_legs=4, draws=2000, seed=5)
+    np.testing.assert_array_equal(a, b)
+
+
+def _slate() -> Slate:
+    rng = np.random.default_rng(0)
+    teams = ["TOR", "MTL", "BOS", "NYR"]
+    pred = pd.DataFrame(
+        {
+            "playerId": np.arange(40) + 8470000,
+            "name": [f"P{i}" for i in range(40)],
+            "team": np.repeat(teams, 10),
+            "lambda_goal": rng.uniform(0.05, 0.5, 40),
+        }
+    )
+    pred["goal_probability"] = -np.expm1(-pred["lambda_goal"])
+    return Slate.from_predictions(pred, [("TOR", "MTL"), ("BOS", "NYR")])
+
+
+def test_enumerate_combos_within_games():
+    slate = _slate()
+    combos = enumerate_combos(slate, top=6, min_legs=2, max_legs=3)
+    assert combos[2].shape == (2 * 15, 2) and combos[3].shape == (2 * 20, 3)
+    for rows in combos.values():
+        assert (slate.game[rows] == slate.game[rows][:, :1]).all()
+
+
+def test_price_parlays_mixed_sizes_and_unknown_player():
+    slate = _slate()
+    out = price_parlays(slate, [[8470000, 8470001], [8470000, 8470010, 8470011]])
+    assert sorted(out["n_legs"]) == [2, 3]
+    assert (out["lift"] >= 1).all()
+    with pytest.raises(ValueError):
+        price_parlays(slate, [[8470000, 1]])
+
+
+def test_fit_team_shape_recovers_gamma_shape():
+    rng = np.random.default_rng(2)
+    k, games = 6.0, 4000
+    rows = pd.DataFrame(
+        {
+            "game_id": np.repeat(np.arange(games), 2),
+            "team": np.tile(["AAA", "BBB"], games),
+            "goals": rng.poisson(3.0 * rng.gamma(k, 1 / k, 2 * games)),
+        }
+    )
+    assert fit_team_shape(rows) == pytest.approx(k, rel=0.35)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from identity import PlayerRegistry
+from model import ModelParams
+from pp_units import PPUnitTable
+
+
+def _skaters():
+    rows = []
+    for team, base in (("TOR", 100), ("MTL", 200)):
+        for k in range(8):
+            pid = base + k
+            name = f"Skater {team} {chr(65 + k)}"
+            rows.append({"playerId": pid, "name": name, "team": team, "situation": "5on4", "icetime": 300.0 - 10 * k})
+    return pd.DataFrame(rows)
+
+
+def test_dailyfaceoff_covers_listed_teams_whole(tmp_path):
+    mp = _skaters()
+    # MoneyPuck would put all 8 TOR skaters on PP1
+    table = PPUnitTable.from_moneypuck(mp, ModelParams(pp1_top_n=8))
+    listed = mp[mp["team"].eq("TOR")].iloc[3:8]
+    pp_df = pd.DataFrame({"player": listed["name"], "team": "TOR", "pp_unit": 1})
+    registry = PlayerRegistry.from_frame(mp, alias_path=tmp_path / "aliases.csv")
+
+    out = table.with_dailyfaceoff(pp_df, registry).assign(mp.drop_duplicates("playerId"))
+    tor = out[out["team"].eq("TOR")]
+    assert set(tor.loc[tor["is_pp1"].eq(1), "playerId"]) <= set(listed["playerId"])
+    assert (tor["pp_source"] == "dailyfaceoff").all()
+
+    # MTL isn't in the file: the inference stands
+    mtl = out[out["team"].eq("MTL")]
+    assert mtl["is_pp1"].sum() == 8
+    assert (mtl["pp_source"] == "moneypuck").all()
+
+
+def test_covered_team_player_missing_from_table_is_not_pp1(tmp_path):
+    mp = _skaters()
+    table = PPUnitTable.from_moneypuck(mp, ModelParams(pp1_top_n=5))
+    pp_df = pd.DataFrame({"player": ["Skater TOR A"], "team": ["TOR"], "pp_unit": [1]})
+    out = table.with_dailyfaceoff(pp_df, PlayerRegistry.from_frame(mp, alias_path=tmp_path / "aliases.csv"))
+    # MTL skater traded to TOR: the id fallback finds their MTL PP1 row, but TOR is covered
+    got = out.assign(pd.DataFrame({"playerId": [200, 100], "team": ["TOR", "TOR"]}))
+    np.testing.assert_array_equal(got["pp_unit"], [0, 1])
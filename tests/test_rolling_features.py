@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+import warehouse
+from rolling_features import (
+    STATE_COLUMNS,
+    _fold,
+    _last_n,
+    form_as_of,
+    form_frame,
+    ingest_player_games,
+    load_form,
+    update_form,
+)
+
+
+SPAN = 10
+
+
+def _games(n_players: int = 4, n_games: int = 25, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-10-08", periods=n_games, freq="2D").strftime("%Y-%m-%d")
+    rows = []
+    for p in range(n_players):
+        for g, d in enumerate(dates):
+            rows.append(
+                {
+                    "date": d,
+                    "game_id": 2024020000 + g * 16 + p,
+                    "player_id": 8470000 + p,
+                    "player": f"Player {p}",
+                    "team": "TOR",
+                    "icetime": rng.uniform(600, 1400),
+                    "pp_icetime": rng.uniform(0, 200) if rng.random() > 0.2 else np.nan,
+                    "xg": rng.gamma(1.5, 0.15),
+                    "goals": int(rng.poisson(0.3)),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def _empty_state() -> pd.DataFrame:
+    return pd.DataFrame(columns=STATE_COLUMNS).set_index("player_id")
+
+
+def _pandas_ewm(games: pd.DataFrame, col: str) -> pd.Series:
+    g = games.sort_values(["player_id", "date", "game_id"])
+    return g.groupby("player_id")[col].apply(lambda s: s.fillna(0.0).ewm(span=SPAN, adjust=True).mean().iloc[-1])
+
+
+def test_fold_matches_pandas_ewm():
+    games = _games()
+    form = form_frame(_fold(_empty_state(), games, SPAN).join(_last_n(games, 10))).set_index("playerId")
+    np.testing.assert_allclose(form["form_xg_per_game"], _pandas_ewm(games, "xg"), rtol=1e-12)
+    np.testing.assert_allclose(form["form_toi_per_game"], _pandas_ewm(games, "icetime"), rtol=1e-12)
+    np.testing.assert_allclose(form["form_pp_toi_per_game"], _pandas_ewm(games, "pp_icetime"), rtol=1e-12)
+
+
+def test_incremental_fold_equals_one_shot():
+    games = _games().sample(frac=1.0, random_state=1)   # fold order must not matter
+    cut = games["date"] < "2024-11-10"
+    state = _fold(_empty_state(), games[cut], SPAN)
+    state = _fold(state, games[~cut], SPAN)
+    once = _fold(_empty_state(), games, SPAN)
+    pd.testing.assert_frame_equal(state.sort_index(), once.sort_index(), check_exact=False, rtol=1e-12)
+
+
+def test_last_n_sums():
+    games = _games()
+    lastn = _last_n(games, 5)
+    tail = games.sort_values("date").groupby("player_id").tail(5)
+    np.testing.assert_allclose(lastn["lastn_xg"], tail.groupby("player_id")["xg"].sum())
+    assert (lastn["lastn_games"] == 5).all()
+
+
+def test_update_form_incremental_with_late_game(tmp_path):
+    games = _games()
+    late = games["date"] == "2024-10-20"
+    conn = warehouse.connect(tmp_path / "w.sqlite")
+    try:
+        warehouse.load_player_games(conn, games[(games["date"] < "2024-11-01") & ~late])
+        update_form(conn, span=SPAN)
+        warehouse.load_player_games(conn, games[games["date"] >= "2024-11-01"])
+        update_form(conn, span=SPAN)
+        stats = (warehouse.load_player_games(conn, games[late]), update_form(conn, span=SPAN))
+        assert stats[1]["refolded"] == games["player_id"].nunique()
+
+        form = load_form(conn).set_index("playerId").sort_index()
+        np.testing.assert_allclose(form["form_xg_per_game"], _pandas_ewm(games, "xg"), rtol=1e-12)
+        assert (form["form_games"] == games.groupby("player_id").size()).all()
+
+        # as-of a past date: rebuilt from history strictly before it
+        cutoff = "2024-11-01"
+        past = form_as_of(conn, cutoff, span=SPAN).set_index("playerId").sort_index()
+        np.testing.assert_allclose(
+            past["form_xg_per_game"], _pandas_ewm(games[games["date"] < cutoff], "xg"), rtol=1e-12
+        )
+    finally:
+        conn.close()
+
+
+def test_ingest_reloads_corrected_games_and_refolds(tmp_path):
+    games = _games()
+    conn = warehouse.connect(tmp_path / "w.sqlite")
+    try:
+        assert ingest_player_games(conn, games) == len(games)
+        update_form(conn, span=SPAN)
+        assert ingest_player_games(conn, games) == 0          # unchanged: nothing loaded
+
+        corrected = games.copy()
+        fix = (corrected["player_id"] == 8470001) & (corrected["date"] == "2024-10-20")
+        corrected.loc[fix, "xg"] += 0.5
+        assert ingest_player_games(conn, corrected) == 1
+        assert update_form(conn, span=SPAN)["refolded"] == 1
+
+        form = load_form(conn).set_index("playerId").sort_index()
+        np.testing.assert_allclose(form["form_xg_per_game"], _pandas_ewm(corrected, "xg"), rtol=1e-12)
+    finally:
+        conn.close()
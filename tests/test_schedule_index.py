@@ -0,0 +1,35 @@
+import json
+import os
+import time
+
+import schedule_index
+from schedule_index import Game, SeasonScheduleIndex, load_season_index
+
+
+def _write(cache_dir, games, built_at):
+    index = SeasonScheduleIndex(20242025, games, built_at)
+    path = cache_dir / "season_20242025.json"
+    path.write_text(json.dumps(index.to_json()), encoding="utf-8")
+    return path
+
+
+def test_load_season_index_parses_once_per_file_version(tmp_path, monkeypatch):
+    game = Game(2024020001, "2024-10-08", "BOS", "FLA", 2, "OFF", "2024-10-08T23:00:00Z")
+    path = _write(tmp_path, [game], time.time())
+
+    parsed = []
+    from_json = SeasonScheduleIndex.from_json.__func__
+    monkeypatch.setattr(
+        SeasonScheduleIndex, "from_json", classmethod(lambda cls, data: parsed.append(1) or from_json(cls, data))
+    )
+    monkeypatch.setattr(schedule_index, "build_season_index", lambda season: (_ for _ in ()).throw(AssertionError))
+
+    for d in ("2024-10-08", "2024-11-01", "2025-01-15"):
+        assert load_season_index(d, cache_dir=tmp_path).game_ids_on("2024-10-08") == [2024020001]
+    assert len(parsed) == 1
+
+    later = Game(2024020002, "2024-10-09", "TOR", "MTL", 2, "OFF", "2024-10-09T23:00:00Z")
+    _write(tmp_path, [game, later], time.time())
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert load_season_index("2024-10-09", cache_dir=tmp_path).game_ids_on("2024-10-09") == [2024020002]
+    assert len(parsed) == 2